@@ -0,0 +1,153 @@
+# api/core/adb.py
+"""
+Acesso assíncrono ao banco, ao lado de api/core/db.py.
+
+As funções dos models continuam síncronas (recebem `db`); aqui elas rodam
+fora do event loop e as rotas fazem `await adb.read(...)` / `await adb.write(...)`.
+Leituras vão para um executor próprio (DB_READ_WORKERS threads, cada uma
+com a sua conexão só-leitura fixa); escritas vão para a fila única de
+db.WriteCoordinator, que junta as pendentes num só commit.
+"""
+import asyncio
+import contextvars
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+from fastapi import Response
+from pydantic import TypeAdapter
+from . import profiling
+from .db import connect, get_writer, report_db
+
+DB_READ_WORKERS = int(os.getenv("DB_READ_WORKERS", "4"))
+
+class DBExecutor:
+    """Pool de threads em que cada thread tem uma conexão SQLite dedicada."""
+
+    def __init__(self, name: str, workers: int, db_path: Optional[str] = None, readonly: bool = False):
+        self.name = name
+        self.workers = max(1, workers)
+        self.db_path = db_path
+        self.readonly = readonly
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"db-{name}")
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._conns: List[Any] = []
+        self.pending = 0
+        self.completed = 0
+        self.max_seen = 0
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = connect(self.db_path, readonly=self.readonly)
+            self._local.conn = conn
+            with self._lock:
+                self._conns.append(conn)
+        return conn
+
+    def _call(self, fn: Callable, args, kwargs):
+        conn = self._conn()
+        try:
+            return fn(conn, *args, **kwargs)
+        finally:
+            # nada de transação pendurada entre uma chamada e outra
+            if conn.in_transaction:
+                conn.rollback()
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        with self._lock:
+            self.pending += 1
+            self.max_seen = max(self.max_seen, self.pending)
+        try:
+            # copia o contexto: o perfil do request (api.core.profiling) vai junto para a thread
+            ctx = contextvars.copy_context()
+            return await asyncio.wrap_future(self._pool.submit(ctx.run, self._call, fn, args, kwargs))
+        finally:
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "pending": self.pending,
+                "queued": max(0, self.pending - self.workers),
+                "max_pending_seen": self.max_seen,
+                "completed": self.completed,
+            }
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+        with self._lock:
+            for conn in self._conns:
+                conn.close()
+            self._conns.clear()
+
+@lru_cache(maxsize=None)
+def type_adapter(model: Any) -> TypeAdapter:
+    return TypeAdapter(model)
+
+_readers: Optional[DBExecutor] = None
+_lock = threading.Lock()
+
+def _reader() -> DBExecutor:
+    global _readers
+    if _readers is None:
+        with _lock:
+            if _readers is None:
+                _readers = DBExecutor("read", DB_READ_WORKERS, readonly=True)
+    return _readers
+
+async def read(fn: Callable, *args, **kwargs):
+    """Roda `fn(db, *args, **kwargs)` numa thread de leitura."""
+    return await _reader().run(fn, *args, **kwargs)
+
+async def write(fn: Callable, *args, **kwargs):
+    """Enfileira `fn(db, *args, **kwargs)` no escritor único; retorna após o commit."""
+    return await asyncio.wrap_future(get_writer().submit(fn, *args, **kwargs))
+
+async def read_json(model: Any, fn: Callable, *args, exclude_none: bool = True,
+                    snapshot: bool = False, **kwargs) -> Response:
+    """
+    Como read(), mas já valida com `model` e serializa na thread de leitura:
+    listas grandes não seguram o event loop. model=None serializa o resultado cru.
+    snapshot=True lê de db.report_db() (o snapshot, se configurado; senão a
+    própria conexão da thread) e informa a idade dos dados em X-Data-As-Of.
+    """
+    def encode(result):
+        with profiling.serializing():
+            if model is None:
+                return json.dumps(result, ensure_ascii=False, default=str).encode("utf-8")
+            adapter = type_adapter(model)
+            return adapter.dump_json(adapter.validate_python(result), exclude_none=exclude_none)
+
+    def run(db):
+        if not snapshot:
+            return encode(fn(db, *args, **kwargs)), None
+        with report_db(borrow=db) as (rdb, as_of):
+            return encode(fn(rdb, *args, **kwargs)), as_of
+
+    body, as_of = await read(run)
+    return Response(body, media_type="application/json", headers=data_as_of_headers(as_of))
+
+async def read_body(fn: Callable, *args, media_type: str = "application/json", **kwargs) -> Response:
+    """Para `fn` que já devolve o corpo pronto (bytes), ex.: media.list_page_json."""
+    return Response(await read(fn, *args, **kwargs), media_type=media_type)
+
+def data_as_of_headers(as_of: Optional[float]) -> Optional[Dict[str, str]]:
+    return {"X-Data-As-Of": formatdate(as_of, usegmt=True)} if as_of is not None else None
+
+def stats() -> Dict[str, Any]:
+    return {"read": _reader().stats(), "write": get_writer().stats()}
+
+def close() -> None:
+    global _readers
+    with _lock:
+        if _readers is not None:
+            _readers.close()
+        _readers = None
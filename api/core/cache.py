@@ -0,0 +1,95 @@
+# api/core/cache.py
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+from .versions import table_versions
+
+class TTLCache:
+    """
+    Cache LRU em memória com expiração por tempo (por processo).
+    Thread-safe; conta hits/misses para monitoramento.
+
+    Com `tables`, cada entrada guarda as versões dessas tabelas (ver
+    api.core.versions) e deixa de valer quando qualquer processo escreve
+    nelas. Passe a set() as versões lidas antes de carregar o valor
+    (version()): escrita no meio deixa a entrada já vencida, nunca errada.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, clock: Callable[[], float] = time.monotonic,
+                 tables: Sequence[str] = ()):
+        self.maxsize = max(1, maxsize)
+        self.ttl = ttl
+        self.tables = tuple(tables)
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, tuple[float, Any, Tuple[int, ...]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def version(self) -> Tuple[int, ...]:
+        return table_versions.current(self.tables) if self.tables else ()
+
+    async def aversion(self) -> Tuple[int, ...]:
+        """version() para o event loop (a conferência no banco roda fora dele)."""
+        return await table_versions.acurrent(self.tables) if self.tables else ()
+
+    def get(self, key: Hashable, version: Optional[Tuple[int, ...]] = None) -> Optional[Any]:
+        """`version`: as versões já conferidas (aversion()); sem ela, confere aqui."""
+        now = self._clock()
+        if version is None:
+            version = self.version()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] <= now or item[2] != version:
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key: Hashable, value: Any, version: Optional[Tuple[int, ...]] = None) -> None:
+        if version is None:
+            version = self.version()
+        with self._lock:
+            self._data[key] = (self._clock() + self.ttl, value, version)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.invalidations += len(self._data)
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_s": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+# usuários autenticados, por uid (usado em deps.require_auth); vence com escrita em user de qualquer worker
+user_cache = TTLCache(
+    maxsize=int(os.getenv("USER_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("USER_CACHE_TTL", "60")),
+    tables=("user",),
+)
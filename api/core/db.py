@@ -1,18 +1,622 @@
 import os
+import queue
 import sqlite3
-from typing import Any, Iterable, List, Dict
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, List, Dict
 from fastapi import HTTPException
+from . import profiling
 
 DB_PATH = os.getenv("DB_PATH", "app.db")
 
-def get_db():
-    conn = sqlite3.connect(DB_PATH)
+# Pool de conexões (configurável por ambiente, como o DB_PATH)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))      # segundos esperando conexão livre
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+DB_SYNCHRONOUS = os.getenv("DB_SYNCHRONOUS", "NORMAL")            # NORMAL é seguro com WAL
+DB_CACHE_SIZE = int(os.getenv("DB_CACHE_SIZE", "-16000"))          # negativo = KiB (16 MB)
+DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(128 * 1024 * 1024)))
+# Fila única de escrita (WriteCoordinator)
+DB_WRITE_BATCH_MAX = int(os.getenv("DB_WRITE_BATCH_MAX", "64"))        # escritas por commit
+DB_WRITE_LINGER_MS = float(os.getenv("DB_WRITE_LINGER_MS", "0"))       # espera extra para juntar lote
+# Snapshot para relatórios pesados (cópia via API de backup); vazio = desligado
+DB_SNAPSHOT_PATH = os.getenv("DB_SNAPSHOT_PATH", "")
+DB_SNAPSHOT_INTERVAL = float(os.getenv("DB_SNAPSHOT_INTERVAL", "300"))  # segundos entre cópias
+
+_SYNCHRONOUS_VALUES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+def _apply_pragmas(conn: sqlite3.Connection, readonly: bool = False) -> None:
+    sync = DB_SYNCHRONOUS.upper()
+    if sync not in _SYNCHRONOUS_VALUES:
+        sync = "NORMAL"
+    if readonly:
+        # WAL fica gravado no arquivo (quem abre para escrita já ligou)
+        conn.execute("PRAGMA query_only = ON")
+    else:
+        conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute(f"PRAGMA synchronous = {sync}")
+    conn.execute(f"PRAGMA cache_size = {int(DB_CACHE_SIZE)}")
+    conn.execute(f"PRAGMA mmap_size = {int(DB_MMAP_SIZE)}")
+    conn.execute(f"PRAGMA busy_timeout = {int(DB_BUSY_TIMEOUT_MS)}")
+
+class Cursor(sqlite3.Cursor):
+    """Anota comandos, tempo e linhas lidas no perfil do request (api.core.profiling), se houver."""
+
+    def execute(self, sql, parameters=()):
+        p = profiling.current()
+        if p is None:
+            return super().execute(sql, parameters)
+        t0 = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            p.sql(sql, time.perf_counter() - t0)
+
+    def executemany(self, sql, seq_of_parameters):
+        p = profiling.current()
+        if p is None:
+            return super().executemany(sql, seq_of_parameters)
+        t0 = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            p.sql(sql, time.perf_counter() - t0)
+
+    def _fetched(self, fetch, *args):
+        p = profiling.current()
+        if p is None:
+            return fetch(*args)
+        t0 = time.perf_counter()
+        rows = fetch(*args)
+        p.fetched(len(rows) if isinstance(rows, list) else int(rows is not None), time.perf_counter() - t0)
+        return rows
+
+    def fetchone(self):
+        return self._fetched(super().fetchone)
+
+    def fetchmany(self, size=None):
+        return self._fetched(super().fetchmany, self.arraysize if size is None else size)
+
+    def fetchall(self):
+        return self._fetched(super().fetchall)
+
+    def __next__(self):
+        p = profiling.current()
+        if p is None:
+            return super().__next__()
+        t0 = time.perf_counter()
+        row = super().__next__()
+        p.fetched(1, time.perf_counter() - t0)
+        return row
+
+class Connection(sqlite3.Connection):
+    """
+    sqlite3.Connection que sabe se está dentro de `transaction()` e cujos
+    cursores (inclusive os de execute()) passam pelo perfil do request.
+    """
+    tx_depth = 0
+    on_commit: List[Callable[[], Any]]
+
+    def cursor(self, factory: Callable[[sqlite3.Connection], sqlite3.Cursor] | None = None) -> Any:
+        return super().cursor(factory or Cursor)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+def connect(db_path: str | None = None, readonly: bool = False, immutable: bool = False) -> sqlite3.Connection:
+    """
+    Abre uma conexão já configurada (row_factory + PRAGMAs).
+    readonly=True abre com mode=ro + query_only: em WAL, leitura longa não
+    bloqueia nem é bloqueada por escrita. immutable=True (arquivo que
+    ninguém altera, como o snapshot) dispensa até os locks.
+    """
+    path = db_path or DB_PATH
+    # check_same_thread=False: dependência e handler podem rodar em threads diferentes
+    if readonly:
+        uri = Path(path).resolve().as_uri() + "?mode=ro" + ("&immutable=1" if immutable else "")
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False, factory=Connection)
+    else:
+        conn = sqlite3.connect(path, check_same_thread=False, factory=Connection)
     conn.row_factory = sqlite3.Row
+    _apply_pragmas(conn, readonly)
     return conn
 
+class ConnectionPool:
+    """
+    Pool simples de conexões SQLite.
+    As conexões são criadas sob demanda até `size`; depois disso quem pede
+    espera (até `timeout`) alguém devolver. Na devolução, transação aberta
+    é desfeita e conexão quebrada é descartada.
+    """
+
+    def __init__(self, db_path: str, size: int = DB_POOL_SIZE, timeout: float = DB_POOL_TIMEOUT):
+        self.db_path = db_path
+        self.size = max(1, size)
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._discarded = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _new_conn_slot(self) -> bool:
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                return True
+            return False
+
+    def acquire(self) -> sqlite3.Connection:
+        start = time.perf_counter()
+        conn = None
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            if self._new_conn_slot():
+                try:
+                    conn = connect(self.db_path)
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    with self._lock:
+                        self._timeouts += 1
+                    raise HTTPException(status_code=503, detail="Banco de dados ocupado, tente novamente")
+        waited = time.perf_counter() - start
+        with self._lock:
+            self._in_use += 1
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        healthy = True
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            healthy = False
+        with self._lock:
+            self._in_use -= 1
+            if not healthy:
+                self._created -= 1
+                self._discarded += 1
+        if healthy:
+            self._idle.put(conn)
+        else:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def check_health(self) -> bool:
+        """Faz um SELECT 1 numa conexão do pool."""
+        try:
+            with self.connection() as conn:
+                conn.execute("SELECT 1").fetchone()
+            return True
+        except Exception:
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            avg = self._wait_total / self._checkouts if self._checkouts else 0.0
+            return {
+                "size": self.size,
+                "created": self._created,
+                "in_use": self._in_use,
+                "idle": self._idle.qsize(),
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "discarded": self._discarded,
+                "wait_avg_ms": round(avg * 1000, 3),
+                "wait_max_ms": round(self._wait_max * 1000, 3),
+            }
+
+    def close_all(self) -> None:
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_PATH)
+    return _pool
+
+def close_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+            _pool = None
+
+def get_db() -> Iterator[sqlite3.Connection]:
+    """Dependência FastAPI: empresta uma conexão do pool durante o request."""
+    with get_pool().connection() as conn:
+        yield conn
+
+class Snapshotter:
+    """
+    Copia o banco para `path` a cada `interval` segundos com a API de backup
+    do SQLite (uma cópia consistente; em WAL não trava os escritores).
+    A cópia é feita num arquivo temporário e trocada de uma vez, então quem
+    está lendo o snapshot anterior termina a leitura nele.
+    """
+
+    def __init__(self, db_path: str, path: str, interval: float = DB_SNAPSHOT_INTERVAL):
+        self.db_path = db_path
+        self.path = path
+        self.interval = max(1.0, interval)
+        self.taken_at: float | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._count = 0
+        self._errors = 0
+        self._last_ms = 0.0
+        self._last_error: str | None = None
+
+    def take(self) -> float:
+        start = time.perf_counter()
+        tmp = f"{self.path}.tmp"
+        src = connect(self.db_path, readonly=True)
+        dst = sqlite3.connect(tmp)
+        try:
+            src.backup(dst)   # pages=-1: um passo só, numa transação de leitura
+            dst.execute("PRAGMA journal_mode = DELETE")   # snapshot sem -wal/-shm
+        finally:
+            dst.close()
+            src.close()
+        os.replace(tmp, self.path)
+        taken_at = time.time()
+        with self._lock:
+            self.taken_at = taken_at
+            self._count += 1
+            self._last_ms = (time.perf_counter() - start) * 1000
+        return taken_at
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.take()
+            except Exception as exc:
+                with self._lock:
+                    self._errors += 1
+                    self._last_error = repr(exc)
+                print(f"[snapshot] falhou: {exc!r}")
+            self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="db-snapshot", daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "path": self.path,
+                "interval_s": self.interval,
+                "taken_at": self.taken_at,
+                "age_s": round(time.time() - self.taken_at, 1) if self.taken_at else None,
+                "snapshots": self._count,
+                "errors": self._errors,
+                "last_ms": round(self._last_ms, 3),
+                "last_error": self._last_error,
+            }
+
+_snapshotter: Snapshotter | None = None
+
+def get_snapshotter() -> Snapshotter | None:
+    """None quando DB_SNAPSHOT_PATH não está configurado."""
+    global _snapshotter
+    if _snapshotter is None and DB_SNAPSHOT_PATH:
+        with _pool_lock:
+            if _snapshotter is None:
+                _snapshotter = Snapshotter(DB_PATH, DB_SNAPSHOT_PATH)
+    return _snapshotter
+
+def stop_snapshots() -> None:
+    global _snapshotter
+    with _pool_lock:
+        if _snapshotter is not None:
+            _snapshotter.stop()
+            _snapshotter = None
+
+def snapshot_as_of() -> float | None:
+    """Momento do snapshot que report_db() usaria agora (None = banco vivo)."""
+    snap = get_snapshotter()
+    return snap.taken_at if snap is not None else None
+
+@contextmanager
+def report_db(borrow: sqlite3.Connection | None = None) -> Iterator[tuple[sqlite3.Connection, float | None]]:
+    """
+    Conexão só-leitura para relatórios pesados: o snapshot, se houver um
+    pronto; senão o próprio banco (mode=ro). Devolve também o momento do
+    snapshot (None = dados ao vivo).
+    `borrow`: conexão só-leitura já aberta (a da thread do pool de leitura),
+    usada quando não há snapshot — não é fechada aqui. Sem ela (streaming,
+    jobs), abre uma conexão própria.
+    """
+    snap = get_snapshotter()
+    as_of = snap.taken_at if snap is not None else None
+    if snap is not None and as_of is not None:
+        conn = connect(snap.path, readonly=True, immutable=True)
+    elif borrow is not None:
+        yield borrow, None
+        return
+    else:
+        conn = connect(readonly=True)
+    try:
+        yield conn, as_of
+    finally:
+        conn.close()
+
+def _in_unit_of_work(db) -> bool:
+    return getattr(db, "tx_depth", 0) > 0
+
+@contextmanager
+def transaction(db) -> Iterator[Any]:
+    """
+    Unidade de trabalho: tudo dentro do bloco vira um único commit
+    (ou rollback se der erro). Aninhado, vira SAVEPOINT — o erro de um
+    bloco interno desfaz só ele.
+    """
+    depth = getattr(db, "tx_depth", 0)
+    if depth == 0:
+        if db.in_transaction:
+            db.commit()
+        # IMMEDIATE: pega o lock de escrita já no início (evita SQLITE_BUSY no upgrade)
+        db.execute("BEGIN IMMEDIATE")
+        db.on_commit = []
+    else:
+        db.execute(f"SAVEPOINT sp{depth}")
+    mark = len(db.on_commit)
+    db.tx_depth = depth + 1
+    try:
+        yield db
+    except BaseException:
+        db.tx_depth = depth
+        del db.on_commit[mark:]
+        if depth == 0:
+            db.rollback()
+        else:
+            db.execute(f"ROLLBACK TO sp{depth}")
+            db.execute(f"RELEASE sp{depth}")
+        raise
+    db.tx_depth = depth
+    if depth == 0:
+        db.commit()
+        hooks, db.on_commit = db.on_commit, []
+        for hook in hooks:
+            # os dados já estão gravados: erro num hook (cache, versão) não
+            # pode fazer quem escreveu (ou o lote todo do escritor) falhar
+            try:
+                hook()
+            except Exception as exc:
+                print(f"[after_commit] {hook!r} falhou: {exc!r}")
+    else:
+        db.execute(f"RELEASE sp{depth}")
+
+@contextmanager
+def read_snapshot(db) -> Iterator[Any]:
+    """
+    Várias leituras enxergando o mesmo estado do banco (BEGIN comum: em WAL
+    não bloqueia ninguém). Serve em conexão só-leitura; dentro de uma
+    transação já aberta, ela mesma é o snapshot.
+    """
+    if db.in_transaction:
+        yield db
+        return
+    db.execute("BEGIN")
+    try:
+        yield db
+    finally:
+        db.rollback()   # só leitura: nada a gravar
+
+def after_commit(db, fn: Callable, *args) -> None:
+    """
+    Agenda `fn(*args)` para depois do commit da unidade de trabalho em curso
+    (ou roda já, fora dela). Se o bloco for desfeito, não roda. Usado para
+    bump_version/invalidação de cache: quem lê nunca vê a versão nova antes
+    dos dados novos.
+    """
+    if _in_unit_of_work(db):
+        db.on_commit.append(partial(fn, *args))
+    else:
+        fn(*args)
+
+_STOP = object()
+
+class WriteCoordinator:
+    """
+    Fila única de escrita: uma thread com uma conexão de vida longa executa
+    todas as escritas, na ordem de chegada. O que estiver na fila quando a
+    thread fica livre (até `batch_max` itens) vira uma única transação —
+    um commit para o lote todo — e cada item roda no seu SAVEPOINT, então
+    o erro de um (404, 409...) não desfaz os outros. Cada chamador recebe
+    o próprio resultado (ou exceção) só depois do commit.
+    """
+
+    def __init__(self, db_path: str, batch_max: int = DB_WRITE_BATCH_MAX, linger_ms: float = DB_WRITE_LINGER_MS):
+        self.db_path = db_path
+        self.batch_max = max(1, batch_max)
+        self.linger = max(0.0, linger_ms) / 1000
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._batches = 0
+        self._jobs = 0
+        self._failed = 0
+        self._max_batch = 0
+        self._commit_total = 0.0
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Enfileira `fn(db, *args, **kwargs)`; o Future resolve após o commit."""
+        self.start()
+        fut: Future = Future()
+        # o job roda na thread do escritor: leva junto o perfil do request
+        self._queue.put((fut, fn, args, kwargs, profiling.current()))
+        return fut
+
+    def _next_batch(self, first) -> tuple[list, bool]:
+        batch, stop = [first], False
+        deadline = time.monotonic() + self.linger
+        while len(batch) < self.batch_max:
+            try:
+                wait = deadline - time.monotonic()
+                job = self._queue.get(timeout=wait) if wait > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is _STOP:
+                stop = True
+                break
+            batch.append(job)
+        return batch, stop
+
+    def _run(self) -> None:
+        conn = connect(self.db_path)
+        try:
+            stop = False
+            while not stop:
+                job = self._queue.get()
+                if job is _STOP:
+                    break
+                batch, stop = self._next_batch(job)
+                self._commit_batch(conn, batch)
+        finally:
+            conn.close()
+
+    def _commit_batch(self, conn, batch: list) -> None:
+        outcomes: list = []
+        start = time.perf_counter()
+        try:
+            with transaction(conn):
+                for fut, fn, args, kwargs, profile in batch:
+                    if not fut.set_running_or_notify_cancel():
+                        outcomes.append(None)   # cancelado antes de rodar
+                        continue
+                    try:
+                        with profiling.use(profile), transaction(conn):
+                            outcomes.append((True, fn(conn, *args, **kwargs)))
+                    except Exception as exc:
+                        outcomes.append((False, exc))
+        except Exception as exc:
+            # o commit (ou o BEGIN) falhou: nada do lote foi gravado
+            outcomes = [None if o is None else (False, exc) for o in outcomes]
+            outcomes += [(False, exc)] * (len(batch) - len(outcomes))
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._batches += 1
+            self._jobs += len(batch)
+            self._failed += sum(1 for o in outcomes if o is not None and not o[0])
+            self._max_batch = max(self._max_batch, len(batch))
+            self._commit_total += elapsed
+        for (fut, *_), outcome in zip(batch, outcomes):
+            if outcome is None or fut.done():
+                continue
+            ok, value = outcome
+            if ok:
+                fut.set_result(value)
+            else:
+                fut.set_exception(value)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "queued": self._queue.qsize(),
+                "batches": self._batches,
+                "writes": self._jobs,
+                "failed": self._failed,
+                "batch_avg": round(self._jobs / self._batches, 2) if self._batches else 0.0,
+                "batch_max": self._max_batch,
+                "batch_ms_avg": round(self._commit_total / self._batches * 1000, 3) if self._batches else 0.0,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+_writer: WriteCoordinator | None = None
+
+def get_writer() -> WriteCoordinator:
+    global _writer
+    if _writer is None:
+        with _pool_lock:
+            if _writer is None:
+                _writer = WriteCoordinator(DB_PATH)
+    return _writer
+
+def close_writer() -> None:
+    global _writer
+    with _pool_lock:
+        if _writer is not None:
+            _writer.close()
+            _writer = None
+
 def execute(db, q: str, args: Iterable[Any] = ()):
     cur = db.execute(q, args)
-    db.commit()
+    if not _in_unit_of_work(db):
+        db.commit()
+    return cur
+
+def execute_many(db, q: str, rows: Iterable[Iterable[Any]]):
+    cur = db.executemany(q, rows)
+    if not _in_unit_of_work(db):
+        db.commit()
     return cur
 
 def query_all(db, q: str, args: Iterable[Any] = ()) -> List[Dict]:
@@ -32,8 +636,7 @@ def fetch_one_or_404(db, q: str, args=(), not_found_msg: str = "Recurso não enc
     return dict(row)
 
 def delete_or_404(db, q: str, args=(), not_found_msg: str = "Recurso não encontrado"):
-    cur = db.execute(q, args)
-    db.commit()
+    cur = execute(db, q, args)
     # Em SQLite, rowcount costuma refletir linhas afetadas para DELETE
     if cur.rowcount == 0:
         raise HTTPException(status_code=404, detail=not_found_msg)
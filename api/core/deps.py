@@ -1,13 +1,31 @@
-from fastapi import Request, HTTPException, Depends
-from ..core.db import get_db, query_one
-from ..core.security import verify_session
+from fastapi import Request, HTTPException
+from ..core import adb
+from ..core.cache import user_cache
+from ..core.security import verify_session, SESSION_EMBED_CLAIMS
+from ..models import users as users_model
 
-def require_auth(request: Request, db=Depends(get_db)):
+async def _load_user(data: dict) -> dict | None:
+    uid = data["uid"]
+    # sessão assinada já com os dados do usuário: nem cache nem banco
+    claims = data.get("user")
+    if SESSION_EMBED_CLAIMS and isinstance(claims, dict) and claims.get("id") == uid:
+        return dict(claims)
+
+    # versões conferidas fora do loop, antes da leitura; o usuário em si só vai ao banco no miss
+    version = await user_cache.aversion()
+    user = user_cache.get(uid, version)
+    if user is None:
+        user = await adb.read(users_model.get_by_id, uid)
+        if user:
+            user_cache.set(uid, user, version)
+    return dict(user) if user else None
+
+async def require_auth(request: Request):
     token = request.cookies.get("session")
     if token:
         data = verify_session(token)
         if data and "uid" in data:
-            user = query_one(db, "SELECT id, username, role, person_id FROM user WHERE id=?", (data["uid"],))
+            user = await _load_user(data)
             if user:
                 return user
     raise HTTPException(status_code=401, detail="Unauthorized")
@@ -0,0 +1,29 @@
+# api/core/export.py
+import csv
+import io
+import json
+from typing import Dict, Iterable, Iterator, List, Sequence
+
+# colunas do relatório de mídias (CSV e NDJSON)
+REPORT_COLUMNS = ["media_id", "title", "platform", "url", "published_at", "line_id", "system_id"]
+# mesmas colunas, do lado do SELECT
+REPORT_SELECT = "m.id AS media_id, m.title, m.platform, m.url, m.published_at, m.line_id, m.system_id"
+
+def iter_csv(batches: Iterable[List[Dict]], columns: Sequence[str] = REPORT_COLUMNS) -> Iterator[bytes]:
+    """Um chunk UTF-8 por lote (o cabeçalho vai no primeiro)."""
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    w.writerow(columns)
+    yield buf.getvalue().encode("utf-8")
+    for batch in batches:
+        buf.seek(0)
+        buf.truncate()
+        w.writerows([r[c] for c in columns] for r in batch)
+        yield buf.getvalue().encode("utf-8")
+
+def iter_ndjson(batches: Iterable[List[Dict]], columns: Sequence[str] = REPORT_COLUMNS) -> Iterator[bytes]:
+    """Um objeto JSON por linha; um chunk por lote."""
+    for batch in batches:
+        yield "".join(
+            json.dumps({c: r[c] for c in columns}, ensure_ascii=False) + "\n" for r in batch
+        ).encode("utf-8")
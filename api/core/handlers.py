@@ -1,17 +1,19 @@
 # api/core/handlers.py
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from starlette.status import (
     HTTP_400_BAD_REQUEST, HTTP_401_UNAUTHORIZED, HTTP_404_NOT_FOUND,
-    HTTP_409_CONFLICT, HTTP_422_UNPROCESSABLE_ENTITY, HTTP_500_INTERNAL_SERVER_ERROR
+    HTTP_409_CONFLICT, HTTP_422_UNPROCESSABLE_ENTITY, HTTP_429_TOO_MANY_REQUESTS,
+    HTTP_500_INTERNAL_SERVER_ERROR, HTTP_503_SERVICE_UNAVAILABLE
 )
 import sqlite3
 import re
 from uuid import uuid4
 
-def _infer_conflict_message_from_sqlite(err: sqlite3.IntegrityError) -> str:
+def integrity_message(err: sqlite3.IntegrityError) -> str:
     """
     Tenta transformar a mensagem crua do SQLite em algo amigável.
     Ex.: UNIQUE constraint failed: line.name  -> 'Linha já existe com esse nome'
@@ -28,6 +30,14 @@ def _infer_conflict_message_from_sqlite(err: sqlite3.IntegrityError) -> str:
     if "UNIQUE constraint failed: person.email" in msg:
         return "Já existe pessoa com esse e-mail"
 
+    # UNIQUE parcial em media(platform, video_key)
+    if "UNIQUE constraint failed: media.platform, media.video_key" in msg:
+        return "Esse vídeo já está cadastrado (mesmo vídeo com outra URL?)"
+
+    # FK para pessoa/linha/sistema inexistente
+    if "FOREIGN KEY constraint failed" in msg:
+        return "Referência inválida (pessoa, linha ou sistema inexistente)"
+
     # CHECK de platform
     if re.search(r"CHECK constraint failed: .*platform", msg):
         return "Valor de 'platform' inválido (use 'vimeo' ou 'youtube')"
@@ -39,6 +49,11 @@ def _infer_conflict_message_from_sqlite(err: sqlite3.IntegrityError) -> str:
     # fallback
     return "Violação de integridade do banco (verifique dados únicos e restrições)"
 
+def is_busy_error(err: sqlite3.OperationalError) -> bool:
+    """'database is locked' / 'database table is locked' / SQLITE_BUSY."""
+    msg = str(err).lower()
+    return "locked" in msg or "busy" in msg
+
 def register_exception_handlers(app: FastAPI) -> None:
     @app.exception_handler(StarletteHTTPException)
     async def http_exception_handler(request: Request, exc: StarletteHTTPException):
@@ -46,9 +61,12 @@ def register_exception_handlers(app: FastAPI) -> None:
         status_code = exc.status_code
         # códigos legíveis
         code_map = {
+            HTTP_400_BAD_REQUEST: "bad_request",
             HTTP_401_UNAUTHORIZED: "unauthorized",
             HTTP_404_NOT_FOUND: "not_found",
             HTTP_409_CONFLICT: "conflict",
+            HTTP_429_TOO_MANY_REQUESTS: "too_many_requests",
+            HTTP_503_SERVICE_UNAVAILABLE: "unavailable",
         }
         code = code_map.get(status_code, "http_error")
         return JSONResponse(
@@ -58,6 +76,7 @@ def register_exception_handlers(app: FastAPI) -> None:
                 "message": exc.detail if isinstance(exc.detail, str) else "Erro",
                 "details": None if isinstance(exc.detail, str) else exc.detail,
             },
+            headers=getattr(exc, "headers", None),
         )
 
     @app.exception_handler(RequestValidationError)
@@ -67,7 +86,7 @@ def register_exception_handlers(app: FastAPI) -> None:
             content={
                 "code": "validation_error",
                 "message": "Erro de validação dos dados enviados",
-                "details": exc.errors(),  # mantém os detalhes de onde quebrou
+                "details": jsonable_encoder(exc.errors()),  # mantém os detalhes de onde quebrou
             },
         )
 
@@ -78,7 +97,7 @@ def register_exception_handlers(app: FastAPI) -> None:
             status_code=HTTP_409_CONFLICT,
             content={
                 "code": "conflict",
-                "message": _infer_conflict_message_from_sqlite(exc),
+                "message": integrity_message(exc),
                 "details": None,
             },
         )
@@ -91,15 +110,31 @@ def register_exception_handlers(app: FastAPI) -> None:
         """
         try:
             return await call_next(request)
-        except Exception as exc:
-            req_id = str(uuid4())
-            # Log simples no stdout; em prod, use logger estruturado
-            print(f"[internal_error] id={req_id} path={request.url.path} error={repr(exc)}")
+        except sqlite3.OperationalError as exc:
+            if not is_busy_error(exc):
+                return _internal_error(request, exc)
+            # escrita fora da fila única esbarrou no lock além do busy_timeout
             return JSONResponse(
-                status_code=HTTP_500_INTERNAL_SERVER_ERROR,
+                status_code=HTTP_503_SERVICE_UNAVAILABLE,
                 content={
-                    "code": "internal_error",
-                    "message": "Erro interno inesperado",
-                    "details": {"request_id": req_id},
+                    "code": "unavailable",
+                    "message": "Banco de dados ocupado, tente novamente",
+                    "details": None,
                 },
+                headers={"Retry-After": "1"},
             )
+        except Exception as exc:
+            return _internal_error(request, exc)
+
+def _internal_error(request: Request, exc: Exception) -> JSONResponse:
+    req_id = str(uuid4())
+    # Log simples no stdout; em prod, use logger estruturado
+    print(f"[internal_error] id={req_id} path={request.url.path} error={repr(exc)}")
+    return JSONResponse(
+        status_code=HTTP_500_INTERNAL_SERVER_ERROR,
+        content={
+            "code": "internal_error",
+            "message": "Erro interno inesperado",
+            "details": {"request_id": req_id},
+        },
+    )
@@ -0,0 +1,118 @@
+# api/core/httpcache.py
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+from fastapi import Request, Response
+from . import profiling
+from .adb import type_adapter
+from .versions import table_versions
+
+@dataclass
+class CachedBody:
+    body: bytes
+    etag: str
+    last_modified: float
+    tables: Tuple[str, ...]
+    versions: Tuple[int, ...]
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {
+            "ETag": self.etag,
+            "Last-Modified": formatdate(self.last_modified, usegmt=True),
+            "Cache-Control": "no-cache",   # pode guardar, mas revalida sempre
+        }
+
+class ResponseCache:
+    """
+    Corpos JSON já serializados, por URL. Uma entrada vale enquanto as
+    versões das tabelas de que ela depende não mudarem.
+    """
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = max(1, maxsize)
+        self._data: "OrderedDict[str, CachedBody]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    async def get(self, key: str, tables: Sequence[str]) -> Optional[CachedBody]:
+        current = await table_versions.acurrent(tables)   # a conferência no banco roda fora do loop
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry.tables != tuple(tables) or entry.versions != current:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, entry: CachedBody) -> None:
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits,
+                    "misses": self.misses, "not_modified": self.not_modified}
+
+response_cache = ResponseCache(maxsize=int(os.getenv("HTTP_CACHE_SIZE", "512")))
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    tags = [t.strip() for t in header.split(",")]
+    bare = etag.removeprefix("W/")
+    return any(t.removeprefix("W/") == bare for t in tags)
+
+def _not_modified_since(header: str, last_modified: float) -> bool:
+    try:
+        since = parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return False
+    return int(last_modified) <= int(since)
+
+def is_not_modified(request: Request, entry: CachedBody) -> bool:
+    inm = request.headers.get("if-none-match")
+    if inm is not None:
+        return _etag_matches(inm, entry.etag)   # If-None-Match tem precedência
+    ims = request.headers.get("if-modified-since")
+    return ims is not None and _not_modified_since(ims, entry.last_modified)
+
+async def conditional_json(request: Request, tables: Sequence[str], model: Any,
+                           build: Callable[[], Awaitable[Any]], exclude_none: bool = True) -> Response:
+    """
+    GET com ETag/Last-Modified: serve do cache (ou 304) enquanto as tabelas
+    em `tables` não forem escritas; senão aguarda `build()` (ex.: adb.read),
+    valida com `model` (exclude_none por padrão, como as rotas) e guarda o corpo.
+    """
+    key = request.url.path + ("?" + request.url.query if request.url.query else "")
+    entry = await response_cache.get(key, tables)
+    if entry is None:
+        # versões lidas antes da consulta (get acabou de conferir o banco):
+        # escrita concorrente deixa a entrada velha, nunca errada
+        versions = table_versions.current(tables, refresh=False)
+        last_modified = table_versions.last_modified(tables, refresh=False)
+        adapter = type_adapter(model)
+        result = await build()
+        with profiling.serializing():
+            body = adapter.dump_json(adapter.validate_python(result), exclude_none=exclude_none)
+        etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        entry = CachedBody(body, etag, last_modified, tuple(tables), versions)
+        response_cache.put(key, entry)
+    if is_not_modified(request, entry):
+        response_cache.not_modified += 1
+        return Response(status_code=304, headers=entry.headers)
+    return Response(entry.body, media_type="application/json", headers=entry.headers)
@@ -1,27 +1,17 @@
 # api/core/init_db.py
 from __future__ import annotations
 import os
-import sqlite3
-from pathlib import Path
+from typing import Callable, Optional
+from .migrate import MIGRATIONS_PATH, migrate
 
 DB_PATH = os.getenv("DB_PATH", "app.db")
-SCHEMA_PATH = os.getenv("SCHEMA_PATH", "db/schema.sql")
 
-def init_db(db_path: str = DB_PATH, schema_path: str = SCHEMA_PATH, verbose: bool = False) -> None:
-    schema_file = Path(schema_path)
-    if not schema_file.exists():
-        raise FileNotFoundError(f"Schema não encontrado em: {schema_file.resolve()}")
-
-    conn = sqlite3.connect(db_path)
-    try:
-        conn.execute("PRAGMA foreign_keys = ON;")
-        sql = schema_file.read_text(encoding="utf-8")
-        conn.executescript(sql)
-
-        if verbose:
-            cur = conn.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name;")
-            tables = ", ".join(r[0] for r in cur.fetchall())
-            print(f"[init_db] OK: {db_path} atualizado. Tabelas: {tables}")
-    finally:
-        conn.commit()
-        conn.close()
+def init_db(db_path: str = DB_PATH, migrations_path: str = MIGRATIONS_PATH, verbose: bool = False,
+            submit: Optional[Callable] = None) -> None:
+    """
+    Deixa o banco na versão mais recente de db/migrations (ver api.core.migrate).
+    Banco já atualizado: só uma consulta em schema_version, sem DDL.
+    """
+    applied = migrate(db_path, migrations_path, submit=submit, verbose=verbose)
+    if verbose and applied:
+        print(f"[init_db] OK: {db_path} ({len(applied)} migração(ões))")
@@ -0,0 +1,223 @@
+# api/core/jobs.py
+"""
+Jobs em segundo plano, com a fila na tabela job (api.models.jobs).
+
+JOB_WORKERS threads por processo pegam o próximo job (claim, pelo escritor
+único: dois workers, mesmo em processos diferentes, nunca pegam o mesmo;
+antes, uma leitura confere se há job, para a fila vazia não gerar escritas),
+rodam o handler do tipo (register) e gravam o resultado. O handler escreve
+o arquivo com write_artifact e informa o andamento por progress(feitos,
+total), que vira no máximo uma escrita a cada JOB_HEARTBEAT_S.
+
+Um job running sem heartbeat há JOB_STALE_S (processo que caiu) volta a
+ser pego; erros de banco/disco voltam para a fila, até JOB_MAX_ATTEMPTS.
+Terminados (done/failed) somem, com o arquivo, após JOB_RETENTION_S.
+"""
+from __future__ import annotations
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional
+from .db import get_pool, get_writer
+from ..models import jobs as jobs_model
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))                        # 0 = este processo não executa jobs
+JOB_DIR = os.getenv("JOB_DIR", "exports")
+JOB_RETENTION_S = float(os.getenv("JOB_RETENTION_S", str(24 * 3600)))
+JOB_POLL_S = float(os.getenv("JOB_POLL_S", "2"))                        # fila vazia: espera até N s (ou wake())
+JOB_HEARTBEAT_S = float(os.getenv("JOB_HEARTBEAT_S", "1"))
+JOB_STALE_S = float(os.getenv("JOB_STALE_S", "120"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_CLEANUP_S = float(os.getenv("JOB_CLEANUP_S", "600"))
+
+# erros em que vale tentar de novo (banco ocupado, disco); o resto é do próprio pedido
+RETRYABLE = (sqlite3.OperationalError, OSError)
+SQLITE_DATETIME = "%Y-%m-%d %H:%M:%S"   # datetime('now')
+
+Handler = Callable[[Dict[str, Any], "Progress"], str]
+HANDLERS: Dict[str, Handler] = {}
+
+def register(kind: str, handler: Handler) -> None:
+    """handler(job, progress) -> caminho do arquivo gerado."""
+    HANDLERS[kind] = handler
+
+class Interrupted(Exception):
+    """O runner está parando; o job volta para a fila."""
+
+def _write(fn: Callable, *args):
+    return get_writer().submit(fn, *args).result()
+
+def _read(fn: Callable, *args):
+    with get_pool().connection() as db:
+        return fn(db, *args)
+
+def artifact_path(job: Dict[str, Any], ext: str) -> Path:
+    # por tentativa: uma tentativa abandonada que termine depois não apaga o arquivo da outra
+    return Path(JOB_DIR) / f"{job['kind']}-{job['id']}-{job['attempts']}.{ext}"
+
+@contextmanager
+def write_artifact(path: Path) -> Iterator[BinaryIO]:
+    """
+    Arquivo escrito num .tmp e renomeado só no fim: quem baixa nunca vê
+    um arquivo pela metade. Se der erro, o .tmp é apagado.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            yield f
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+def remove_file(path: Optional[str]) -> None:
+    if path:
+        Path(path).unlink(missing_ok=True)
+
+def expires_at(job: Dict[str, Any]) -> Optional[str]:
+    """Quando o job (e o arquivo) será removido, no formato do banco; None enquanto não terminou."""
+    if not job.get("finished_at"):
+        return None
+    finished = datetime.strptime(job["finished_at"], SQLITE_DATETIME)
+    return (finished + timedelta(seconds=JOB_RETENTION_S)).strftime(SQLITE_DATETIME)
+
+class Progress:
+    def __init__(self, job: Dict[str, Any], stop: threading.Event, interval: float = JOB_HEARTBEAT_S):
+        self.job = job
+        self.done = 0
+        self.total: Optional[int] = None
+        self._stop = stop
+        self._interval = interval
+        self._last = 0.0
+
+    def __call__(self, done: int, total: Optional[int] = None) -> None:
+        if self._stop.is_set():
+            raise Interrupted()
+        self.done = done
+        if total is not None:
+            self.total = total
+        now = time.monotonic()
+        if now - self._last >= self._interval or total is not None:
+            self._last = now
+            _write(jobs_model.heartbeat, self.job["id"], self.job["attempts"], done, total)
+
+class JobRunner:
+    def __init__(self, workers: int = JOB_WORKERS, poll: float = JOB_POLL_S):
+        self.workers = max(1, workers)
+        self.poll = max(0.05, poll)
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._running = 0
+        self._done = 0
+        self._failed = 0
+        self._last_cleanup = 0.0
+        self._last_error: Optional[str] = None
+
+    def start(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            self._stop.clear()
+            for i in range(self.workers):
+                t = threading.Thread(target=self._loop, name=f"job-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def stop(self) -> None:
+        with self._lock:
+            threads, self._threads = self._threads, []
+        self._stop.set()
+        self._wake.set()
+        for t in threads:
+            t.join()
+
+    def wake(self) -> None:
+        """Job novo na fila: não espera o próximo poll."""
+        self._wake.set()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                self._cleanup()
+                job = None
+                if _read(jobs_model.has_work, JOB_STALE_S):
+                    job = _write(jobs_model.claim, JOB_STALE_S, JOB_MAX_ATTEMPTS)
+            except Exception as exc:
+                with self._lock:
+                    self._last_error = repr(exc)
+                print(f"[jobs] fila indisponível: {exc!r}")
+                job = None
+            if job is None:
+                self._wake.wait(self.poll)
+                continue
+            self._run(job)
+
+    def _run(self, job: Dict[str, Any]) -> None:
+        jid, attempt = job["id"], job["attempts"]
+        progress = Progress(job, self._stop)
+        with self._lock:
+            self._running += 1
+        try:
+            handler = HANDLERS.get(job["kind"])
+            if handler is None:
+                raise ValueError(f"tipo de job desconhecido: {job['kind']}")
+            path = handler(job, progress)
+            if not _write(jobs_model.finish, jid, attempt, str(path), os.path.getsize(path), progress.done):
+                remove_file(str(path))   # excluído (ou retomado por outro) enquanto rodava
+            with self._lock:
+                self._done += 1
+        except Interrupted:
+            _write(jobs_model.release, jid, attempt)
+        except Exception as exc:
+            with self._lock:
+                self._failed += 1
+                self._last_error = repr(exc)
+            _write(jobs_model.fail, jid, attempt, str(exc) or repr(exc), isinstance(exc, RETRYABLE), JOB_MAX_ATTEMPTS)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def _cleanup(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if self._last_cleanup and now - self._last_cleanup < JOB_CLEANUP_S:
+                return
+            self._last_cleanup = now
+        for path in _write(jobs_model.purge, JOB_RETENTION_S):
+            remove_file(path)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": len(self._threads),
+                "running": self._running,
+                "done": self._done,
+                "failed": self._failed,
+                "last_error": self._last_error,
+            }
+
+_runner: Optional[JobRunner] = None
+_runner_lock = threading.Lock()
+
+def get_runner() -> Optional[JobRunner]:
+    """None com JOB_WORKERS=0 (a fila é atendida por outro processo)."""
+    global _runner
+    if _runner is None and JOB_WORKERS > 0:
+        with _runner_lock:
+            if _runner is None:
+                _runner = JobRunner()
+    return _runner
+
+def stop_runner() -> None:
+    global _runner
+    with _runner_lock:
+        if _runner is not None:
+            _runner.stop()
+            _runner = None
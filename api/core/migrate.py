@@ -0,0 +1,260 @@
+# api/core/migrate.py
+"""
+Migrações versionadas do schema (db/migrations/NNNN_nome.sql ou .py).
+
+- Cada migração aplicada fica registrada em schema_version (versão, nome,
+  checksum); no startup, se a maior versão do diretório já está no banco,
+  nada de DDL roda (custo constante, independe do tamanho do banco).
+- .sql: comandos executados um a um numa transação só, junto com o
+  registro em schema_version. .py: função migrate(db), idem.
+- "-- migrate: online" no topo (ou ONLINE = True no .py): só índices e
+  afins, que não mudam o que o código lê. Cada comando vira uma transação
+  curta, e no servidor elas entram na fila do escritor único depois do
+  startup — a API sobe e atende enquanto o índice é construído (leituras
+  seguem em WAL; escritas esperam na fila). Use IF NOT EXISTS: se cair no
+  meio, a migração roda de novo do começo.
+- As demais (tabelas, colunas, triggers) são bloqueantes: no startup todas
+  são aplicadas antes de a API atender, mesmo as de número maior que uma
+  online pendente. Por isso uma migração bloqueante não pode depender do
+  que uma online cria.
+
+Linha de comando:
+    python -m api.core.migrate status
+    python -m api.core.migrate up [--dry-run]
+"""
+from __future__ import annotations
+import hashlib
+import importlib.util
+import os
+import re
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from .db import connect, transaction
+
+MIGRATIONS_PATH = os.getenv("MIGRATIONS_PATH", "db/migrations")
+ANALYSIS_LIMIT = int(os.getenv("DB_ANALYSIS_LIMIT", "1000"))
+
+_NAME = re.compile(r"^(\d+)_(\w+)\.(sql|py)$")
+_ONLINE = re.compile(r"^--\s*migrate:\s*online\s*$", re.I | re.M)
+
+@dataclass
+class Migration:
+    version: int
+    name: str
+    path: Path
+
+    @property
+    def kind(self) -> str:
+        return self.path.suffix[1:]
+
+    def source(self) -> str:
+        return self.path.read_text(encoding="utf-8")
+
+    def checksum(self) -> str:
+        return hashlib.sha256(self.path.read_bytes()).hexdigest()[:16]
+
+    @property
+    def online(self) -> bool:
+        if self.kind == "sql":
+            return bool(_ONLINE.search(self.source()))
+        return bool(getattr(self._module(), "ONLINE", False))
+
+    def steps(self) -> List[Callable]:
+        """Funções fn(db) a executar, em ordem."""
+        if self.kind == "py":
+            return [self._module().migrate]
+        return [lambda db, s=s: db.execute(s) for s in split_sql(self.source())]
+
+    def statements(self) -> List[str]:
+        return split_sql(self.source()) if self.kind == "sql" else [f"{self.path.name}: migrate(db)"]
+
+    def _module(self):
+        spec = importlib.util.spec_from_file_location(f"migration_{self.version:04d}", self.path)
+        if spec is None or spec.loader is None:
+            raise RuntimeError(f"Não foi possível carregar a migração {self.path}")
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+def discover(path: str = MIGRATIONS_PATH) -> List[Migration]:
+    folder = Path(path)
+    if not folder.is_dir():
+        raise FileNotFoundError(f"Diretório de migrações não encontrado: {folder.resolve()}")
+    found: Dict[int, Migration] = {}
+    for f in folder.iterdir():
+        m = _NAME.match(f.name)
+        if not m:
+            continue
+        version = int(m.group(1))
+        if version in found:
+            raise RuntimeError(f"Migração {version} duplicada: {found[version].path.name} e {f.name}")
+        found[version] = Migration(version, m.group(2), f)
+    return [found[v] for v in sorted(found)]
+
+def split_sql(sql: str) -> List[str]:
+    """Quebra um script em comandos (entende BEGIN...END de trigger)."""
+    statements, buf = [], ""
+    for line in sql.splitlines(keepends=True):
+        buf += line
+        if sqlite3.complete_statement(buf):
+            statements.append(buf.strip())
+            buf = ""
+    if buf.strip() and not all(l.strip().startswith("--") or not l.strip() for l in buf.splitlines()):
+        statements.append(buf.strip())
+    return statements
+
+def ensure_version_table(db) -> None:
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS schema_version ("
+        " version INTEGER PRIMARY KEY,"
+        " name TEXT NOT NULL,"
+        " checksum TEXT NOT NULL,"
+        " applied_at TEXT NOT NULL DEFAULT (datetime('now')),"
+        " duration_ms REAL)"
+    )
+
+def applied_versions(db) -> Dict[int, str]:
+    try:
+        return {r[0]: r[1] for r in db.execute("SELECT version, checksum FROM schema_version").fetchall()}
+    except sqlite3.OperationalError:   # banco anterior às migrações
+        return {}
+
+def pending(db, migrations: List[Migration]) -> List[Migration]:
+    applied = applied_versions(db)
+    return [m for m in migrations if m.version not in applied]
+
+def analyze(db) -> None:
+    """
+    Estatísticas para o planner (sqlite_stat1): sem elas ele não sabe que a
+    pessoa X tem 2% das mídias e escolhe mal entre o índice de pessoa e o de
+    data. analysis_limit amostra cada índice, então é rápido mesmo com milhões.
+    """
+    db.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+    db.execute("ANALYZE")
+
+def _record(db, m: Migration, started: float) -> None:
+    db.execute(
+        "INSERT INTO schema_version(version, name, checksum, duration_ms) VALUES(?,?,?,?)",
+        (m.version, m.name, m.checksum(), round((time.perf_counter() - started) * 1000, 3)),
+    )
+
+def apply(db, m: Migration) -> bool:
+    """Aplica `m` numa transação; False se outro processo já aplicou."""
+    started = time.perf_counter()
+    with transaction(db):
+        if m.version in applied_versions(db):   # rechecado já com o lock de escrita
+            return False
+        for step in m.steps():
+            step(db)
+        _record(db, m, started)
+    return True
+
+def online_jobs(m: Migration) -> List[Callable]:
+    """
+    A migração online como jobs fn(db) independentes: um por comando, e o
+    último registra a versão e atualiza as estatísticas. Se um comando
+    falha, os seguintes não rodam e a versão não é registrada (o próximo
+    startup tenta de novo).
+    """
+    state = {"started": None, "failed": False}
+    steps = m.steps()
+
+    def guarded(step):
+        def job(db):
+            if state["failed"] or m.version in applied_versions(db):
+                return
+            state["started"] = state["started"] or time.perf_counter()
+            try:
+                step(db)
+            except Exception as exc:
+                state["failed"] = True
+                print(f"[migrate] {m.version:04d}_{m.name} falhou: {exc!r}")
+                raise
+        return job
+
+    def finish(db):
+        if not state["failed"] and m.version not in applied_versions(db):
+            _record(db, m, state["started"] or time.perf_counter())
+            analyze(db)
+
+    return [guarded(s) for s in steps] + [finish]
+
+def migrate(db_path: Optional[str] = None, path: str = MIGRATIONS_PATH, *, dry_run: bool = False,
+            submit: Optional[Callable] = None, verbose: bool = False) -> List[Migration]:
+    """
+    Aplica as migrações pendentes; devolve as que estavam pendentes.
+    Com `submit` (ex.: db.get_writer().submit), as bloqueantes rodam aqui,
+    todas, e só as online vão para a fila, sem esperar: quando isto
+    retorna, o schema que o código lê está completo. Sem `submit`, tudo
+    roda aqui mesmo, na ordem.
+    """
+    migrations = discover(path)
+    conn = connect(db_path)
+    try:
+        todo = pending(conn, migrations)
+        if not todo or dry_run:   # caminho rápido: nenhum DDL
+            if verbose:
+                print(f"[migrate] schema na versão {max(applied_versions(conn), default=0)}; {len(todo)} pendente(s)")
+            return todo
+        with transaction(conn):
+            ensure_version_table(conn)
+        deferred = [m for m in todo if m.online] if submit is not None else []
+        sync_done = False
+        for m in todo:
+            if m in deferred:
+                continue
+            if apply(conn, m):
+                sync_done = True
+                if verbose:
+                    print(f"[migrate] {m.version:04d}_{m.name} aplicada")
+        if sync_done:
+            with transaction(conn):
+                analyze(conn)
+        if submit is not None:
+            for m in deferred:
+                for job in online_jobs(m):
+                    submit(job)
+                if verbose:
+                    print(f"[migrate] {m.version:04d}_{m.name} enfileirada")
+        return todo
+    finally:
+        conn.close()
+
+def status(db_path: Optional[str] = None, path: str = MIGRATIONS_PATH) -> List[Dict]:
+    conn = connect(db_path)
+    try:
+        applied = applied_versions(conn)
+    finally:
+        conn.close()
+    out = []
+    for m in discover(path):
+        state = "pendente"
+        if m.version in applied:
+            state = "aplicada" if applied[m.version] == m.checksum() else "aplicada (arquivo alterado)"
+        out.append({"version": m.version, "name": m.name, "online": m.online, "state": state})
+    return out
+
+if __name__ == "__main__":
+    import sys
+
+    args = sys.argv[1:]
+    cmd = args[0] if args and not args[0].startswith("--") else "status"
+    if cmd == "status":
+        for s in status():
+            flag = " (online)" if s["online"] else ""
+            print(f"{s['version']:04d}_{s['name']}{flag}: {s['state']}")
+    elif cmd == "up":
+        dry = "--dry-run" in args
+        todo = migrate(dry_run=dry, verbose=True)
+        if dry:
+            for m in todo:
+                print(f"-- {m.version:04d}_{m.name}{' (online)' if m.online else ''}")
+                for stmt in m.statements():
+                    print(stmt if stmt.endswith(";") else stmt + ";")
+            print(f"[migrate] dry-run: {len(todo)} migração(ões) seriam aplicadas")
+    else:
+        print("uso: python -m api.core.migrate [status|up] [--dry-run]")
+        sys.exit(2)
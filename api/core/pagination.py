@@ -0,0 +1,31 @@
+# api/core/pagination.py
+import base64
+import json
+from typing import Any, Tuple
+from fastapi import HTTPException
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+def encode_cursor(*key: Any) -> str:
+    """Cursor opaco para paginação por chave, ex.: (published_at, id)."""
+    raw = json.dumps(list(key), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, *types: type) -> Tuple[Any, ...]:
+    """Decodifica e confere os tipos da chave; cursor estranho vira 400."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value: Any = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(value, list) or len(value) != len(types):
+            raise ValueError(value)
+        key = []
+        for v, t in zip(value, types):
+            if t is float and isinstance(v, int) and not isinstance(v, bool):
+                v = float(v)
+            if not isinstance(v, t) or isinstance(v, bool):
+                raise ValueError(value)
+            key.append(v)
+        return tuple(key)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
@@ -0,0 +1,240 @@
+# api/core/profiling.py
+"""
+Perfil por request e métricas no formato Prometheus.
+
+O middleware abre um RequestProfile num ContextVar; api.core.db anota nele
+cada comando SQL (tempo, linhas lidas) e adb/httpcache o tempo de
+serialização. No fim do request:
+  - Server-Timing: total, sql (com a contagem), ser e rows;
+  - histogramas por rota em /metrics;
+  - requests acima de PROFILE_SLOW_MS vão para um buffer circular com a
+    lista de comandos (GET /metrics/slow).
+
+Os executores de banco rodam em outras threads: adb e o WriteCoordinator
+levam o contexto junto (contextvars.copy_context / use()).
+"""
+from __future__ import annotations
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+PROFILING = os.getenv("PROFILING", "1") not in ("0", "false", "no")
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "500"))
+PROFILE_SLOW_BUFFER = int(os.getenv("PROFILE_SLOW_BUFFER", "100"))
+PROFILE_MAX_QUERIES = int(os.getenv("PROFILE_MAX_QUERIES", "100"))   # comandos guardados por request
+
+# segundos; o padrão do client Prometheus estendido até 10 s
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500, 1000)
+
+@dataclass
+class RequestProfile:
+    started: float = field(default_factory=time.perf_counter)
+    sql_count: int = 0
+    sql_time: float = 0.0
+    rows: int = 0
+    serialize_time: float = 0.0
+    queries: List[Tuple[str, float]] = field(default_factory=list)
+    dropped: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def sql(self, statement: str, elapsed: float) -> None:
+        with self._lock:
+            self.sql_count += 1
+            self.sql_time += elapsed
+            if len(self.queries) < PROFILE_MAX_QUERIES:
+                self.queries.append((statement, elapsed))
+            else:
+                self.dropped += 1
+
+    def fetched(self, rows: int, elapsed: float) -> None:
+        with self._lock:
+            self.rows += rows
+            self.sql_time += elapsed
+
+    def serialized(self, elapsed: float) -> None:
+        with self._lock:
+            self.serialize_time += elapsed
+
+_current: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+
+def current() -> Optional[RequestProfile]:
+    return _current.get()
+
+@contextmanager
+def use(profile: Optional[RequestProfile]) -> Iterator[None]:
+    """Ativa `profile` nesta thread (ex.: job do escritor único, que não herda o contexto)."""
+    token = _current.set(profile)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+@contextmanager
+def serializing() -> Iterator[None]:
+    p = _current.get()
+    if p is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        p.serialized(time.perf_counter() - t0)
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        i = 0
+        while i < len(self.buckets) and value > self.buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+class Metrics:
+    """Histogramas por (método, rota) e o buffer dos requests lentos."""
+
+    def __init__(self, slow_ms: float = PROFILE_SLOW_MS, slow_buffer: int = PROFILE_SLOW_BUFFER):
+        self.slow_ms = slow_ms
+        self._lock = threading.Lock()
+        self._routes: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._status: Dict[Tuple[str, str, int], int] = {}
+        self.slow: Deque[Dict[str, Any]] = deque(maxlen=max(1, slow_buffer))
+
+    def record(self, method: str, route: str, status: int, total: float, p: RequestProfile,
+               path: str = "") -> None:
+        key = (method, route)
+        with self._lock:
+            r = self._routes.get(key)
+            if r is None:
+                r = self._routes[key] = {
+                    "duration": Histogram(DURATION_BUCKETS),
+                    "sql_duration": Histogram(DURATION_BUCKETS),
+                    "sql_statements": Histogram(COUNT_BUCKETS),
+                    "rows": 0,
+                    "serialize": 0.0,
+                }
+            r["duration"].observe(total)
+            r["sql_duration"].observe(p.sql_time)
+            r["sql_statements"].observe(p.sql_count)
+            r["rows"] += p.rows
+            r["serialize"] += p.serialize_time
+            skey = (method, route, status)
+            self._status[skey] = self._status.get(skey, 0) + 1
+            if total * 1000 >= self.slow_ms:
+                self.slow.append({
+                    "at": time.time(),
+                    "method": method,
+                    "path": path,
+                    "route": route,
+                    "status": status,
+                    "total_ms": round(total * 1000, 3),
+                    "sql_ms": round(p.sql_time * 1000, 3),
+                    "sql_count": p.sql_count,
+                    "rows": p.rows,
+                    "serialize_ms": round(p.serialize_time * 1000, 3),
+                    "queries": [{"sql": " ".join(q.split()), "ms": round(t * 1000, 3)} for q, t in p.queries],
+                    "queries_dropped": p.dropped,
+                })
+
+    def render(self) -> str:
+        """Texto no formato de exposição do Prometheus."""
+        out: List[str] = []
+        with self._lock:
+            out += ["# HELP http_requests_total Requests por rota e status.", "# TYPE http_requests_total counter"]
+            for (method, route, status), n in sorted(self._status.items()):
+                out.append(f'http_requests_total{{method="{method}",route="{route}",status="{status}"}} {n}')
+            for name, metric, help_ in (
+                ("http_request_duration_seconds", "duration", "Tempo do request até o início da resposta."),
+                ("http_request_sql_duration_seconds", "sql_duration", "Tempo em SQL (execute + fetch) por request."),
+                ("http_request_sql_statements", "sql_statements", "Comandos SQL por request."),
+            ):
+                out += [f"# HELP {name} {help_}", f"# TYPE {name} histogram"]
+                for (method, route), r in sorted(self._routes.items()):
+                    _histogram_lines(out, name, f'method="{method}",route="{route}"', r[metric])
+            for name, metric, help_ in (
+                ("http_request_rows_total", "rows", "Linhas lidas do banco."),
+                ("http_request_serialize_seconds_total", "serialize", "Tempo serializando respostas JSON."),
+            ):
+                out += [f"# HELP {name} {help_}", f"# TYPE {name} counter"]
+                for (method, route), r in sorted(self._routes.items()):
+                    out.append(f'{name}{{method="{method}",route="{route}"}} {r[metric]}')
+        return "\n".join(out) + "\n"
+
+    def slow_requests(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(reversed(self.slow))
+
+def _histogram_lines(out: List[str], name: str, labels: str, h: Histogram) -> None:
+    cumulative = 0
+    for bound, n in zip(h.buckets, h.counts):
+        cumulative += n
+        out.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    out.append(f'{name}_bucket{{{labels},le="+Inf"}} {h.count}')
+    out.append(f"{name}_sum{{{labels}}} {h.sum}")
+    out.append(f"{name}_count{{{labels}}} {h.count}")
+
+metrics = Metrics()
+
+def server_timing(total: float, p: RequestProfile) -> str:
+    return ", ".join((
+        f"total;dur={total * 1000:.2f}",
+        f'sql;dur={p.sql_time * 1000:.2f};desc="comandos={p.sql_count}"',
+        f"ser;dur={p.serialize_time * 1000:.2f}",
+        f'rows;desc="{p.rows}"',
+    ))
+
+class ProfilingMiddleware:
+    """
+    Middleware ASGI puro (sem o custo da BaseHTTPMiddleware): abre o perfil,
+    mede até o início da resposta e escreve o Server-Timing. Registrar por
+    último, para ficar por fora de todos e medir também os 500.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        p = RequestProfile()
+        token = _current.set(p)
+        recorded = False
+
+        def finish(status: int) -> float:
+            nonlocal recorded
+            recorded = True
+            total = time.perf_counter() - p.started
+            # o roteador grava a rota casada no próprio scope
+            route = getattr(scope.get("route"), "path", "(sem rota)")
+            metrics.record(scope["method"], route, status, total, p, scope["path"])
+            return total
+
+        async def send_profiled(message):
+            if message["type"] == "http.response.start" and not recorded:
+                total = finish(message["status"])
+                headers = list(message.get("headers", ()))
+                headers.append((b"server-timing", server_timing(total, p).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_profiled)
+        except BaseException:
+            if not recorded:
+                finish(500)
+            raise
+        finally:
+            _current.reset(token)
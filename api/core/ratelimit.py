@@ -0,0 +1,136 @@
+# api/core/ratelimit.py
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Hashable, Tuple
+from fastapi import HTTPException
+
+class SlidingWindowLimiter:
+    """
+    Conta eventos por chave numa janela deslizante de `window` segundos.
+    Chaves que não voltam (usuários inventados, IPs de passagem) saem numa
+    varredura a cada `window` segundos; acima de `max_keys`, as que estão
+    há mais tempo sem evento são descartadas.
+    """
+
+    def __init__(self, limit: int, window: float, clock: Callable[[], float] = time.monotonic,
+                 max_keys: int = 100_000):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max(1, max_keys)
+        self._clock = clock
+        self._events: Dict[Hashable, Deque[float]] = {}
+        self._lock = threading.Lock()
+        self._next_sweep = clock() + window
+        self.evicted = 0
+
+    def _prune(self, key: Hashable, now: float) -> Deque[float]:
+        q = self._events.get(key)
+        if q is None:
+            return deque()
+        while q and q[0] <= now - self.window:
+            q.popleft()
+        if not q:
+            del self._events[key]
+        return q
+
+    def _sweep(self, now: float) -> None:
+        for key in list(self._events):
+            self._prune(key, now)
+        self._next_sweep = now + self.window
+        if len(self._events) >= self.max_keys:
+            # deixa folga (10%) para não varrer de novo a cada chave nova
+            keep = self.max_keys * 9 // 10
+            oldest = sorted(self._events, key=lambda k: self._events[k][-1])
+            for key in oldest[:len(oldest) - keep]:
+                del self._events[key]
+            self.evicted += max(0, len(oldest) - keep)
+
+    def retry_after(self, key: Hashable) -> float:
+        """0 se ainda cabe; senão, segundos até liberar uma vaga."""
+        now = self._clock()
+        with self._lock:
+            q = self._prune(key, now)
+            if len(q) < self.limit:
+                return 0.0
+            return max(0.0, q[0] + self.window - now)
+
+    def hit(self, key: Hashable) -> float:
+        """Registra um evento; devolve o instante dele (para discard)."""
+        now = self._clock()
+        with self._lock:
+            if now >= self._next_sweep or len(self._events) >= self.max_keys:
+                self._sweep(now)
+            self._prune(key, now)
+            self._events.setdefault(key, deque()).append(now)
+        return now
+
+    def discard(self, key: Hashable, stamp: float) -> None:
+        """Desfaz o hit registrado em `stamp` (se ainda estiver na janela)."""
+        with self._lock:
+            q = self._events.get(key)
+            if q is not None and stamp in q:
+                q.remove(stamp)
+                if not q:
+                    del self._events[key]
+
+    def reset(self, key: Hashable) -> None:
+        with self._lock:
+            self._events.pop(key, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._events)
+
+class LoginRateLimiter:
+    """
+    Limita tentativas de login que falharam, por usuário e por IP.
+    check() já conta a tentativa, antes do bcrypt e de forma atômica: com
+    muitas tentativas simultâneas, só as que cabem no limite chegam ao
+    bcrypt. Login certo (success) ou que não chegou a conferir a senha
+    (release) devolve a vaga.
+    """
+
+    def __init__(self, per_user: int, per_ip: int, window: float, max_keys: int = 100_000):
+        self.by_user = SlidingWindowLimiter(per_user, window, max_keys=max_keys)
+        self.by_ip = SlidingWindowLimiter(per_ip, window, max_keys=max_keys)
+        self._lock = threading.Lock()
+        self.blocked = 0
+
+    def check(self, username: str, ip: str) -> Tuple[float, float]:
+        """Reserva a tentativa (conta como falha até o success); 429 se não cabe mais."""
+        with self._lock:
+            wait = max(self.by_user.retry_after(username), self.by_ip.retry_after(ip))
+            if wait > 0:
+                self.blocked += 1
+                raise HTTPException(
+                    status_code=429,
+                    detail="Muitas tentativas de login; tente novamente mais tarde",
+                    headers={"Retry-After": str(int(wait) + 1)},
+                )
+            return self.by_user.hit(username), self.by_ip.hit(ip)
+
+    def release(self, username: str, ip: str, attempt: Tuple[float, float]) -> None:
+        """A tentativa não chegou a conferir a senha (503, erro): não conta."""
+        self.by_user.discard(username, attempt[0])
+        self.by_ip.discard(ip, attempt[1])
+
+    def success(self, username: str, ip: str, attempt: Tuple[float, float]) -> None:
+        self.by_user.reset(username)
+        self.by_ip.discard(ip, attempt[1])
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "blocked": self.blocked,
+            "tracked_users": len(self.by_user),
+            "tracked_ips": len(self.by_ip),
+            "evicted": self.by_user.evicted + self.by_ip.evicted,
+        }
+
+login_limiter = LoginRateLimiter(
+    per_user=int(os.getenv("LOGIN_MAX_FAILURES_PER_USER", "5")),
+    per_ip=int(os.getenv("LOGIN_MAX_FAILURES_PER_IP", "20")),
+    window=float(os.getenv("LOGIN_FAILURE_WINDOW", "900")),
+    max_keys=int(os.getenv("LOGIN_LIMITER_MAX_KEYS", "100000")),
+)
@@ -1,20 +1,93 @@
 # api/core/security.py
 import os, hmac, hashlib, base64, time, json
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException
 from passlib.hash import bcrypt
 
 APP_SECRET = os.getenv("APP_SECRET", "change-me-please")
+# "1": a sessão carrega id/username/role/person_id e require_auth não consulta o banco
+# (mudanças no usuário só valem no próximo login)
+SESSION_EMBED_CLAIMS = os.getenv("SESSION_EMBED_CLAIMS", "0") == "1"
+USER_CLAIMS = ("id", "username", "role", "person_id")
 
 # Senhas
+# custo do bcrypt; ao mudar, os hashes antigos são refeitos no próximo login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+_bcrypt = bcrypt.using(rounds=BCRYPT_ROUNDS)
+
 def hash_password(password: str) -> str:
-    return bcrypt.hash(password)
+    return _bcrypt.hash(password)
 
 def verify_password(password: str, password_hash: str) -> bool:
     try:
-        return bcrypt.verify(password, password_hash)
+        return _bcrypt.verify(password, password_hash)
     except Exception:
         return False
 
+def needs_rehash(password_hash: str) -> bool:
+    try:
+        return _bcrypt.needs_update(password_hash)
+    except Exception:
+        return False
+
+class HashExecutor:
+    """
+    Executor dedicado ao bcrypt, fora do threadpool do Starlette: no máximo
+    `workers` hashes em paralelo e `max_pending` na fila; acima disso, 503.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.max_seen = 0
+
+    async def run(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(status_code=503, detail="Servidor ocupado, tente novamente")
+            self.pending += 1
+            self.max_seen = max(self.max_seen, self.pending)
+        try:
+            return await asyncio.wrap_future(self._pool.submit(fn, *args))
+        finally:
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "queued": max(0, self.pending - self.workers),
+                "max_pending_seen": self.max_seen,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+hash_executor = HashExecutor(
+    workers=int(os.getenv("HASH_WORKERS", "2")),
+    max_pending=int(os.getenv("HASH_MAX_PENDING", "32")),
+)
+
 # Sessão (HMAC)
+_SIG_LEN = hashlib.sha256().digest_size
+
+def session_data(user: dict) -> dict:
+    data = {"uid": user["id"], "role": user["role"]}
+    if SESSION_EMBED_CLAIMS:
+        data["user"] = {k: user.get(k) for k in USER_CLAIMS}
+    return data
+
 def sign_session(data: dict, max_age_seconds: int = 60 * 60 * 8) -> str:
     payload = {"d": data, "exp": int(time.time()) + max_age_seconds}
     raw = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode()
@@ -24,7 +97,10 @@ def sign_session(data: dict, max_age_seconds: int = 60 * 60 * 8) -> str:
 def verify_session(token: str) -> dict | None:
     try:
         blob = base64.urlsafe_b64decode(token.encode())
-        raw, sig = blob.rsplit(b".", 1)
+        # a assinatura tem tamanho fixo e pode conter b"."; não dá para usar rsplit
+        raw, sep, sig = blob[:-_SIG_LEN - 1], blob[-_SIG_LEN - 1:-_SIG_LEN], blob[-_SIG_LEN:]
+        if sep != b".":
+            return None
         expected = hmac.new(APP_SECRET.encode(), raw, hashlib.sha256).digest()
         if not hmac.compare_digest(sig, expected):
             return None
@@ -0,0 +1,187 @@
+# api/core/versions.py
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+from .db import connect
+
+# 0 = só o contador deste processo (um worker só)
+CACHE_COHERENCE = os.getenv("CACHE_COHERENCE", "1") not in ("0", "false", "no")
+# >0: confere o banco no máximo a cada N ms (cache pode ficar até N ms velho em outro worker)
+VERSION_CHECK_MS = float(os.getenv("VERSION_CHECK_MS", "0"))
+# threads (cada uma com a sua conexão só-leitura) que conferem as versões para o event loop
+VERSION_CHECK_WORKERS = int(os.getenv("VERSION_CHECK_WORKERS", "2"))
+
+# versão = maior seq da entidade no change_log (0004); as demais, tabela table_version (0007)
+CHANGE_LOG_TABLES = ("media", "person", "line", "system")
+SHARED_VERSIONS_SQL = " UNION ALL ".join(
+    [f"SELECT * FROM (SELECT '{t}', seq, CAST(strftime('%s', changed_at) AS REAL) FROM change_log "
+     f"WHERE entity = '{t}' ORDER BY seq DESC LIMIT 1)" for t in CHANGE_LOG_TABLES]
+    + ["SELECT name, version, CAST(strftime('%s', changed_at) AS REAL) FROM table_version"]
+)
+
+class TableVersions:
+    """
+    Contador de versão por tabela. Quem guarda algo derivado do banco anota
+    as versões que viu e compara depois para saber se ficou velho.
+
+    Com vários workers, o contador local (bump, chamado pelos caminhos de
+    escrita em api/models/*) não vê as escritas dos outros processos. Por
+    isso a versão das tabelas rastreadas vem do próprio banco: cada thread
+    que confere tem a sua conexão só-leitura e consulta PRAGMA data_version,
+    que muda quando qualquer outra conexão (de qualquer processo) faz
+    commit; só então as versões são relidas (uma consulta pelos índices).
+    Sem commit novo, o custo é o do PRAGMA, e nenhum lock fica preso
+    enquanto o SQLite roda.
+
+    No event loop use acurrent(): a conferência roda num executor próprio
+    (VERSION_CHECK_WORKERS threads), não na thread do loop.
+    """
+
+    def __init__(self, shared: bool = CACHE_COHERENCE, check_ms: float = VERSION_CHECK_MS,
+                 db_path: Optional[str] = None, workers: int = VERSION_CHECK_WORKERS):
+        self._lock = threading.Lock()   # só estado em memória; nunca em volta do SQLite
+        self._versions: Dict[str, int] = {}
+        self._changed_at: Dict[str, float] = {}
+        self._started_at = time.time()
+        self.shared = shared
+        self.check_interval = max(0.0, check_ms) / 1000
+        self.db_path = db_path
+        self.workers = max(1, workers)
+        self._local = threading.local()
+        self._conns: List[sqlite3.Connection] = []
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._shared_versions: Dict[str, Tuple[int, Optional[float]]] = {}
+        self._checked_at = 0.0
+        self._retry_at = 0.0
+        self.checks = 0
+        self.reloads = 0
+        self.errors = 0
+
+    def bump(self, *tables: str) -> None:
+        now = time.time()
+        with self._lock:
+            for t in tables:
+                self._versions[t] = self._versions.get(t, 0) + 1
+                self._changed_at[t] = now
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = connect(self.db_path, readonly=True)
+            self._local.conn = conn
+            self._local.data_version = None
+            with self._lock:
+                self._conns.append(conn)
+        return conn
+
+    def _drop_conn(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            with self._lock:
+                if conn in self._conns:
+                    self._conns.remove(conn)
+            conn.close()
+
+    def refresh(self) -> None:
+        """Relê as versões do banco se houve commit desde a última conferência desta thread."""
+        if not self.shared:
+            return
+        now = time.monotonic()
+        if now < self._retry_at or (self.check_interval and now - self._checked_at < self.check_interval):
+            return
+        self._checked_at = now
+        try:
+            conn = self._conn()
+            self.checks += 1
+            # data_version só se compara com ele mesmo na mesma conexão: por isso, por thread
+            data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == self._local.data_version:
+                return
+            rows = conn.execute(SHARED_VERSIONS_SQL).fetchall()
+        except sqlite3.Error:
+            # banco ainda não criado/migrado: fica o contador local e tenta de novo depois
+            self.errors += 1
+            self._drop_conn()
+            self._retry_at = now + 1.0
+            return
+        self._local.data_version = data_version
+        # entidade ainda sem linha no change_log: versão 0 (não cai no contador local)
+        fresh = {t: (0, None) for t in CHANGE_LOG_TABLES}
+        fresh.update((name, (version, changed_at)) for name, version, changed_at in rows)
+        with self._lock:
+            # duas threads relendo juntas: as versões só crescem, fica a maior de cada tabela
+            merged = dict(self._shared_versions)
+            for t, value in fresh.items():
+                if t not in merged or value[0] >= merged[t][0]:
+                    merged[t] = value
+            self._shared_versions = merged
+            self.reloads += 1
+
+    async def acurrent(self, tables: Iterable[str]) -> Tuple[int, ...]:
+        """current() para o event loop: a conferência no banco roda fora dele."""
+        if self.shared:
+            await asyncio.get_running_loop().run_in_executor(self._executor(), self.refresh)
+        return self.current(tables, refresh=False)
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="db-versions")
+        return self._pool
+
+    def current(self, tables: Iterable[str], refresh: bool = True) -> Tuple[int, ...]:
+        if refresh:
+            self.refresh()
+        with self._lock:
+            return tuple(
+                self._shared_versions[t][0] if t in self._shared_versions else self._versions.get(t, 0)
+                for t in tables
+            )
+
+    def last_modified(self, tables: Iterable[str], refresh: bool = True) -> float:
+        if refresh:
+            self.refresh()
+        with self._lock:
+            out = []
+            for t in tables:
+                if t in self._shared_versions:
+                    out.append(self._shared_versions[t][1] or self._started_at)
+                else:
+                    out.append(self._changed_at.get(t, self._started_at))
+            return max(out, default=self._started_at)
+
+    def close(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+            conns, self._conns = self._conns, []
+            self._shared_versions = {}
+        if pool is not None:
+            pool.shutdown(wait=True)
+        for conn in conns:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "shared": self.shared and bool(self._shared_versions),
+                "check_ms": self.check_interval * 1000,
+                "connections": len(self._conns),
+                "checks": self.checks,
+                "reloads": self.reloads,
+                "errors": self.errors,
+            }
+
+table_versions = TableVersions()
+
+def bump_version(*tables: str) -> None:
+    table_versions.bump(*tables)
@@ -1,5 +1,6 @@
 # api/main.py
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 try:
@@ -8,8 +9,10 @@ try:
 except Exception:
     pass
 
+from .core.deps import require_auth
 from .core.handlers import register_exception_handlers
-from .routers import people, lines, systems, media, reports, auth, users
+from .core.profiling import PROFILING, ProfilingMiddleware, metrics
+from .routers import people, lines, systems, media, reports, auth, users, changes
 
 app = FastAPI(title="Mídias Digitais - MVP")
 register_exception_handlers(app)
@@ -22,12 +25,74 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# por último = mais externo: Server-Timing e histogramas por rota (PROFILING=0 desliga)
+if PROFILING:
+    app.add_middleware(ProfilingMiddleware)
 
 # init DB no startup (como antes)
 @app.on_event("startup")
 def _startup():
+    from .core.db import get_snapshotter, get_writer
     from .core.init_db import init_db
-    init_db(verbose=False)
+    # migrações online (índices) entram na fila do escritor e terminam com a API no ar
+    init_db(verbose=False, submit=get_writer().submit)
+    snap = get_snapshotter()   # só com DB_SNAPSHOT_PATH
+    if snap is not None:
+        snap.start()
+    from .core.jobs import get_runner
+    runner = get_runner()   # JOB_WORKERS=0: a fila fica para outro processo
+    if runner is not None:
+        runner.start()
+
+@app.on_event("shutdown")
+def _shutdown():
+    from .core import adb
+    from .core.db import close_pool, close_writer, stop_snapshots
+    from .core.jobs import stop_runner
+    from .core.versions import table_versions
+    stop_runner()   # antes do escritor: o job interrompido volta para a fila por ele
+    stop_snapshots()
+    adb.close()
+    close_writer()
+    close_pool()
+    table_versions.close()
+
+# health check + métricas (pool de conexões, snapshot, jobs, cache de usuários, bcrypt, login)
+@app.get("/health", tags=["health"])
+def health():
+    from .core import adb
+    from .core.cache import user_cache
+    from .core.db import get_pool, get_snapshotter
+    from .core.httpcache import response_cache
+    from .core.jobs import get_runner
+    from .core.ratelimit import login_limiter
+    from .core.security import hash_executor
+    from .core.versions import table_versions
+    pool = get_pool()
+    snap = get_snapshotter()
+    runner = get_runner()
+    return {
+        "ok": pool.check_health(),
+        "db_pool": pool.stats(),
+        "db_executors": adb.stats(),
+        "db_snapshot": snap.stats() if snap is not None else None,
+        "jobs": runner.stats() if runner is not None else None,
+        "user_cache": user_cache.stats(),
+        "response_cache": response_cache.stats(),
+        "table_versions": table_versions.stats(),
+        "password_hashing": hash_executor.stats(),
+        "login_limiter": login_limiter.stats(),
+    }
+
+# formato de exposição do Prometheus; histogramas por rota
+@app.get("/metrics", tags=["health"], response_class=PlainTextResponse)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+# requests acima de PROFILE_SLOW_MS, mais recentes primeiro, com os comandos SQL
+@app.get("/metrics/slow", tags=["health"])
+def slow_requests(user=Depends(require_auth)):
+    return {"threshold_ms": metrics.slow_ms, "items": metrics.slow_requests()}
 
 # rotas
 app.include_router(auth.router)
@@ -37,3 +102,4 @@ app.include_router(lines.router)
 app.include_router(systems.router)
 app.include_router(media.router)
 app.include_router(reports.router)
+app.include_router(changes.router)
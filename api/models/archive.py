@@ -0,0 +1,356 @@
+# api/models/archive.py
+"""
+Arquivo frio de mídias antigas (db/migrations/0008_media_archive.sql).
+
+Mídias publicadas antes de um corte saem de media/media_person (o banco
+quente, com os índices e a FTS que toda escrita mantém) e vão para um
+banco por ano, ARCHIVE_DIR/media_AAAA.db, com as mesmas colunas e os
+índices das listagens. media.list_all e derivados (/media, /reports/by-person,
+exportações) anexam com ATTACH só os anos que date_from/date_to alcançam e
+fazem UNION ALL com o quente; sem período, todos os anos arquivados. Cada
+conexão mantém os anos anexados até precisar da vaga (o SQLite aceita
+MAX_ATTACHED por conexão, 10 no padrão).
+
+O que muda para quem usa a API:
+  - a busca textual (q=) só vê o quente: o rank BM25 de índices FTS
+    diferentes não se compara;
+  - mídia arquivada é só leitura: PUT/PATCH/DELETE dão 409 (restaure antes);
+  - excluir pessoa/linha/sistema não alcança o arquivo (as leituras trazem
+    o id antigo); o restore aplica o ON DELETE que faltou;
+  - período que alcança mais anos arquivados que o limite do SQLite dá 400.
+O resumo (media_summary) e o feed de alterações ficam como estavam: mover
+de banco não muda o que a API devolve.
+
+Linha de comando (lotes de --chunk mídias, transações curtas, a API segue
+escrevendo entre um lote e outro; pode ser interrompido e rodado de novo).
+O restore devolve lote a lote, na ordem em que foram arquivados:
+    python -m api.models.archive archive [--before AAAA-MM-DD] [--chunk 1000] [--pause 0.05]
+    python -m api.models.archive restore [--year AAAA] [--pause 0.05]
+    python -m api.models.archive status
+Sem --before, o corte é hoje menos ARCHIVE_KEEP_DAYS.
+"""
+import json
+import os
+import sqlite3
+import sys
+import time
+from contextlib import closing, contextmanager
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+from fastapi import HTTPException
+from ..core.db import query_all, query_one, transaction
+
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "archive")
+ARCHIVE_KEEP_DAYS = int(os.getenv("ARCHIVE_KEEP_DAYS", "730"))
+ARCHIVE_CHUNK = 1000
+
+# colunas de media na ordem da tabela; o arquivo tem as mesmas, mais batch (ver _check_columns)
+MEDIA_COLUMNS = ("id", "title", "description", "platform", "url", "published_at", "line_id", "system_id",
+                 "created_at", "updated_at", "video_key")
+
+_PREFIX = "archive_"
+_IDS = "(SELECT value FROM json_each(?1))"
+# lotes válidos do ano (0008): a faixa é lida uma vez por consulta, no mesmo snapshot do quente
+_RANGE = ("{col} > (SELECT restored FROM main.archive_year WHERE year = {year}) "
+          "AND {col} <= (SELECT batches FROM main.archive_year WHERE year = {year})")
+
+_DDL = (
+    "CREATE TABLE IF NOT EXISTS {s}.media (id INTEGER PRIMARY KEY, title TEXT NOT NULL, description TEXT, "
+    "platform TEXT NOT NULL, url TEXT NOT NULL, published_at TEXT NOT NULL, line_id INTEGER, system_id INTEGER, "
+    "created_at TEXT, updated_at TEXT, video_key TEXT, batch INTEGER NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS {s}.media_person (media_id INTEGER NOT NULL, person_id INTEGER NOT NULL, "
+    "role TEXT NOT NULL, PRIMARY KEY (media_id, person_id)) WITHOUT ROWID",
+    # os índices das listagens, como no quente (0001/0003)
+    "CREATE INDEX IF NOT EXISTS {s}.idx_media_published_at ON media(published_at)",
+    "CREATE INDEX IF NOT EXISTS {s}.idx_media_platform_published ON media(platform, published_at)",
+    "CREATE INDEX IF NOT EXISTS {s}.idx_media_line_published ON media(line_id, published_at)",
+    "CREATE INDEX IF NOT EXISTS {s}.idx_media_system_published ON media(system_id, published_at)",
+    "CREATE INDEX IF NOT EXISTS {s}.idx_mediaperson_person ON media_person(person_id, media_id)",
+    "CREATE INDEX IF NOT EXISTS {s}.idx_media_batch ON media(batch)",
+)
+
+# as contagens de media_summary (triggers de 0001) das mídias ?1 em {s}, vezes ?2
+_SUMMARY_DELTA = """
+INSERT INTO main.media_summary(dim, key, count)
+SELECT dim, key, ?2 * count(*) FROM (
+  SELECT 'platform' AS dim, platform AS key FROM {s}.media WHERE id IN {ids}
+  UNION ALL SELECT 'line', COALESCE(line_id, '') FROM {s}.media WHERE id IN {ids}
+  UNION ALL SELECT 'system', COALESCE(system_id, '') FROM {s}.media WHERE id IN {ids}
+  UNION ALL SELECT 'month', substr(published_at, 1, 7) FROM {s}.media WHERE id IN {ids}
+  UNION ALL SELECT 'person', person_id FROM {s}.media_person WHERE media_id IN {ids}
+) WHERE true GROUP BY dim, key
+ON CONFLICT(dim, key) DO UPDATE SET count = count + excluded.count
+"""
+
+def _links(s: str) -> str:
+    return (f"(SELECT group_concat(person_id || ':' || role) FROM (SELECT person_id, role FROM {s}.media_person "
+            f"WHERE media_id = m.id ORDER BY person_id))")
+
+# mídias do lote iguais à cópia no arquivo (a API pode ter alterado alguma entre a cópia e a remoção)
+_SAME = ("SELECT m.id FROM main.media m JOIN {s}.media a ON a.id = m.id WHERE m.id IN {ids} AND "
+         + " AND ".join(f"a.{c} IS m.{c}" for c in MEDIA_COLUMNS[1:])
+         + f" AND {_links('main')} IS {_links('{s}')}")
+
+def schema(year: int) -> str:
+    return f"{_PREFIX}{year}"
+
+def path(year: int) -> Path:
+    return Path(ARCHIVE_DIR) / f"media_{year}.db"
+
+def visible(s: str) -> str:
+    """Filtro das linhas válidas do ano anexado como `s` (alias m)."""
+    return _RANGE.format(col="m.batch", year=int(s[len(_PREFIX):]))
+
+def _year(value) -> Optional[int]:
+    try:
+        return int(str(value)[:4])
+    except ValueError:
+        return None
+
+def years_for(db, *, q=None, ids: Optional[Sequence[int]] = None, date_from=None, date_to=None, **_) -> List[int]:
+    """
+    Anos do arquivo que uma listagem com esses filtros precisa ler (vazio =
+    só o quente). Com ids, só os anos em que eles estão.
+    """
+    if q:
+        return []
+    args: List[object] = []
+    if ids is not None:
+        sql = "SELECT DISTINCT year FROM media_archive WHERE id IN (SELECT value FROM json_each(?))"
+        args.append(json.dumps(list(ids)))
+    else:
+        sql = "SELECT year FROM archive_year WHERE media > 0"
+    first, last = _year(date_from), _year(date_to)
+    if first is not None:
+        sql += " AND year >= ?"; args.append(first)
+    if last is not None:
+        sql += " AND year <= ?"; args.append(last)
+    return [r[0] for r in db.execute(sql + " ORDER BY year DESC", args)]
+
+def attach(db, years: Sequence[int], create: bool = False) -> List[str]:
+    """
+    Anexa os anos a esta conexão (os que já estavam ficam) e devolve os
+    nomes dos schemas. ATTACH/DETACH não rodam dentro de transação: quem
+    abre read_snapshot anexa antes (ver reports._export_job).
+    """
+    names = [schema(y) for y in years]
+    if not names:
+        return names
+    limit = db.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+    if len(names) > limit:
+        raise HTTPException(400, f"O período alcança {len(names)} anos arquivados (máximo {limit} por consulta): "
+                                 "restrinja date_from/date_to")
+    attached = [r[1] for r in db.execute("PRAGMA database_list") if r[1].startswith(_PREFIX)]
+    missing = [(y, n) for y, n in zip(years, names) if n not in attached]
+    # sem vaga: solta os anexados que esta consulta não usa
+    spare = [n for n in attached if n not in names]
+    for name in spare[:max(0, len(attached) + len(missing) - limit)]:
+        db.execute(f"DETACH DATABASE {name}")
+    for year, name in missing:
+        p = path(year)
+        if create:
+            p.parent.mkdir(parents=True, exist_ok=True)
+        elif not p.exists():
+            raise RuntimeError(f"arquivo do ano {year} não encontrado: {p} (ARCHIVE_DIR={ARCHIVE_DIR})")
+        db.execute(f"ATTACH DATABASE ? AS {name}", (str(p),))
+        if create:
+            db.execute(f"PRAGMA {name}.journal_mode = WAL")
+            for ddl in _DDL:
+                db.execute(ddl.format(s=name))
+    return names
+
+def attach_for(db, **filters) -> List[str]:
+    """years_for + attach: os schemas do arquivo que a listagem deve unir ao quente."""
+    return attach(db, years_for(db, **filters))
+
+def is_archived(db, mid: int) -> bool:
+    return query_one(db, "SELECT 1 AS x FROM media_archive WHERE id=?", (mid,)) is not None
+
+def find_key(db, platform: str, key: str) -> Optional[int]:
+    """Id da mídia arquivada com esse vídeo (índice único de media_archive)."""
+    row = query_one(db, "SELECT id FROM media_archive WHERE platform = ? AND video_key = ?", (platform, key))
+    return row["id"] if row else None
+
+@contextmanager
+def _same_feed(db, ids_json: str) -> Iterator[None]:
+    """
+    Mudar de banco não é alteração: no fim, as linhas do change_log dessas
+    mídias voltam a ser as de antes (com o mesmo seq, então a versão de
+    media não muda e o feed não manda exclusão nem reenvio).
+    """
+    rows = db.execute(f"SELECT seq, entity, entity_id, op, changed_at FROM change_log "
+                      f"WHERE entity = 'media' AND entity_id IN {_IDS}", (ids_json,)).fetchall()
+    yield
+    db.execute(f"DELETE FROM change_log WHERE entity = 'media' AND entity_id IN {_IDS}", (ids_json,))
+    db.executemany("INSERT INTO change_log(seq, entity, entity_id, op, changed_at) VALUES(?,?,?,?,?)",
+                   [tuple(r) for r in rows])
+
+def _check_columns(db) -> None:
+    cols = tuple(r[1] for r in db.execute("PRAGMA main.table_info(media)"))
+    if cols != MEDIA_COLUMNS:
+        raise RuntimeError(f"media tem as colunas {cols}: atualize MEDIA_COLUMNS e _DDL em api/models/archive.py")
+
+def _tidy(db, s: str, year: int) -> None:
+    """Tira do arquivo as linhas fora da faixa: lote interrompido antes de confirmar, ou já restaurado."""
+    stale = f"SELECT id FROM {s}.media WHERE NOT ({_RANGE.format(col='batch', year=year)})"
+    db.execute(f"DELETE FROM {s}.media_person WHERE media_id IN ({stale})")
+    db.execute(f"DELETE FROM {s}.media WHERE id IN ({stale})")
+
+def _end_batch(db, year: int, col: str, batch: int, media: int) -> None:
+    cur = db.execute(f"UPDATE archive_year SET {col} = ?, media = media + ? WHERE year = ? AND {col} = ?",
+                     (batch, media, year, batch - 1))
+    if cur.rowcount != 1:
+        raise RuntimeError(f"archive_year {year}: {col} mudou durante o lote (outro archive/restore rodando?)")
+
+def _move_out(db, year: int, ids: List[int]) -> int:
+    s = attach(db, [year], create=True)[0]
+    ids_json = json.dumps(ids)
+    cols = ", ".join(MEDIA_COLUMNS)
+    # 1) cópia no arquivo com o número do próximo lote: fora da faixa, ainda não aparece
+    with transaction(db):
+        db.execute("INSERT OR IGNORE INTO archive_year(year) VALUES(?)", (year,))
+        _tidy(db, s, year)
+        batch = db.execute("SELECT batches + 1 FROM archive_year WHERE year = ?", (year,)).fetchone()[0]
+        db.execute(f"INSERT OR REPLACE INTO {s}.media({cols}, batch) SELECT {cols}, ?2 FROM main.media "
+                   f"WHERE id IN {_IDS}", (ids_json, batch))
+        db.execute(f"DELETE FROM {s}.media_person WHERE media_id IN {_IDS}", (ids_json,))
+        db.execute(f"INSERT INTO {s}.media_person(media_id, person_id, role) "
+                   f"SELECT media_id, person_id, role FROM main.media_person WHERE media_id IN {_IDS}", (ids_json,))
+    # 2) no quente, numa transação: registro, remoção e a faixa passa a incluir o lote
+    with transaction(db):
+        same = db.execute(_SAME.format(s=s, ids=_IDS), (ids_json,)).fetchall()
+        if len(same) < len(ids):
+            return 0   # a API alterou ou excluiu alguma depois da cópia: o lote é refeito
+        with _same_feed(db, ids_json):
+            db.execute(f"INSERT INTO media_archive(id, year, platform, video_key) "
+                       f"SELECT id, ?2, platform, video_key FROM main.media WHERE id IN {_IDS}", (ids_json, year))
+            # os triggers de DELETE descontam do resumo, mas a mídia continua existindo
+            db.execute(_SUMMARY_DELTA.format(s="main", ids=_IDS), (ids_json, 1))
+            db.execute(f"DELETE FROM main.media_person WHERE media_id IN {_IDS}", (ids_json,))
+            db.execute(f"DELETE FROM main.media WHERE id IN {_IDS}", (ids_json,))
+        _end_batch(db, year, "batches", batch, len(ids))
+    return len(ids)
+
+def _move_in(db, year: int, batch: int) -> int:
+    s = schema(year)
+    ids = [r[0] for r in db.execute(f"SELECT id FROM {s}.media WHERE batch = ?", (batch,))]
+    ids_json = json.dumps(ids)
+    # o ON DELETE SET NULL de linha/sistema que o arquivo não recebeu
+    cols = ", ".join(f"(SELECT id FROM main.{c[:-3]} WHERE id = a.{c})" if c in ("line_id", "system_id") else f"a.{c}"
+                     for c in MEDIA_COLUMNS)
+    # 1) no quente, numa transação: devolve o lote e a faixa deixa de incluí-lo
+    with transaction(db), _same_feed(db, ids_json):
+        # registro antes: o trigger de video_key (0008) olha media_archive
+        db.execute(f"DELETE FROM media_archive WHERE id IN {_IDS}", (ids_json,))
+        db.execute(f"INSERT INTO main.media({', '.join(MEDIA_COLUMNS)}) SELECT {cols} FROM {s}.media a "
+                   f"WHERE a.id IN {_IDS}", (ids_json,))
+        # ... e o ON DELETE CASCADE de pessoa
+        db.execute(f"INSERT INTO main.media_person(media_id, person_id, role) SELECT media_id, person_id, role "
+                   f"FROM {s}.media_person WHERE media_id IN {_IDS} AND person_id IN (SELECT id FROM main.person)",
+                   (ids_json,))
+        # os triggers de INSERT contaram de novo o que já contava pelo arquivo
+        db.execute(_SUMMARY_DELTA.format(s=s, ids=_IDS), (ids_json, -1))
+        # lotes saem na ordem: o anterior a este já foi restaurado
+        _end_batch(db, year, "restored", batch, -len(ids))
+    # 2) limpa o arquivo
+    with transaction(db):
+        _tidy(db, s, year)
+    return len(ids)
+
+def archive(db, before: str, chunk: int = ARCHIVE_CHUNK, pause: float = 0.0, verbose: bool = False) -> Dict:
+    """
+    Move as mídias com published_at < `before` para o arquivo do seu ano,
+    `chunk` por vez, das mais antigas para as mais novas.
+    """
+    _check_columns(db)
+    stats: Dict = {"moved": 0, "years": {}}
+    while True:
+        rows = query_all(db, "SELECT id, published_at FROM media WHERE published_at < ? "
+                             "ORDER BY published_at, id LIMIT ?", (before, chunk))
+        if not rows:
+            break
+        by_year: Dict[int, List[int]] = {}
+        for r in rows:
+            year = _year(r["published_at"])
+            if year is None:
+                raise ValueError(f"mídia {r['id']}: published_at sem ano ({r['published_at']!r})")
+            by_year.setdefault(year, []).append(r["id"])
+        for year, ids in by_year.items():
+            moved = _move_out(db, year, ids)
+            stats["years"][year] = stats["years"].get(year, 0) + moved
+            stats["moved"] += moved
+        if verbose:
+            print(f"[archive] até {rows[-1]['published_at']}: {stats['moved']} mídias arquivadas")
+        if pause:
+            time.sleep(pause)   # folga para o escritor da API
+    return stats
+
+def restore(db, years: Optional[Sequence[int]] = None, pause: float = 0.0, verbose: bool = False) -> Dict:
+    """
+    Devolve ao quente as mídias dos anos pedidos (sem `years`, todos), um
+    lote do arquivamento por vez. O arquivo que esvazia fica no disco,
+    compactado: outra conexão pode estar com ele anexado.
+    """
+    _check_columns(db)
+    if years is None:
+        years = [r["year"] for r in query_all(db, "SELECT year FROM archive_year WHERE media > 0 ORDER BY year")]
+    stats: Dict = {"restored": 0, "years": {}}
+    for year in years:
+        s = attach(db, [year])[0]
+        while True:
+            batch = db.execute(f"SELECT min(m.batch) FROM {s}.media m WHERE {visible(s)}").fetchone()[0]
+            if batch is None:
+                break
+            n = _move_in(db, year, batch)
+            stats["years"][year] = stats["years"].get(year, 0) + n
+            stats["restored"] += n
+            if verbose:
+                print(f"[archive] {year}: {stats['years'][year]} mídias restauradas")
+            if pause:
+                time.sleep(pause)
+        # VACUUM de schema anexado ocupa outra vaga de ATTACH: compacta por uma conexão própria
+        db.execute(f"DETACH DATABASE {s}")
+        with closing(sqlite3.connect(path(year))) as conn:
+            conn.execute("VACUUM")
+    return stats
+
+def status(db) -> Dict:
+    years = []
+    for r in query_all(db, "SELECT year, media FROM archive_year ORDER BY year"):
+        p = path(r["year"])
+        years.append({**r, "path": str(p), "size": p.stat().st_size if p.exists() else None})
+    hot = db.execute("SELECT count(*) FROM media").fetchone()[0]
+    return {"hot": hot, "archived": sum(y["media"] for y in years), "years": years}
+
+if __name__ == "__main__":
+    from ..core.db import connect
+
+    args = sys.argv[1:]
+    cmd = args[0] if args else ""
+    opts = dict(zip(args[1::2], args[2::2]))
+    if cmd not in ("archive", "restore", "status"):
+        print("uso: python -m api.models.archive archive [--before AAAA-MM-DD] [--chunk 1000] [--pause 0.05]\n"
+              "     python -m api.models.archive restore [--year AAAA] [--pause 0.05]\n"
+              "     python -m api.models.archive status")
+        sys.exit(2)
+    chunk, pause = int(opts.get("--chunk", ARCHIVE_CHUNK)), float(opts.get("--pause", 0))
+    conn = connect()
+    try:
+        if cmd == "archive":
+            before = opts.get("--before") or (date.today() - timedelta(days=ARCHIVE_KEEP_DAYS)).isoformat()
+            result = archive(conn, before, chunk=chunk, pause=pause, verbose=True)
+            print(f"{result['moved']} mídias publicadas antes de {before} arquivadas "
+                  f"({', '.join(f'{y}: {n}' for y, n in sorted(result['years'].items())) or 'nenhuma'})")
+        elif cmd == "restore":
+            years = [int(opts["--year"])] if "--year" in opts else None
+            result = restore(conn, years, pause=pause, verbose=True)
+            print(f"{result['restored']} mídias restauradas")
+        else:
+            info = status(conn)
+            for y in info["years"]:
+                size = f"{y['size'] / 1e6:.1f} MB" if y["size"] is not None else "arquivo ausente!"
+                print(f"{y['year']}: {y['media']} mídias em {y['path']} ({size})")
+            print(f"quente: {info['hot']} mídias; arquivo: {info['archived']}")
+    finally:
+        conn.close()
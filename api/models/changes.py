@@ -0,0 +1,46 @@
+# api/models/changes.py
+"""
+Feed de alterações: tabela change_log, mantida por triggers (ver
+db/migrations/0004_change_log.sql). Uma linha por entidade, com o seq da
+última alteração; op 'delete' fica como marca da exclusão.
+
+Cliente sincroniza guardando o maior seq visto (next_since) e pedindo só
+o que veio depois; since=0 é a carga completa.
+"""
+from typing import Dict, Optional
+from ..core.db import query_all, transaction
+
+def since(db, seq: int = 0, limit: int = 1000, entity: Optional[str] = None) -> Dict:
+    """Alterações com seq > `seq`, em ordem; has_more indica que há outra página."""
+    if entity:
+        rows = query_all(
+            db,
+            "SELECT seq, entity, entity_id AS id, op, changed_at FROM change_log "
+            "WHERE entity = ? AND seq > ? ORDER BY seq LIMIT ?",
+            (entity, seq, limit + 1),
+        )
+    else:
+        rows = query_all(
+            db,
+            "SELECT seq, entity, entity_id AS id, op, changed_at FROM change_log WHERE seq > ? ORDER BY seq LIMIT ?",
+            (seq, limit + 1),
+        )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {"changes": rows, "next_since": rows[-1]["seq"] if rows else seq, "has_more": has_more}
+
+def rebuild(db) -> int:
+    """
+    Refaz o log como carga inicial (todas as entidades atuais como 'upsert',
+    sem marcas de exclusão), para quem carrega dados com os triggers
+    desligados, como bench.seed. Clientes devem ressincronizar do zero.
+    """
+    with transaction(db):
+        db.execute("DELETE FROM change_log")
+        total = 0
+        for entity in ("line", "system", "person", "media"):
+            cur = db.execute(
+                f"INSERT INTO change_log(entity, entity_id, op) SELECT '{entity}', id, 'upsert' FROM {entity} ORDER BY id"
+            )
+            total += cur.rowcount
+    return total
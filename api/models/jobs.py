@@ -0,0 +1,94 @@
+# api/models/jobs.py
+"""
+Tabela job (db/migrations/0006_jobs.sql). Quem executa é api.core.jobs;
+todas as mudanças de estado passam pelo escritor único.
+"""
+import json
+from typing import Dict, List, Optional
+from ..core.db import execute, fetch_one_or_404, query_all, query_one, transaction
+
+def _row(r: Dict) -> Dict:
+    r["params"] = json.loads(r["params"])
+    return r
+
+def create(db, kind: str, params: Dict, created_by: Optional[int] = None) -> Dict:
+    with transaction(db):
+        cur = execute(db, "INSERT INTO job(kind, params, created_by) VALUES(?,?,?)",
+                      (kind, json.dumps(params, ensure_ascii=False), created_by))
+    return get_one(db, cur.lastrowid)
+
+def get_one(db, jid: int) -> Dict:
+    return _row(fetch_one_or_404(db, "SELECT * FROM job WHERE id=?", (jid,), "Job não encontrado"))
+
+def has_work(db, stale_s: float) -> bool:
+    """Há algo para claim pegar? Só leitura: o worker ocioso não passa pelo escritor."""
+    return bool(db.execute(
+        "SELECT EXISTS(SELECT 1 FROM job WHERE status='queued') "
+        "OR EXISTS(SELECT 1 FROM job WHERE status='running' AND heartbeat_at < datetime('now', ?))",
+        (f"-{int(stale_s)} seconds",),
+    ).fetchone()[0])
+
+def claim(db, stale_s: float, max_attempts: int) -> Optional[Dict]:
+    """
+    Próximo job da fila (ou um running sem heartbeat há `stale_s`, de um
+    processo que caiu), já marcado como running. Quem passou de
+    `max_attempts` vira failed. None se não há nada a fazer.
+    """
+    with transaction(db):
+        while True:
+            row = query_one(db, "SELECT id, attempts FROM job WHERE status='queued' ORDER BY id LIMIT 1")
+            if row is None:
+                row = query_one(db, "SELECT id, attempts FROM job WHERE status='running' "
+                                    "AND heartbeat_at < datetime('now', ?) ORDER BY id LIMIT 1",
+                                (f"-{int(stale_s)} seconds",))
+            if row is None:
+                return None
+            if row["attempts"] < max_attempts:
+                break
+            execute(db, "UPDATE job SET status='failed', finished_at=datetime('now'), "
+                        "error=coalesce(error, 'interrompido') || ' (tentativas esgotadas)' WHERE id=?", (row["id"],))
+        execute(db, "UPDATE job SET status='running', attempts=attempts+1, progress=0, total=NULL, error=NULL, "
+                    "started_at=datetime('now'), heartbeat_at=datetime('now') WHERE id=?", (row["id"],))
+    return get_one(db, row["id"])
+
+def heartbeat(db, jid: int, attempt: int, progress: int, total: Optional[int] = None) -> None:
+    """Progresso (e sinal de vida) da tentativa `attempt`; de uma tentativa antiga é ignorado."""
+    execute(db, "UPDATE job SET progress=?, total=coalesce(?, total), heartbeat_at=datetime('now') "
+                "WHERE id=? AND attempts=? AND status='running'", (progress, total, jid, attempt))
+
+def finish(db, jid: int, attempt: int, file_path: str, file_size: int, progress: int) -> bool:
+    """False se o job foi excluído ou retomado por outro worker nesse meio-tempo."""
+    cur = execute(db, "UPDATE job SET status='done', file_path=?, file_size=?, progress=?, total=?, "
+                      "finished_at=datetime('now'), heartbeat_at=datetime('now') "
+                      "WHERE id=? AND attempts=? AND status='running'",
+                  (file_path, file_size, progress, progress, jid, attempt))
+    return cur.rowcount > 0
+
+def fail(db, jid: int, attempt: int, error: str, retry: bool, max_attempts: int) -> None:
+    """Erro da tentativa: volta para a fila se `retry` e ainda há tentativas; senão failed."""
+    execute(db, "UPDATE job SET status=CASE WHEN ? AND attempts < ? THEN 'queued' ELSE 'failed' END, error=?, "
+                "finished_at=CASE WHEN ? AND attempts < ? THEN NULL ELSE datetime('now') END "
+                "WHERE id=? AND attempts=? AND status='running'",
+            (retry, max_attempts, error, retry, max_attempts, jid, attempt))
+
+def release(db, jid: int, attempt: int) -> None:
+    """Devolve à fila sem gastar tentativa (worker parando no shutdown)."""
+    execute(db, "UPDATE job SET status='queued', attempts=attempts-1 WHERE id=? AND attempts=? AND status='running'",
+            (jid, attempt))
+
+def delete(db, jid: int) -> Dict:
+    """Exclui o registro; devolve a linha (o arquivo fica a cargo de quem chamou)."""
+    with transaction(db):
+        job = get_one(db, jid)
+        execute(db, "DELETE FROM job WHERE id=?", (jid,))
+    return job
+
+def purge(db, retention_s: float) -> List[str]:
+    """Remove jobs terminados há mais de `retention_s`; devolve os arquivos a apagar."""
+    with transaction(db):
+        rows = query_all(db, "SELECT id, file_path FROM job WHERE finished_at < datetime('now', ?)",
+                         (f"-{int(retention_s)} seconds",))
+        if rows:
+            execute(db, "DELETE FROM job WHERE id IN (SELECT value FROM json_each(?))",
+                    (json.dumps([r["id"] for r in rows]),))
+    return [r["file_path"] for r in rows if r["file_path"]]
@@ -1,16 +1,23 @@
-from ..core.db import execute, query_all, query_one, fetch_one_or_404, delete_or_404
+from ..core.db import after_commit, execute, transaction, query_all, query_one, fetch_one_or_404, delete_or_404
+from ..core.versions import bump_version
 
 def create(db, name: str):
-    cur = execute(db, "INSERT INTO line(name) VALUES(?)", (name,))
-    lid = cur.lastrowid
+    with transaction(db):
+        cur = execute(db, "INSERT INTO line(name) VALUES(?)", (name,))
+        lid = cur.lastrowid
+    after_commit(db, bump_version, "line")
     return fetch_one_or_404(db, "SELECT id,name FROM line WHERE id=?", (lid,), "Linha não encontrada")
 
 def list_all(db):
     return query_all(db, "SELECT id,name FROM line ORDER BY name")
 
 def update(db, lid: int, name: str):
-    execute(db, "UPDATE line SET name=? WHERE id=?", (name, lid))
+    with transaction(db):
+        execute(db, "UPDATE line SET name=? WHERE id=?", (name, lid))
+    after_commit(db, bump_version, "line")
     return fetch_one_or_404(db, "SELECT id,name FROM line WHERE id=?", (lid,), "Linha não encontrada")
 
 def delete(db, lid: int):
-    return delete_or_404(db, "DELETE FROM line WHERE id=?", (lid,), "Linha não encontrada")
+    out = delete_or_404(db, "DELETE FROM line WHERE id=?", (lid,), "Linha não encontrada")
+    after_commit(db, bump_version, "line")   # ON DELETE SET NULL também mexe em media.line_id
+    return out
@@ -1,38 +1,267 @@
-from ..core.db import execute, query_all, query_one, fetch_one_or_404, delete_or_404
+import json
+import sqlite3
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from fastapi import HTTPException
+from ..core.db import after_commit, execute, execute_many, read_snapshot, transaction, query_all, query_one, fetch_one_or_404, delete_or_404
+from ..core.handlers import integrity_message
+from ..core.versions import bump_version
+from ..core.pagination import DEFAULT_PAGE_SIZE, decode_cursor, encode_cursor
+from . import archive
+from . import changes as change_log
+from . import video_keys
+from .video_keys import video_key
 
-def _media_people(db, mid: int):
-    return query_all(db, "SELECT person_id, role FROM media_person WHERE media_id=?", (mid,))
+# limite de parâmetros por IN (...) — fica abaixo do SQLITE_MAX_VARIABLE_NUMBER antigo (999)
+PEOPLE_CHUNK_SIZE = 500
+# itens por transação no import em massa
+BULK_BATCH_SIZE = 500
 
-def create(db, m):
+# busca textual (tabela media_fts, ver db/migrations/0001_schema.sql)
+FTS_RANK = "bm25(media_fts, 10.0, 1.0)"
+FTS_TITLE_HIGHLIGHT = "highlight(media_fts, 0, '<mark>', '</mark>')"
+FTS_DESCRIPTION_SNIPPET = "snippet(media_fts, 1, '<mark>', '</mark>', '…', 16)"
+
+# MediaOut montado pelo próprio SQLite (list_page_json), nas colunas e na ordem do schema.
+# json(...) mantém o array de pessoas como JSON (o subtipo se perde na subquery);
+# json_patch('{}', ...) tira as chaves nulas, como o response_model_exclude_none das rotas.
+MEDIA_JSON_FIELDS = ("id", "title", "description", "platform", "url", "published_at", "line_id", "system_id")
+MEDIA_JSON_PEOPLE = ("json((SELECT json_group_array(json_object('person_id', person_id, 'role', role)) "
+                     "FROM media_person WHERE media_id = p.id))")
+MEDIA_JSON_PEOPLE_NAMED = ("json((SELECT json_group_array(json_object('person_id', mp.person_id, 'role', mp.role, "
+                           "'name', pe.name)) FROM media_person mp LEFT JOIN person pe ON pe.id = mp.person_id "
+                           "WHERE mp.media_id = p.id))")
+
+# expand=...: nomes resolvidos na mesma consulta (JOIN em line/system, pessoas no JSON agregado)
+MEDIA_EXPAND = ("people", "line", "system")
+# multi-get (ids=...): máximo de ids por chamada
+MAX_IDS = 1000
+
+def _sources(archives: Sequence[str]) -> List[str]:
+    """Prefixo das tabelas de cada banco lido: "" = o quente, "archive_AAAA." = um ano do arquivo."""
+    return ["", *(f"{s}." for s in archives)]
+
+def _people_json(named: bool, archives: Sequence[str]) -> str:
+    if not archives:
+        return MEDIA_JSON_PEOPLE_NAMED if named else MEDIA_JSON_PEOPLE
+    # a mídia está num banco só; cada braço do UNION ALL é uma busca pelo índice
+    links = " UNION ALL ".join(f"SELECT person_id, role FROM {src}media_person WHERE media_id = p.id"
+                               for src in _sources(archives))
+    if named:
+        return ("json((SELECT json_group_array(json_object('person_id', mp.person_id, 'role', mp.role, "
+                f"'name', pe.name)) FROM ({links}) mp LEFT JOIN person pe ON pe.id = mp.person_id))")
+    return f"json((SELECT json_group_array(json_object('person_id', person_id, 'role', role)) FROM ({links})))"
+
+def _media_people(db, mids: Iterable[int], names: bool = False,
+                  archives: Sequence[str] = ()) -> Dict[int, List[Dict]]:
+    """
+    Carrega os vínculos de várias mídias de uma vez (uma query por bloco de
+    ids); names=True traz junto o nome da pessoa. `archives`: anos do
+    arquivo já anexados (archive.attach_for) onde também procurar.
+    """
+    ids = list(dict.fromkeys(mids))
+    out: Dict[int, List[Dict]] = {mid: [] for mid in ids}
+    if names:
+        sql = ("SELECT mp.media_id, mp.person_id, mp.role, pe.name FROM {src}media_person mp "
+               "LEFT JOIN person pe ON pe.id = mp.person_id WHERE mp.media_id IN ({marks})")
+    else:
+        sql = "SELECT media_id, person_id, role FROM {src}media_person WHERE media_id IN ({marks})"
+    sources = _sources(archives)
+    size = PEOPLE_CHUNK_SIZE // len(sources)
+    for i in range(0, len(ids), size):
+        chunk = ids[i:i + size]
+        marks = ",".join("?" * len(chunk))
+        query = " UNION ALL ".join(sql.format(src=src, marks=marks) for src in sources)
+        for row in db.execute(query, chunk * len(sources)):
+            link = {"person_id": row[1], "role": row[2]}
+            if names:
+                link["name"] = row[3]
+            out[row[0]].append(link)
+    return out
+
+def _attach_people(db, rows: List[Dict], names: bool = False, archives: Sequence[str] = ()) -> List[Dict]:
+    links = _media_people(db, (r["id"] for r in rows), names, archives)
+    for r in rows:
+        r["people"] = links.get(r["id"], [])
+    return rows
+
+def _insert_people(db, mid: int, people) -> None:
+    if people:
+        execute_many(db, "INSERT INTO media_person(media_id, person_id, role) VALUES(?,?,?)",
+                     [(mid, link.person_id, link.role) for link in people])
+
+def _insert(db, m) -> int:
     cur = execute(
         db,
         """
-        INSERT INTO media(title, description, platform, url, published_at, line_id, system_id, updated_at)
-        VALUES(?,?,?,?,?,?,?, datetime('now'))
+        INSERT INTO media(title, description, platform, url, video_key, published_at, line_id, system_id, updated_at)
+        VALUES(?,?,?,?,?,?,?,?, datetime('now'))
         """,
-        (m.title, m.description, m.platform, str(m.url), m.published_at.isoformat(), m.line_id, m.system_id),
+        (m.title, m.description, m.platform, str(m.url), video_key(m.platform, str(m.url)),
+         m.published_at.isoformat(), m.line_id, m.system_id),
     )
     mid = cur.lastrowid
-    for link in m.people:
-        execute(db, "INSERT INTO media_person(media_id, person_id, role) VALUES(?,?,?)",
-                (mid, link.person_id, link.role))
+    _insert_people(db, mid, m.people)
+    return mid
+
+def create(db, m):
+    with transaction(db):
+        mid = _insert(db, m)
+    after_commit(db, bump_version, "media")
     return get_one(db, mid)
 
-def get_one(db, mid: int):
-    row = query_one(db, "SELECT * FROM media WHERE id=?", (mid,))
+def bulk_insert(db, batch: Sequence[Tuple[int, object]]) -> Dict:
+    """
+    Um lote da importação em massa: uma transação para o lote e um
+    SAVEPOINT por item, então uma linha inválida não derruba as outras.
+    `batch` são pares (número da linha, MediaIn), até BULK_BATCH_SIZE; quem
+    importa manda um lote por vez (um commit cada), ver routers.media.bulk_media.
+    """
+    ids: List[int] = []
+    errors: List[Dict] = []
+    with transaction(db):
+        for row_no, m in batch:
+            try:
+                with transaction(db):
+                    ids.append(_insert(db, m))
+            except sqlite3.IntegrityError as exc:
+                errors.append({"row": row_no, "message": integrity_message(exc)})
+        if ids:
+            after_commit(db, bump_version, "media")
+    return {"ids": ids, "errors": errors}
+
+def get_one(db, mid: int, expand: Sequence[str] = ()):
+    archives: List[str] = []
+    if expand:
+        base, args = _list_query(ids=[mid], expand=expand)
+        row = query_one(db, base, tuple(args))
+    else:
+        row = query_one(db, "SELECT * FROM media WHERE id=?", (mid,))
+    if not row:
+        # fora do quente: talvez no arquivo (só a consulta das que não existem paga o registro)
+        archives = archive.attach_for(db, ids=[mid])
+        if archives:
+            base, args = _list_query(ids=[mid], expand=expand, archives=archives)
+            row = query_one(db, base, tuple(args))
     if not row:
-        from fastapi import HTTPException
         raise HTTPException(404, "Mídia não encontrada")
-    row["people"] = _media_people(db, mid)
-    return row
+    return _attach_people(db, _expand_rows([row]), names="people" in expand, archives=archives)[0]
+
+def _not_found(db, mid: int) -> HTTPException:
+    if archive.is_archived(db, mid):
+        return HTTPException(409, "Mídia arquivada (somente leitura): restaure com python -m api.models.archive restore")
+    return HTTPException(404, "Mídia não encontrada")
+
+def lookup(db, url: str):
+    """Mídia já cadastrada com o mesmo vídeo de `url` (qualquer forma da URL)."""
+    found = video_keys.detect(url)
+    if found is None:
+        raise HTTPException(400, "URL não reconhecida como vídeo do YouTube ou do Vimeo")
+    platform, key = found
+    row = video_keys.find(db, platform, key)
+    if row:
+        media = _attach_people(db, [row])[0]
+    else:
+        archived = archive.find_key(db, platform, key)
+        media = get_one(db, archived) if archived else None
+    return {"platform": platform, "video_key": key, "media": media}
+
+def fts_query(q: str) -> str:
+    """Texto livre -> expressão FTS5: cada palavra vira prefixo entre aspas (sem sintaxe do usuário)."""
+    terms = [t.replace('"', '""') for t in q.split()]
+    return " ".join(f'"{t}"*' for t in terms if t)
 
-def list_all(db, *, platform=None, person_id=None, line_id=None, system_id=None, date_from=None, date_to=None):
+def _list_query(*, q=None, platform=None, person_id=None, line_id=None, system_id=None, date_from=None, date_to=None,
+                ids: Optional[Sequence[int]] = None, expand: Sequence[str] = (),
+                limit: Optional[int] = None, after: Optional[Tuple] = None,
+                columns: str = "m.*", archives: Sequence[str] = (), ordered: bool = True) -> Tuple[str, list]:
+    if archives and not q:
+        filters = dict(platform=platform, person_id=person_id, line_id=line_id, system_id=system_id,
+                       date_from=date_from, date_to=date_to, ids=ids, expand=expand)
+        return _union_query(archives, limit=limit, after=after, columns=columns, ordered=ordered, **filters)
+    base, columns, filters, args = _source("", columns, platform=platform, person_id=person_id, line_id=line_id,
+                                           system_id=system_id, date_from=date_from, date_to=date_to, ids=ids,
+                                           expand=expand, q=q)
+
+    if q:
+        # busca: ordena por relevância (BM25, título pesa mais) e pagina por (rank, id)
+        base = f"SELECT {columns}, {FTS_RANK} AS rank, {FTS_TITLE_HIGHLIGHT} AS title_highlight, " \
+               f"{FTS_DESCRIPTION_SNIPPET} AS description_snippet {base}"
+        if filters:
+            base += " WHERE " + " AND ".join(filters)
+        base = f"SELECT * FROM ({base})"
+        if after:
+            base += " WHERE (rank, id) > (?, ?)"; args.extend(after)
+        base += " ORDER BY rank, id"
+    else:
+        if after:
+            # keyset: continua logo depois do último item da página anterior
+            filters.append("(m.published_at, m.id) < (?, ?)"); args.extend(after)
+        base = f"SELECT {columns} {base}"
+        if filters:
+            base += " WHERE " + " AND ".join(filters)
+        base += " ORDER BY m.published_at DESC, m.id DESC"
+    if limit is not None:
+        base += " LIMIT ?"; args.append(limit)
+    return base, args
+
+def _union_query(archives: Sequence[str], *, limit: Optional[int], after: Optional[Tuple], columns: str,
+                 ordered: bool = True, **filters) -> Tuple[str, list]:
+    """
+    _list_query no quente + anos do arquivo: a mesma consulta em cada banco,
+    cada uma com seu ORDER BY/LIMIT (a página sai dos índices de cada um);
+    o UNION ALL só intercala. Mesmas colunas, na mesma ordem, da consulta
+    só no quente. ordered=False (contagem): sem ordem nenhuma.
+    """
+    if columns == "m.*":
+        columns = ", ".join(f"m.{c}" for c in archive.MEDIA_COLUMNS)
+    arms, args, cols = [], [], columns
+    for src in _sources(archives):
+        base, cols, where, arm_args = _source(src, columns, **filters)
+        if after:
+            where.append("(m.published_at, m.id) < (?, ?)"); arm_args.extend(after)
+        arm = f"SELECT {cols}, m.published_at AS sort_published_at, m.id AS sort_id {base}" if ordered \
+            else f"SELECT {cols} {base}"
+        if where:
+            arm += " WHERE " + " AND ".join(where)
+        if ordered:
+            arm += " ORDER BY m.published_at DESC, m.id DESC"
+        if limit is not None:
+            arm += " LIMIT ?"; arm_args.append(limit)
+        arms.append(f"SELECT * FROM ({arm})")
+        args += arm_args
+    # nome de saída de cada coluna ("m.id AS media_id" -> media_id, "m.title" -> title)
+    names = ", ".join(c.split(" AS ")[-1].strip().split(".")[-1] for c in cols.split(","))
+    base = " UNION ALL ".join(arms)
+    if ordered:
+        base += " ORDER BY sort_published_at DESC, sort_id DESC"
+    if limit is not None:
+        base += " LIMIT ?"; args.append(limit)
+    return f"SELECT {names} FROM ({base})", args
+
+def _source(src: str, columns: str, *, q=None, platform=None, person_id=None, line_id=None, system_id=None,
+            date_from=None, date_to=None, ids: Optional[Sequence[int]] = None,
+            expand: Sequence[str] = ()) -> Tuple[str, str, List[str], list]:
+    """FROM/JOINs, colunas e filtros de list_all em um banco (prefixo de _sources)."""
     filters, args = [], []
-    base = "SELECT m.* FROM media m"
+    base = f"FROM {src}media m"
 
     if person_id:
-        base += " JOIN media_person mp ON mp.media_id = m.id AND mp.person_id = ?"
+        base += f" JOIN {src}media_person mp ON mp.media_id = m.id AND mp.person_id = ?"
         args.append(person_id)
+    if q:
+        base += " JOIN media_fts ON media_fts.rowid = m.id"
+        filters.append("media_fts MATCH ?"); args.append(fts_query(q))
+    for rel in ("line", "system"):
+        if rel in expand:
+            # nome como {rel}_name; _expand_rows / _item_json montam o objeto
+            base += f" LEFT JOIN {rel} ON {rel}.id = m.{rel}_id"
+            columns += f", {rel}.name AS {rel}_name"
+    if ids is not None:
+        if len(ids) == 1:
+            filters.append("m.id = ?");     args.append(ids[0])
+        else:
+            # um parâmetro só (array JSON), qualquer que seja o número de ids
+            filters.append("m.id IN (SELECT value FROM json_each(?))"); args.append(json.dumps(list(ids)))
     if platform:
         filters.append("m.platform = ?");   args.append(platform)
     if line_id:
@@ -43,30 +272,222 @@ def list_all(db, *, platform=None, person_id=None, line_id=None, system_id=None,
         filters.append("m.published_at >= ?"); args.append(date_from)
     if date_to:
         filters.append("m.published_at <= ?"); args.append(date_to)
+    if src:
+        filters.append(archive.visible(src[:-1]))
+    return base, columns, filters, args
 
-    if filters:
-        base += " WHERE " + " AND ".join(filters)
-    base += " ORDER BY m.published_at DESC"
-
-    rows = query_all(db, base, tuple(args))
+def _expand_rows(rows: List[Dict]) -> List[Dict]:
+    """line_name/system_name (expand) -> objetos line/system, como LineOut/SystemOut."""
     for r in rows:
-        r["people"] = _media_people(db, r["id"])
+        for rel in ("line", "system"):
+            if f"{rel}_name" in r:
+                name = r.pop(f"{rel}_name")
+                r[rel] = {"name": name, "id": r[f"{rel}_id"]} if name is not None else None
     return rows
 
+def list_all(db, *, with_people: bool = True, expand: Sequence[str] = (),
+             archives: Optional[Sequence[str]] = None, **filters):
+    """`archives`: anos do arquivo a unir (None = os que date_from/date_to pedem, ver archive.years_for)."""
+    if archives is None:
+        archives = archive.attach_for(db, **filters)
+    base, args = _list_query(expand=expand, archives=archives, **filters)
+    rows = _expand_rows(query_all(db, base, tuple(args)))
+    return _attach_people(db, rows, names="people" in expand, archives=archives) if with_people else rows
+
+def count_all(db, **filters) -> int:
+    """Quantas linhas list_all devolveria com esses filtros."""
+    base, args = _list_query(columns="m.id", archives=archive.attach_for(db, **filters), ordered=False, **filters)
+    return db.execute(f"SELECT count(*) FROM ({base})", args).fetchone()[0]
+
+def iter_all(db, *, batch_size: int = 1000, columns: str = "m.*", **filters) -> Iterator[List[Dict]]:
+    """
+    Mesmos filtros de list_all, mas devolve lotes de `batch_size` linhas
+    lidos do cursor aos poucos (memória limitada, sem pessoas).
+    """
+    base, args = _list_query(columns=columns, archives=archive.attach_for(db, **filters), **filters)
+    cur = db.execute(base, tuple(args))
+    try:
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            yield [dict(r) for r in rows]
+    finally:
+        cur.close()
+
+def _after(cursor: Optional[str], ranked: bool) -> Optional[Tuple]:
+    if not cursor:
+        return None
+    return decode_cursor(cursor, float, int) if ranked else decode_cursor(cursor, str, int)
+
+def _page(db, run: Callable[[Sequence[str]], list], published: Callable, limit: int, after: Optional[Tuple],
+          filters: Dict) -> Tuple[list, List[str]]:
+    """
+    run(archives) com limit + 1 linhas; devolve as linhas e os anos anexados.
+    Tenta antes só o quente: se a linha seguinte à página já é mais nova que
+    o ano arquivado mais recente, nada do arquivo entraria nela.
+    """
+    years = archive.years_for(db, **filters)
+    newer = str(years[0] + 1) if years else None
+    if newer is None or after is None or after[0] >= newer:
+        rows = run([])
+        if newer is None or (len(rows) > limit and published(rows[limit]) >= newer):
+            return rows, []
+    archives = archive.attach(db, years)
+    return run(archives), archives
+
+def list_page(db, *, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None, with_people: bool = True,
+              expand: Sequence[str] = (), **filters):
+    """Uma página de list_all + next_cursor (None quando não há mais itens)."""
+    ranked = bool(filters.get("q"))
+    after = _after(cursor, ranked)
+    rows, archives = _page(db, lambda a: list_all(db, limit=limit + 1, after=after, with_people=False, expand=expand,
+                                                  archives=a, **filters),
+                           lambda r: r["published_at"], limit, after, filters)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last["rank"] if ranked else last["published_at"], last["id"])
+    if with_people:
+        _attach_people(db, rows, names="people" in expand, archives=archives)
+    return {"items": rows, "next_cursor": next_cursor}
+
+def _item_json(ranked: bool, expand: Sequence[str] = (), archives: Sequence[str] = ()) -> str:
+    people = _people_json("people" in expand, archives)
+    pairs = [f"'{f}', p.{f}" for f in MEDIA_JSON_FIELDS] + [f"'people', {people}"]
+    for rel in ("line", "system"):
+        if rel in expand:
+            pairs.append(f"'{rel}', json(CASE WHEN p.{rel}_name IS NOT NULL "
+                         f"THEN json_object('name', p.{rel}_name, 'id', p.{rel}_id) END)")
+    if ranked:
+        pairs += ["'title_highlight', p.title_highlight", "'description_snippet', p.description_snippet"]
+    return f"json_patch('{{}}', json_object({', '.join(pairs)}))"
+
+def list_page_json(db, *, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                   expand: Sequence[str] = (), **filters) -> bytes:
+    """
+    Mesma página de list_page já como o corpo JSON de MediaPage: cada item
+    sai pronto do SQLite, sem dict nem validação pydantic por item. Só para
+    leitura do próprio banco (o que está lá já passou pelo MediaIn).
+    """
+    ranked = bool(filters.get("q"))
+    after = _after(cursor, ranked)
+    key = "rank" if ranked else "published_at"
+    # a ordem é a da subquery (ORDER BY ... LIMIT), repetida por garantia
+    order = "p.rank, p.id" if ranked else "p.published_at DESC, p.id DESC"
+
+    def run(archives):
+        base, args = _list_query(limit=limit + 1, after=after, expand=expand, archives=archives, **filters)
+        return db.execute(f"SELECT {_item_json(ranked, expand, archives)}, p.{key}, p.id FROM ({base}) AS p "
+                          f"ORDER BY {order}", args).fetchall()
+    rows, _ = _page(db, run, lambda r: r[1], limit, after, filters)
+    body = '{"items":[' + ",".join(r[0] for r in rows[:limit]) + "]"
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        body += ',"next_cursor":' + json.dumps(encode_cursor(last[1], last[2]))
+    return (body + "}").encode("utf-8")
+
+def _by_ids(db, ids: List[int]) -> List[Dict]:
+    rows: List[Dict] = []
+    for i in range(0, len(ids), PEOPLE_CHUNK_SIZE):
+        chunk = ids[i:i + PEOPLE_CHUNK_SIZE]
+        rows += query_all(db, f"SELECT * FROM media WHERE id IN ({','.join('?' * len(chunk))})", tuple(chunk))
+    return rows
+
+def changes_since(db, since: int = 0, limit: int = DEFAULT_PAGE_SIZE):
+    """
+    Mídias alteradas depois de `since` (seq do change_log), já com os dados
+    atuais; exclusões vêm só com id e op. Log e mídias lidos no mesmo snapshot.
+    """
+    with read_snapshot(db):
+        feed = change_log.since(db, since, limit, entity="media")
+        ids = [c["id"] for c in feed["changes"] if c["op"] == "upsert"]
+        current = {r["id"]: r for r in _attach_people(db, _by_ids(db, ids))}
+        archived = [i for i in ids if i not in current]
+        archived = archived if archived and archive.years_for(db, ids=archived) else []
+    if archived:
+        # arquivar preserva a linha do log; o arquivo não muda, então pode ser lido fora do snapshot
+        current.update((r["id"], r) for r in list_all(db, ids=archived))
+    for c in feed["changes"]:
+        del c["entity"]
+        c["media"] = current.get(c["id"])
+    return feed
+
+# colunas que PUT/PATCH podem alterar (video_key acompanha platform/url)
+MEDIA_FIELDS = ("title", "description", "platform", "url", "published_at", "line_id", "system_id")
+
+def _column_value(field: str, value):
+    if value is None:
+        return None
+    if field == "url":
+        return str(value)
+    if field == "published_at":
+        return value.isoformat()
+    return value
+
+def _people_diff(current: Dict[int, str], desired: Dict[int, str]) -> Dict[str, List]:
+    return {
+        "added": [{"person_id": p, "role": r} for p, r in sorted(desired.items()) if p not in current],
+        "updated": [{"person_id": p, "role": r} for p, r in sorted(desired.items()) if p in current and current[p] != r],
+        "removed": sorted(p for p in current if p not in desired),
+    }
+
+def _apply_people_diff(db, mid: int, diff: Dict[str, List]) -> None:
+    if diff["removed"]:
+        execute_many(db, "DELETE FROM media_person WHERE media_id=? AND person_id=?", [(mid, p) for p in diff["removed"]])
+    if diff["updated"]:
+        execute_many(db, "UPDATE media_person SET role=? WHERE media_id=? AND person_id=?",
+                     [(l["role"], mid, l["person_id"]) for l in diff["updated"]])
+    if diff["added"]:
+        execute_many(db, "INSERT INTO media_person(media_id, person_id, role) VALUES(?,?,?)",
+                     [(mid, l["person_id"], l["role"]) for l in diff["added"]])
+
+def patch(db, mid: int, fields: Dict, people=None) -> Dict:
+    """
+    Altera só o que mudou: `fields` (só os campos enviados) contra a linha
+    atual e `people` (None = não mexe) contra os vínculos atuais, com
+    insert/update/delete apenas da diferença. Nada mudou = nenhuma escrita
+    (nem updated_at, nem versão da tabela). Devolve a mídia, já montada sem
+    reler o banco, e o que mudou.
+    """
+    with transaction(db):
+        current = query_one(db, "SELECT * FROM media WHERE id=?", (mid,))
+        if not current:
+            raise _not_found(db, mid)
+        values = {f: _column_value(f, v) for f, v in fields.items() if f in MEDIA_FIELDS}
+        changed = [f for f in MEDIA_FIELDS if f in values and values[f] != current[f]]
+        links = {r["person_id"]: r["role"]
+                 for r in query_all(db, "SELECT person_id, role FROM media_person WHERE media_id=?", (mid,))}
+        desired = links if people is None else {l.person_id: l.role for l in people}
+        diff = _people_diff(links, desired)
+        people_changed = any(diff.values())
+
+        if changed:
+            sets = [f"{f}=?" for f in changed]
+            args = [values[f] for f in changed]
+            if "platform" in changed or "url" in changed:
+                current.update(values)
+                sets.append("video_key=?")
+                args.append(video_key(current["platform"], current["url"]))
+            execute(db, f"UPDATE media SET {', '.join(sets)}, updated_at=datetime('now') WHERE id=?", (*args, mid))
+        elif people_changed:
+            execute(db, "UPDATE media SET updated_at=datetime('now') WHERE id=?", (mid,))
+        _apply_people_diff(db, mid, diff)
+    if changed or people_changed:
+        after_commit(db, bump_version, "media")
+    current.update(values)
+    current["people"] = [{"person_id": p, "role": r} for p, r in sorted(desired.items())]
+    return {"media": current, "changed": changed + (["people"] if people_changed else []), "people": diff}
+
 def update(db, mid: int, m):
-    execute(
-        db,
-        """
-        UPDATE media SET title=?, description=?, platform=?, url=?, published_at=?, line_id=?, system_id=?, updated_at=datetime('now')
-        WHERE id=?
-        """,
-        (m.title, m.description, m.platform, str(m.url), m.published_at.isoformat(), m.line_id, m.system_id, mid),
-    )
-    execute(db, "DELETE FROM media_person WHERE media_id=?", (mid,))
-    for link in m.people:
-        execute(db, "INSERT INTO media_person(media_id, person_id, role) VALUES(?,?,?)",
-                (mid, link.person_id, link.role))
-    return get_one(db, mid)
+    """PUT: substitui tudo, mas grava só a diferença (ver patch)."""
+    return patch(db, mid, m.model_dump(exclude={"people"}), m.people)["media"]
 
 def delete(db, mid: int):
-    return delete_or_404(db, "DELETE FROM media WHERE id=?", (mid,), "Mídia não encontrada")
+    try:
+        out = delete_or_404(db, "DELETE FROM media WHERE id=?", (mid,), "Mídia não encontrada")
+    except HTTPException:
+        raise _not_found(db, mid) from None
+    after_commit(db, bump_version, "media")
+    return out
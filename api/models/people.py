@@ -1,5 +1,7 @@
 from typing import Optional
-from ..core.db import execute, query_all, fetch_one_or_404, delete_or_404
+from ..core.db import after_commit, execute, transaction, query_all, fetch_one_or_404, delete_or_404
+from ..core.versions import bump_version
+from . import users as users_model
 
 def _clean_email(value: Optional[str]) -> Optional[str]:
     if value is None:
@@ -8,8 +10,10 @@ def _clean_email(value: Optional[str]) -> Optional[str]:
     return v if v else None
 
 def create(db, name: str, email: Optional[str]):
-    cur = execute(db, "INSERT INTO person(name,email) VALUES(?,?)", (name, _clean_email(email)))
-    pid = cur.lastrowid
+    with transaction(db):
+        cur = execute(db, "INSERT INTO person(name,email) VALUES(?,?)", (name, _clean_email(email)))
+        pid = cur.lastrowid
+    after_commit(db, bump_version, "person")
     return fetch_one_or_404(db, "SELECT id,name,email FROM person WHERE id=?", (pid,), "Pessoa não encontrada")
 
 def list_all(db):
@@ -19,8 +23,14 @@ def get_one(db, pid: int):
     return fetch_one_or_404(db, "SELECT id,name,email FROM person WHERE id=?", (pid,), "Pessoa não encontrada")
 
 def update(db, pid: int, name: str, email: Optional[str]):
-    execute(db, "UPDATE person SET name=?, email=? WHERE id=?", (name, _clean_email(email), pid))
+    with transaction(db):
+        execute(db, "UPDATE person SET name=?, email=? WHERE id=?", (name, _clean_email(email), pid))
+    after_commit(db, bump_version, "person")
     return fetch_one_or_404(db, "SELECT id,name,email FROM person WHERE id=?", (pid,), "Pessoa não encontrada")
 
 def delete(db, pid: int):
-    return delete_or_404(db, "DELETE FROM person WHERE id=?", (pid,), "Pessoa não encontrada")
+    out = delete_or_404(db, "DELETE FROM person WHERE id=?", (pid,), "Pessoa não encontrada")
+    after_commit(db, bump_version, "person")   # cascata em media_person
+    # ON DELETE SET NULL zera user.person_id: os usuários em cache ficaram velhos
+    after_commit(db, users_model.invalidate)
+    return out
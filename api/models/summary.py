@@ -0,0 +1,111 @@
+# api/models/summary.py
+"""
+Contagens de mídias por plataforma/linha/sistema/mês/pessoa, lidas da
+tabela media_summary (mantida por triggers, ver db/migrations/0001_schema.sql).
+Mídias arquivadas continuam contando (api/models/archive.py compensa os
+triggers ao mover), e rebuild/check somam os arquivos de cada ano.
+
+Reconstruir ou conferir na linha de comando:
+    python -m api.models.summary rebuild
+    python -m api.models.summary check
+"""
+from typing import Dict, List, Tuple
+from ..core.db import query_all, transaction
+from . import archive
+
+DIMENSIONS = ("platform", "line", "system", "month", "person")
+
+# contagem "de verdade", direto de media/media_person (O(mídias))
+_COUNT_SQL = """
+SELECT 'platform' AS dim, platform AS key, count(*) AS count FROM {media} GROUP BY platform
+UNION ALL SELECT 'line', COALESCE(line_id, ''), count(*) FROM {media} GROUP BY line_id
+UNION ALL SELECT 'system', COALESCE(system_id, ''), count(*) FROM {media} GROUP BY system_id
+UNION ALL SELECT 'month', substr(published_at, 1, 7), count(*) FROM {media} GROUP BY substr(published_at, 1, 7)
+UNION ALL SELECT 'person', person_id, count(*) FROM {media_person} GROUP BY person_id
+"""
+_EXPECTED_SQL = _COUNT_SQL.format(media="media", media_person="media_person")
+
+_NAMED = {
+    "line": "SELECT s.key, s.count, l.name FROM media_summary s LEFT JOIN line l ON l.id = s.key "
+            "WHERE s.dim = 'line' AND s.count > 0 ORDER BY s.count DESC, s.key",
+    "system": "SELECT s.key, s.count, x.name FROM media_summary s LEFT JOIN system x ON x.id = s.key "
+              "WHERE s.dim = 'system' AND s.count > 0 ORDER BY s.count DESC, s.key",
+    "person": "SELECT s.key, s.count, p.name FROM media_summary s LEFT JOIN person p ON p.id = s.key "
+              "WHERE s.dim = 'person' AND s.count > 0 ORDER BY s.count DESC, s.key",
+}
+
+def _id(key: str):
+    return int(key) if key != "" else None
+
+def get(db) -> Dict:
+    """Resumo completo; custa O(grupos), não O(mídias)."""
+    platforms = query_all(db, "SELECT key, count FROM media_summary WHERE dim = 'platform' AND count > 0 ORDER BY key")
+    months = query_all(db, "SELECT key, count FROM media_summary WHERE dim = 'month' AND count > 0 ORDER BY key DESC")
+    named = {dim: query_all(db, sql) for dim, sql in _NAMED.items()}
+    return {
+        "total": sum(r["count"] for r in platforms),
+        "by_platform": [{"platform": r["key"], "count": r["count"]} for r in platforms],
+        "by_line": [{"line_id": _id(r["key"]), "name": r["name"], "count": r["count"]} for r in named["line"]],
+        "by_system": [{"system_id": _id(r["key"]), "name": r["name"], "count": r["count"]} for r in named["system"]],
+        "by_person": [{"person_id": _id(r["key"]), "name": r["name"], "count": r["count"]} for r in named["person"]],
+        "by_month": [{"month": r["key"], "count": r["count"]} for r in months],
+    }
+
+def _archived(db) -> Dict[Tuple[str, str], int]:
+    """Contagens das mídias arquivadas, um ano anexado por vez (fora de transação)."""
+    counts: Dict[Tuple[str, str], int] = {}
+    for year in archive.years_for(db):
+        s = archive.attach(db, [year])[0]
+        valid = f"SELECT id FROM {s}.media m WHERE {archive.visible(s)}"
+        sql = _COUNT_SQL.format(media=f"(SELECT * FROM {s}.media WHERE id IN ({valid}))",
+                                media_person=f"(SELECT * FROM {s}.media_person WHERE media_id IN ({valid}))")
+        for r in query_all(db, sql):
+            key = (r["dim"], str(r["key"]))
+            counts[key] = counts.get(key, 0) + r["count"]
+    return counts
+
+def rebuild(db) -> int:
+    """Recalcula media_summary do zero; devolve quantos grupos gravou."""
+    archived = _archived(db)
+    with transaction(db):
+        db.execute("DELETE FROM media_summary")
+        db.execute(f"INSERT INTO media_summary(dim, key, count) SELECT dim, key, count FROM ({_EXPECTED_SQL})")
+        db.executemany("INSERT INTO media_summary(dim, key, count) VALUES(?, ?, ?) "
+                       "ON CONFLICT(dim, key) DO UPDATE SET count = count + excluded.count",
+                       [(dim, key, n) for (dim, key), n in archived.items()])
+        return db.execute("SELECT count(*) FROM media_summary").fetchone()[0]
+
+def check(db) -> List[Dict]:
+    """Compara media_summary com a contagem real; lista vazia = consistente."""
+    expected = _archived(db)
+    for r in query_all(db, _EXPECTED_SQL):
+        key = (r["dim"], str(r["key"]))
+        expected[key] = expected.get(key, 0) + r["count"]
+    stored = {(r["dim"], r["key"]): r["count"]
+              for r in query_all(db, "SELECT dim, key, count FROM media_summary WHERE count <> 0")}
+    diffs = []
+    for dim, key in sorted(expected.keys() | stored.keys()):
+        want, got = expected.get((dim, key), 0), stored.get((dim, key), 0)
+        if want != got:
+            diffs.append({"dim": dim, "key": key, "expected": want, "stored": got})
+    return diffs
+
+if __name__ == "__main__":
+    import sys
+    from ..core.db import connect
+
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "check"
+    conn = connect()
+    try:
+        if cmd == "rebuild":
+            print(f"[summary] {rebuild(conn)} grupos recalculados")
+        elif cmd == "check":
+            diffs = check(conn)
+            for d in diffs:
+                print(f"[summary] {d['dim']}={d['key']!r}: esperado {d['expected']}, gravado {d['stored']}")
+            print("[summary] OK" if not diffs else f"[summary] {len(diffs)} divergências (rode 'rebuild')")
+            sys.exit(1 if diffs else 0)
+        else:
+            sys.exit("uso: python -m api.models.summary [rebuild|check]")
+    finally:
+        conn.close()
@@ -1,16 +1,23 @@
-from ..core.db import execute, query_all, fetch_one_or_404, delete_or_404
+from ..core.db import after_commit, execute, transaction, query_all, fetch_one_or_404, delete_or_404
+from ..core.versions import bump_version
 
 def create(db, name: str):
-    cur = execute(db, "INSERT INTO system(name) VALUES(?)", (name,))
-    sid = cur.lastrowid
+    with transaction(db):
+        cur = execute(db, "INSERT INTO system(name) VALUES(?)", (name,))
+        sid = cur.lastrowid
+    after_commit(db, bump_version, "system")
     return fetch_one_or_404(db, "SELECT id,name FROM system WHERE id=?", (sid,), "Sistema não encontrado")
 
 def list_all(db):
     return query_all(db, "SELECT id,name FROM system ORDER BY name")
 
 def update(db, sid: int, name: str):
-    execute(db, "UPDATE system SET name=? WHERE id=?", (name, sid))
+    with transaction(db):
+        execute(db, "UPDATE system SET name=? WHERE id=?", (name, sid))
+    after_commit(db, bump_version, "system")
     return fetch_one_or_404(db, "SELECT id,name FROM system WHERE id=?", (sid,), "Sistema não encontrado")
 
 def delete(db, sid: int):
-    return delete_or_404(db, "DELETE FROM system WHERE id=?", (sid,), "Sistema não encontrado")
+    out = delete_or_404(db, "DELETE FROM system WHERE id=?", (sid,), "Sistema não encontrado")
+    after_commit(db, bump_version, "system")   # ON DELETE SET NULL também mexe em media.system_id
+    return out
@@ -1,7 +1,7 @@
 # api/models/users.py
 from typing import Optional, Dict, Any
-from ..core.db import execute, query_one, query_all
-from ..core.security import hash_password  # bcrypt
+from ..core.db import after_commit, execute, transaction, query_one, query_all
+from ..core.cache import user_cache
 
 def get_by_username(db, username: str) -> Optional[Dict[str, Any]]:
     return query_one(db,
@@ -20,11 +20,25 @@ def list_all(db):
         "SELECT id, username, role, person_id, created_at FROM user ORDER BY username",
     )
 
-def create(db, *, username: str, token: str, role: str = "user", person_id: Optional[int] = None):
-    th = hash_password(token)
-    cur = execute(db,
-        "INSERT INTO user(username, password_hash, role, person_id) VALUES (?,?,?,?)",
-        (username, th, role, person_id),
-    )
-    uid = cur.lastrowid
+def create(db, *, username: str, password_hash: str, role: str = "user", person_id: Optional[int] = None):
+    # o hash vem pronto (security.hash_executor): bcrypt não roda dentro da fila de escrita
+    with transaction(db):
+        cur = execute(db,
+            "INSERT INTO user(username, password_hash, role, person_id) VALUES (?,?,?,?)",
+            (username, password_hash, role, person_id),
+        )
+        uid = cur.lastrowid
+    after_commit(db, invalidate, uid)
     return get_by_id(db, uid)
+
+def set_password_hash(db, uid: int, password_hash: str) -> None:
+    with transaction(db):
+        execute(db, "UPDATE user SET password_hash=? WHERE id=?", (password_hash, uid))
+    after_commit(db, invalidate, uid)
+
+def invalidate(uid: Optional[int] = None) -> None:
+    """Descarta o usuário do cache de sessão (todos, se uid=None). Chamar após qualquer escrita em user."""
+    if uid is None:
+        user_cache.clear()
+    else:
+        user_cache.invalidate(uid)
@@ -0,0 +1,149 @@
+# api/models/video_keys.py
+"""
+Chave canônica do vídeo (media.video_key), para o mesmo vídeo não entrar
+duas vezes com URLs diferentes:
+  youtube – o id do vídeo: youtu.be/X, youtube.com/watch?v=X&t=10,
+            /embed/X, /shorts/X, /live/X, m./music./youtube-nocookie...
+  vimeo   – o id numérico: vimeo.com/123, /123/hash, player.vimeo.com/video/123,
+            /channels/x/123, /groups/x/videos/123, /album/9/video/123
+O índice único parcial (platform, video_key) garante a unicidade; URL não
+reconhecida fica com video_key NULL (sem checagem).
+
+Bancos anteriores à coluna: preencher em lotes, com transações curtas
+(a API continua escrevendo entre um lote e outro):
+    python -m api.models.video_keys backfill [--chunk 1000] [--pause 0.05]
+Mídias repetidas ficam sem chave e são listadas, com a mídia original.
+"""
+import re
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from ..core.db import execute, query_all, query_one, transaction
+from . import archive
+
+BACKFILL_CHUNK = 1000
+
+_YOUTUBE_HOSTS = {"youtube.com", "youtube-nocookie.com", "youtu.be"}
+_YOUTUBE_PATHS = {"embed", "shorts", "live", "v", "e"}
+_YOUTUBE_ID = re.compile(r"^[A-Za-z0-9_-]+$")
+_VIMEO_HOSTS = {"vimeo.com", "player.vimeo.com"}
+_VIMEO_CONTAINERS = {"album", "showcase"}   # o número seguinte é do álbum, não do vídeo
+
+def _split(url: str) -> Optional[Tuple[str, List[str], str]]:
+    """(host sem www./m./music., segmentos do caminho, query); None se a URL nem se deixa quebrar."""
+    url = url.strip()
+    if "://" not in url:
+        url = "https://" + url
+    try:
+        parts = urlsplit(url)   # ex.: "http://[abc" -> ValueError('Invalid IPv6 URL')
+    except ValueError:
+        return None
+    host = (parts.hostname or "").lower()
+    for prefix in ("www.", "m.", "music."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    return host, [s for s in parts.path.split("/") if s], parts.query
+
+def _youtube(host: str, segments: List[str], query: str) -> Optional[str]:
+    if host not in _YOUTUBE_HOSTS:
+        return None
+    if host == "youtu.be":
+        vid = segments[0] if segments else None
+    elif segments[:1] == ["watch"]:
+        vid = (parse_qs(query).get("v") or [None])[0]
+    elif len(segments) >= 2 and segments[0] in _YOUTUBE_PATHS:
+        vid = segments[1]
+    else:
+        return None
+    return vid if vid and _YOUTUBE_ID.match(vid) else None
+
+def _vimeo(host: str, segments: List[str]) -> Optional[str]:
+    if host not in _VIMEO_HOSTS:
+        return None
+    skip = False
+    for seg in segments:
+        if seg.isdigit() and not skip:
+            return str(int(seg))
+        skip = seg in _VIMEO_CONTAINERS
+    return None
+
+def video_key(platform: str, url: str) -> Optional[str]:
+    """Id do vídeo na plataforma, ou None se a URL não for dela."""
+    split = _split(url)
+    if split is None:
+        return None
+    host, segments, query = split
+    if platform == "youtube":
+        return _youtube(host, segments, query)
+    if platform == "vimeo":
+        return _vimeo(host, segments)
+    return None
+
+def detect(url: str) -> Optional[Tuple[str, str]]:
+    """(plataforma, chave) deduzidas só da URL."""
+    split = _split(url)
+    if split is None:
+        return None
+    host, segments, query = split
+    key = _youtube(host, segments, query)
+    if key:
+        return "youtube", key
+    key = _vimeo(host, segments)
+    return ("vimeo", key) if key else None
+
+def find(db, platform: str, key: str) -> Optional[Dict]:
+    """Mídia já cadastrada com esse vídeo (busca pelo índice único)."""
+    return query_one(db, "SELECT * FROM media WHERE platform = ? AND video_key = ?", (platform, key))
+
+def backfill(db, chunk: int = BACKFILL_CHUNK, pause: float = 0.0, verbose: bool = False) -> Dict:
+    """
+    Preenche video_key das mídias sem chave, `chunk` por transação, em
+    ordem de id. Pode ser interrompido e rodado de novo.
+    """
+    stats: Dict = {"scanned": 0, "updated": 0, "unrecognized": 0, "duplicates": []}
+    last = 0
+    while True:
+        rows = query_all(db, "SELECT id, platform, url FROM media WHERE id > ? AND video_key IS NULL ORDER BY id LIMIT ?",
+                         (last, chunk))
+        if not rows:
+            break
+        last = rows[-1]["id"]
+        with transaction(db):
+            for r in rows:
+                key = video_key(r["platform"], r["url"])
+                if key is None:
+                    stats["unrecognized"] += 1
+                    continue
+                original = find(db, r["platform"], key)
+                original_id = original["id"] if original else archive.find_key(db, r["platform"], key)
+                if original_id:
+                    stats["duplicates"].append({"id": r["id"], "original_id": original_id, "video_key": key})
+                    continue
+                execute(db, "UPDATE media SET video_key = ? WHERE id = ?", (key, r["id"]))
+                stats["updated"] += 1
+        stats["scanned"] += len(rows)
+        if verbose:
+            print(f"[video_keys] até id {last}: {stats['updated']} chaves, {len(stats['duplicates'])} repetidas")
+        if pause:
+            time.sleep(pause)   # folga para o escritor da API
+    return stats
+
+if __name__ == "__main__":
+    from ..core.db import connect
+
+    args = sys.argv[1:]
+    if not args or args[0] != "backfill":
+        print("uso: python -m api.models.video_keys backfill [--chunk 1000] [--pause 0.05]")
+        sys.exit(2)
+    opts = dict(zip(args[1::2], args[2::2]))
+    conn = connect()
+    try:
+        result = backfill(conn, chunk=int(opts.get("--chunk", BACKFILL_CHUNK)),
+                          pause=float(opts.get("--pause", 0)), verbose=True)
+    finally:
+        conn.close()
+    for d in result["duplicates"]:
+        print(f"repetida: mídia {d['id']} = mídia {d['original_id']} ({d['video_key']})")
+    print(f"{result['scanned']} lidas, {result['updated']} chaves gravadas, "
+          f"{result['unrecognized']} URLs não reconhecidas, {len(result['duplicates'])} repetidas")
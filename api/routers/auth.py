@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Response, HTTPException, Depends
+from fastapi import APIRouter, Request, Response, HTTPException, Depends
 from pydantic import BaseModel
-from ..core.db import get_db
-from ..core.security import verify_password, sign_session
+from ..core import adb
+from ..core.ratelimit import login_limiter
+from ..core.security import verify_password, hash_password, needs_rehash, hash_executor, sign_session, session_data
 from ..models import users as users_model
 from ..core.deps import require_auth  # mesma dependência para /me e /ping
 
@@ -12,13 +13,28 @@ class LoginIn(BaseModel):
     token: str  # segredo do usuário (armazenado como hash no banco)
 
 @router.post("/login")
-def login(payload: LoginIn, response: Response, db=Depends(get_db)):
+async def login(payload: LoginIn, request: Request, response: Response):
+    # async: banco e bcrypt rodam em executores próprios, fora do threadpool das rotas
     uname = payload.username.strip().lower()
-    u = users_model.get_by_username(db, uname)
-    if not u or not verify_password(payload.token, u["password_hash"]):
+    ip = request.client.host if request.client else "-"
+    # a tentativa já conta aqui, antes do await: as simultâneas não passam todas do limite
+    attempt = login_limiter.check(uname, ip)
+    try:
+        u = await adb.read(users_model.get_by_username, uname)
+        ok = u is not None and await hash_executor.run(verify_password, payload.token, u["password_hash"])
+    except BaseException:
+        login_limiter.release(uname, ip, attempt)   # 503 do executor, banco fora: não foi falha de senha
+        raise
+    if not ok or u is None:
         raise HTTPException(status_code=401, detail="Credenciais inválidas")
+    login_limiter.success(uname, ip, attempt)
 
-    session = sign_session({"uid": u["id"], "role": u["role"]})
+    if needs_rehash(u["password_hash"]):
+        # custo do bcrypt mudou: aproveita a senha em mãos para refazer o hash
+        new_hash = await hash_executor.run(hash_password, payload.token)
+        await adb.write(users_model.set_password_hash, u["id"], new_hash)
+
+    session = sign_session(session_data(u))
     response.set_cookie(
         key="session",
         value=session,
@@ -40,5 +56,5 @@ def me(user=Depends(require_auth)):
     return {"user": user}
 
 @router.get("/ping", dependencies=[Depends(require_auth)])
-def ping():
+async def ping():
     return {"ok": True}
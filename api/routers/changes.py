@@ -0,0 +1,24 @@
+from typing import Optional
+from fastapi import APIRouter, Query
+from ..core import adb
+from ..core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from .. import schemas
+from ..models import changes as changes_model
+
+router = APIRouter(prefix="/changes", tags=["changes"])
+
+@router.get(
+    "",
+    response_model=schemas.Changes,
+    summary="Alterações desde um cursor (todas as entidades, só ids)",
+)
+async def list_changes(
+    since: int = Query(0, ge=0, description="next_since da chamada anterior (0 = carga completa)"),
+    entity: Optional[schemas.ChangeEntity] = Query(None, description="media, person, line ou system"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Alterações por página"),
+):
+    """
+    Mesmo cursor de /media/changes, mas para pessoas, linhas e sistemas
+    também, e sem os dados: o cliente rebusca só os ids que mudaram.
+    """
+    return await adb.read_json(schemas.Changes, changes_model.since, since, limit, entity)
@@ -1,8 +1,9 @@
 from typing import List
-from fastapi import APIRouter, Depends
-from ..core.db import get_db
+from fastapi import APIRouter, Depends, Request
+from ..core import adb
 from ..core.deps import require_auth
 from ..core.errors import ErrorResponse
+from ..core.httpcache import conditional_json
 from .. import schemas
 from ..models import lines as lines_model
 
@@ -25,9 +26,8 @@ router = APIRouter(prefix="/lines", tags=["lines"])
         }
     },
 )
-def create_line(l: schemas.LineIn):
-    db = get_db()
-    return lines_model.create(db, l.name)
+async def create_line(l: schemas.LineIn):
+    return await adb.write(lines_model.create, l.name)
 
 @router.get(
     "",
@@ -35,9 +35,8 @@ def create_line(l: schemas.LineIn):
     response_model_exclude_none=True,
     summary="Listar linhas",
 )
-def list_lines():
-    db = get_db()
-    return lines_model.list_all(db)
+async def list_lines(request: Request):
+    return await conditional_json(request, ("line",), List[schemas.LineOut], lambda: adb.read(lines_model.list_all))
 
 @router.put(
     "/{lid}",
@@ -51,9 +50,8 @@ def list_lines():
         409: {"model": ErrorResponse, "description": "Linha já existe"},
     },
 )
-def update_line(lid: int, l: schemas.LineIn):
-    db = get_db()
-    return lines_model.update(db, lid, l.name)
+async def update_line(lid: int, l: schemas.LineIn):
+    return await adb.write(lines_model.update, lid, l.name)
 
 @router.delete(
     "/{lid}",
@@ -65,6 +63,5 @@ def update_line(lid: int, l: schemas.LineIn):
         404: {"model": ErrorResponse, "description": "Linha não encontrada"},
     },
 )
-def delete_line(lid: int):
-    db = get_db()
-    return lines_model.delete(db, lid)
+async def delete_line(lid: int):
+    return await adb.write(lines_model.delete, lid)
@@ -1,8 +1,14 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, Query
-from ..core.db import get_db
+import csv
+import io
+import os
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic import ValidationError
+from ..core import adb
 from ..core.deps import require_auth
 from ..core.errors import ErrorResponse
+from ..core.httpcache import conditional_json
+from ..core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from .. import schemas
 from ..models import media as media_model
 
@@ -34,45 +40,223 @@ create_example = {
         "requestBody": {"content": {"application/json": {"example": create_example}}}
     },
 )
-def create_media(m: schemas.MediaIn):
-    db = get_db()
-    return media_model.create(db, m)
+async def create_media(m: schemas.MediaIn):
+    return await adb.write(media_model.create, m)
+
+MEDIA_ITEM_TABLES = ("media", "line", "system", "person")
+# listagem com o JSON montado no SQLite (media.list_page_json); 0 volta à validação por item
+MEDIA_FAST_JSON = os.getenv("MEDIA_FAST_JSON", "1") == "1"
+BULK_MAX_ITEMS = 50_000
+BULK_CSV_COLUMNS = ["title", "description", "platform", "url", "published_at", "line_id", "system_id", "people"]
+
+def _people_from_csv(value: str) -> List[dict]:
+    # "1:responsavel;2:participante"
+    links = []
+    for part in filter(None, (p.strip() for p in (value or "").split(";"))):
+        person_id, _, role = part.partition(":")
+        links.append({"person_id": person_id.strip(), "role": role.strip()})
+    return links
+
+def _rows_from_csv(raw: bytes) -> List[dict]:
+    reader = csv.DictReader(io.StringIO(raw.decode("utf-8-sig")))
+    rows = []
+    for rec in reader:
+        row = {k: (v.strip() or None) if isinstance(v, str) else v for k, v in rec.items() if k}
+        row["people"] = _people_from_csv(row.get("people") or "")
+        rows.append(row)
+    return rows
+
+def _expand_param(value: Optional[str]) -> Tuple[str, ...]:
+    parts = list(dict.fromkeys(p.strip() for p in (value or "").split(",") if p.strip()))
+    unknown = [p for p in parts if p not in media_model.MEDIA_EXPAND]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"expand inválido: {', '.join(unknown)} "
+                                                    f"(use {', '.join(media_model.MEDIA_EXPAND)})")
+    return tuple(parts)
+
+def _ids_param(value: Optional[str]) -> Optional[List[int]]:
+    if value is None:
+        return None
+    try:
+        ids = list(dict.fromkeys(int(p) for p in value.split(",") if p.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids deve ser uma lista de números separados por vírgula")
+    if not ids or len(ids) > media_model.MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"Informe de 1 a {media_model.MAX_IDS} ids")
+    return ids
+
+EXPAND_DESCRIPTION = "Resolver nomes na mesma consulta: people, line, system (separados por vírgula)"
+
+async def _read_bulk_rows(request: Request) -> List:
+    ctype = request.headers.get("content-type", "")
+    if ctype.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Envie o CSV no campo 'file'")
+        return _rows_from_csv(await upload.read())
+    if "csv" in ctype:
+        return _rows_from_csv(await request.body())
+    try:
+        data = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="JSON inválido")
+    if not isinstance(data, list):
+        raise HTTPException(status_code=400, detail="Envie uma lista de mídias")
+    return data
+
+@router.post(
+    "/bulk",
+    response_model=schemas.MediaBulkResult,
+    dependencies=[Depends(require_auth)],
+    summary="Importar mídias em massa (JSON ou CSV)",
+    responses={
+        400: {"model": ErrorResponse, "description": "Corpo inválido"},
+        401: {"model": ErrorResponse, "description": "Unauthorized"},
+        413: {"model": ErrorResponse, "description": "Itens demais"},
+    },
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                "application/json": {"example": [create_example]},
+                "text/csv": {"example": ",".join(BULK_CSV_COLUMNS) + "\n"
+                             "Live,Evento,youtube,https://youtube.com/watch?v=abc123,2025-08-10,1,1,1:responsavel"},
+                "multipart/form-data": {"schema": {"type": "object", "properties": {"file": {"type": "string", "format": "binary"}}}},
+            }
+        }
+    },
+)
+async def bulk_media(request: Request):
+    """
+    Aceita uma lista JSON de mídias, um CSV no corpo (text/csv) ou um upload
+    multipart no campo `file`. No CSV, `people` vem como `1:responsavel;2:participante`.
+    Linhas inválidas não impedem as demais; os erros voltam com o número da linha (1 = primeira).
+    """
+    rows = await _read_bulk_rows(request)
+    if len(rows) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Máximo de {BULK_MAX_ITEMS} mídias por importação")
+
+    items, errors = [], []
+    for row_no, row in enumerate(rows, start=1):
+        try:
+            items.append((row_no, schemas.MediaIn.model_validate(row)))
+        except ValidationError as exc:
+            errors.append({"row": row_no, "message": "Erro de validação",
+                           "details": exc.errors(include_url=False, include_context=False)})
+
+    # um job do escritor por lote: cada lote tem o seu commit, e as outras
+    # escritas entram na fila entre um lote e outro
+    ids: List[int] = []
+    for start in range(0, len(items), media_model.BULK_BATCH_SIZE):
+        part = await adb.write(media_model.bulk_insert, items[start:start + media_model.BULK_BATCH_SIZE])
+        ids += part["ids"]
+        errors += part["errors"]
+    return {"created": len(ids), "ids": ids, "errors": sorted(errors, key=lambda e: e["row"])}
+
+@router.get(
+    "/lookup",
+    response_model=schemas.MediaLookup,
+    summary="Procurar mídia pelo vídeo (qualquer forma da URL)",
+    responses={400: {"model": ErrorResponse, "description": "URL não reconhecida"}},
+)
+async def lookup_media(url: str = Query(..., description="URL do YouTube ou do Vimeo, ex.: https://youtu.be/abc123")):
+    """
+    Extrai a chave do vídeo (youtu.be/X e youtube.com/watch?v=X&t=10 dão a
+    mesma) e procura pelo índice único; sem `media` se não houver.
+    """
+    return await adb.read_json(schemas.MediaLookup, media_model.lookup, url)
+
+@router.get(
+    "/changes",
+    response_model=schemas.MediaChanges,
+    response_model_exclude_none=True,
+    summary="Mídias alteradas desde um cursor (sincronização incremental)",
+)
+async def media_changes(
+    since: int = Query(0, ge=0, description="next_since da chamada anterior (0 = carga completa)"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Alterações por página"),
+):
+    """
+    Uma entrada por mídia criada/alterada/excluída depois de `since`, em
+    ordem de seq, com o estado atual (`media`) ou `op: delete`. Repita com
+    `next_since` enquanto `has_more`; depois, guarde `next_since` para a
+    próxima sincronização.
+    """
+    return await adb.read_json(schemas.MediaChanges, media_model.changes_since, since, limit)
 
 @router.get(
     "/{mid}",
     response_model=schemas.MediaOut,
     response_model_exclude_none=True,
     summary="Obter mídia por ID",
-    responses={404: {"model": ErrorResponse, "description": "Mídia não encontrada"}},
+    responses={
+        400: {"model": ErrorResponse, "description": "expand inválido"},
+        404: {"model": ErrorResponse, "description": "Mídia não encontrada"},
+    },
 )
-def get_media(mid: int):
-    db = get_db()
-    return media_model.get_one(db, mid)
+async def get_media(mid: int, request: Request,
+                    expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION)):
+    expand_ = _expand_param(expand)
+    # depende também de line/system/person: exclusões ali mexem na mídia via FK
+    return await conditional_json(request, MEDIA_ITEM_TABLES, schemas.MediaOut,
+                                  lambda: adb.read(media_model.get_one, mid, expand_))
 
 @router.get(
     "",
-    response_model=List[schemas.MediaOut],
+    response_model=schemas.MediaPage,
     response_model_exclude_none=True,
-    summary="Listar/filtrar mídias",
+    summary="Listar/filtrar mídias (paginado por cursor)",
+    responses={400: {"model": ErrorResponse,
+                     "description": "Cursor, ids ou expand inválido; período com anos arquivados demais"}},
 )
-def list_media(
+async def list_media(
+    q: Optional[str] = Query(None, description="Busca em título/descrição (ignora acentos; ordena por relevância)"),
     platform: Optional[schemas.Platform] = Query(None, description="vimeo ou youtube"),
     person_id: Optional[int] = Query(None, description="Filtra por pessoa (participação)"),
     line_id: Optional[int] = Query(None, description="Filtra por linha"),
     system_id: Optional[int] = Query(None, description="Filtra por sistema"),
     date_from: Optional[str] = Query(None, description="Data inicial (YYYY-MM-DD)"),
     date_to: Optional[str] = Query(None, description="Data final (YYYY-MM-DD)"),
+    ids: Optional[str] = Query(None, description="Só estas mídias, ex.: 1,2,3 (multi-get)"),
+    expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE,
+                                 description=f"Itens por página (padrão {DEFAULT_PAGE_SIZE}; com ids, todos)"),
+    cursor: Optional[str] = Query(None, description="next_cursor da página anterior"),
 ):
-    db = get_db()
-    return media_model.list_all(
-        db,
-        platform=platform,
-        person_id=person_id,
-        line_id=line_id,
-        system_id=system_id,
-        date_from=date_from,
-        date_to=date_to,
-    )
+    """
+    Ordenado por published_at DESC, id DESC (ou por relevância, com `q`).
+    `next_cursor` some na última página.
+
+    `ids` busca várias mídias numa chamada (ids inexistentes só não aparecem;
+    combina com os demais filtros). `expand` embute os nomes: `line` e
+    `system` viram objetos `{name, id}` e cada pessoa ganha `name` — a
+    página inteira sai de uma consulta, sem chamar /people, /lines, /systems.
+
+    Mídias arquivadas (api/models/archive.py) entram quando o período
+    alcança o ano delas; a busca `q` olha só as não arquivadas.
+    """
+    ids_, expand_ = _ids_param(ids), _expand_param(expand)   # 400 antes de ir ao banco
+    fn = media_model.list_page_json if MEDIA_FAST_JSON else media_model.list_page
+
+    def page(db):
+        return fn(
+            db,
+            q=q.strip() if q else None,
+            limit=limit or (len(ids_) if ids_ else DEFAULT_PAGE_SIZE),
+            cursor=cursor,
+            platform=platform,
+            person_id=person_id,
+            line_id=line_id,
+            system_id=system_id,
+            date_from=date_from,
+            date_to=date_to,
+            ids=ids_,
+            expand=expand_,
+        )
+
+    if MEDIA_FAST_JSON:
+        return await adb.read_body(page)
+    return await adb.read_json(schemas.MediaPage, page)
 
 @router.put(
     "/{mid}",
@@ -83,16 +267,43 @@ def list_media(
     responses={
         401: {"model": ErrorResponse, "description": "Unauthorized"},
         404: {"model": ErrorResponse, "description": "Mídia não encontrada"},
-        409: {"model": ErrorResponse, "description": "Conflito de integridade (UNIQUE/CHECK)"},
+        409: {"model": ErrorResponse, "description": "Conflito de integridade (UNIQUE/CHECK) ou mídia arquivada"},
         422: {"model": ErrorResponse, "description": "Erro de validação"},
     },
     openapi_extra={
         "requestBody": {"content": {"application/json": {"example": create_example}}}
     },
 )
-def update_media(mid: int, m: schemas.MediaIn):
-    db = get_db()
-    return media_model.update(db, mid, m)
+async def update_media(mid: int, m: schemas.MediaIn):
+    return await adb.write(media_model.update, mid, m)
+
+@router.patch(
+    "/{mid}",
+    response_model=schemas.MediaPatchResult,
+    response_model_exclude_none=True,
+    dependencies=[Depends(require_auth)],
+    summary="Alterar parte de uma mídia",
+    responses={
+        401: {"model": ErrorResponse, "description": "Unauthorized"},
+        404: {"model": ErrorResponse, "description": "Mídia não encontrada"},
+        409: {"model": ErrorResponse, "description": "Conflito de integridade (UNIQUE/CHECK) ou mídia arquivada"},
+        422: {"model": ErrorResponse, "description": "Erro de validação"},
+    },
+    openapi_extra={
+        "requestBody": {"content": {"application/json": {"example": {
+            "title": "Live de Abertura (reprise)",
+            "people": [{"person_id": 1, "role": "responsavel"}, {"person_id": 2, "role": "participante"}],
+        }}}}
+    },
+)
+async def patch_media(mid: int, m: schemas.MediaPatch):
+    """
+    Só os campos enviados são comparados e gravados; `people`, se vier, é a
+    lista completa e vira insert/update/delete só dos vínculos que mudaram.
+    Sem diferença, nada é gravado (`changed` vazio, updated_at intacto).
+    """
+    people = m.people if "people" in m.model_fields_set else None
+    return await adb.write(media_model.patch, mid, m.model_dump(exclude_unset=True, exclude={"people"}), people)
 
 @router.delete(
     "/{mid}",
@@ -102,8 +313,8 @@ def update_media(mid: int, m: schemas.MediaIn):
         200: {"description": "OK"},
         401: {"model": ErrorResponse, "description": "Unauthorized"},
         404: {"model": ErrorResponse, "description": "Mídia não encontrada"},
+        409: {"model": ErrorResponse, "description": "Mídia arquivada (somente leitura)"},
     },
 )
-def delete_media(mid: int):
-    db = get_db()
-    return media_model.delete(db, mid)
+async def delete_media(mid: int):
+    return await adb.write(media_model.delete, mid)
@@ -1,8 +1,9 @@
 from typing import List
-from fastapi import APIRouter, Depends
-from ..core.db import get_db
+from fastapi import APIRouter, Depends, Request
+from ..core import adb
 from ..core.deps import require_auth
 from ..core.errors import ErrorResponse
+from ..core.httpcache import conditional_json
 from .. import schemas
 from ..models import people as people_model
 
@@ -29,10 +30,9 @@ router = APIRouter(prefix="/people", tags=["people"])
         }
     },
 )
-def create_person(p: schemas.PersonIn):
+async def create_person(p: schemas.PersonIn):
     """Cria uma nova pessoa (nome e e-mail opcional)."""
-    db = get_db()
-    return people_model.create(db, p.name, p.email)
+    return await adb.write(people_model.create, p.name, p.email)
 
 @router.get(
     "",
@@ -40,10 +40,9 @@ def create_person(p: schemas.PersonIn):
     response_model_exclude_none=True,
     summary="Listar pessoas",
 )
-def list_people():
+async def list_people(request: Request):
     """Lista todas as pessoas ordenadas por nome."""
-    db = get_db()
-    return people_model.list_all(db)
+    return await conditional_json(request, ("person",), List[schemas.PersonOut], lambda: adb.read(people_model.list_all))
 
 @router.get(
     "/{pid}",
@@ -52,9 +51,8 @@ def list_people():
     summary="Obter pessoa por ID",
     responses={404: {"model": ErrorResponse, "description": "Pessoa não encontrada"}},
 )
-def get_person(pid: int):
-    db = get_db()
-    return people_model.get_one(db, pid)
+async def get_person(pid: int, request: Request):
+    return await conditional_json(request, ("person",), schemas.PersonOut, lambda: adb.read(people_model.get_one, pid))
 
 @router.put(
     "/{pid}",
@@ -68,9 +66,8 @@ def get_person(pid: int):
         409: {"model": ErrorResponse, "description": "E-mail já cadastrado"},
     },
 )
-def update_person(pid: int, p: schemas.PersonIn):
-    db = get_db()
-    return people_model.update(db, pid, p.name, p.email)
+async def update_person(pid: int, p: schemas.PersonIn):
+    return await adb.write(people_model.update, pid, p.name, p.email)
 
 @router.delete(
     "/{pid}",
@@ -82,6 +79,5 @@ def update_person(pid: int, p: schemas.PersonIn):
         404: {"model": ErrorResponse, "description": "Pessoa não encontrada"},
     },
 )
-def delete_person(pid: int):
-    db = get_db()
-    return people_model.delete(db, pid)
+async def delete_person(pid: int):
+    return await adb.write(people_model.delete, pid)
@@ -1,34 +1,113 @@
-from typing import Optional, List
-from fastapi import APIRouter, Query
-from fastapi.responses import StreamingResponse
-import csv, io
-from ..core.db import get_db
+import os
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import FileResponse, StreamingResponse
+from ..core import adb, jobs
+from ..core.db import read_snapshot, report_db, snapshot_as_of
+from ..core.deps import require_auth
+from ..core.export import REPORT_SELECT, iter_csv, iter_ndjson
 from ..core.errors import ErrorResponse
+from ..core.httpcache import conditional_json
+from ..core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from .. import schemas
+from ..models import archive as archive_model
+from ..models import jobs as jobs_model
 from ..models import media as media_model
+from ..models import summary as summary_model
 
 router = APIRouter(prefix="/reports", tags=["reports"])
 
+# o resumo muda com mídias e com exclusões de linha/sistema/pessoa (FK)
+SUMMARY_TABLES = ("media", "line", "system", "person")
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+}
+
+def _stream_report(fmt: str, filters: dict):
+    """
+    Lê o relatório do cursor em lotes e devolve chunks já codificados.
+    Usa uma conexão só-leitura própria (o snapshot, se houver): o corpo é
+    gerado depois que o handler retorna.
+    """
+    with report_db() as (conn, _):
+        batches = media_model.iter_all(conn, batch_size=EXPORT_BATCH_SIZE, columns=REPORT_SELECT, **filters)
+        encode = iter_csv if fmt == "csv" else iter_ndjson
+        yield from encode(batches)
+
+def _export_job(job: dict, progress: jobs.Progress) -> str:
+    """
+    Handler dos jobs "report": o mesmo relatório do streaming, gravado em
+    arquivo. Contagem e linhas saem do mesmo snapshot de leitura.
+    """
+    fmt, filters = job["params"]["format"], job["params"]["filters"]
+    path = jobs.artifact_path(job, EXPORT_FORMATS[fmt][1])
+    encode = iter_csv if fmt == "csv" else iter_ndjson
+    with report_db() as (conn, _):
+        # anos arquivados: ATTACH não roda dentro da transação do snapshot
+        archive_model.attach_for(conn, **filters)
+        with read_snapshot(conn):
+            progress(0, media_model.count_all(conn, **filters))
+
+            def counted():
+                done = 0
+                for batch in media_model.iter_all(conn, batch_size=EXPORT_BATCH_SIZE, columns=REPORT_SELECT,
+                                                  **filters):
+                    yield batch
+                    done += len(batch)
+                    progress(done)
+
+            with jobs.write_artifact(path) as f:
+                for chunk in encode(counted()):
+                    f.write(chunk)
+    return str(path)
+
+jobs.register("report", _export_job)
+
+def _job_out(job: dict) -> dict:
+    total = job["total"]
+    return {
+        **job,
+        "format": job["params"]["format"],
+        "filters": job["params"]["filters"],
+        "percent": round(100 * job["progress"] / total, 1) if total else (100.0 if total == 0 else None),
+        "expires_at": jobs.expires_at(job),
+        "download_url": f"{router.prefix}/jobs/{job['id']}/download" if job["status"] == "done" else None,
+    }
+
+def _get_job(db, jid: int) -> dict:
+    job = jobs_model.get_one(db, jid)
+    if job["kind"] != "report":
+        raise HTTPException(404, "Job não encontrado")
+    return job
+
 @router.get(
     "/by-person",
-    summary="Relatório por pessoa (JSON ou CSV)",
+    response_model=schemas.MediaPage,
+    response_model_exclude_none=True,
+    summary="Relatório por pessoa (JSON, CSV ou NDJSON)",
     responses={
-        200: {"description": "JSON ou CSV com as mídias da pessoa"},
+        200: {"description": "JSON ({items, next_cursor}), CSV ou NDJSON com as mídias da pessoa. "
+                             "Com DB_SNAPSHOT_PATH, vem do snapshot e X-Data-As-Of diz de quando"},
+        400: {"model": ErrorResponse, "description": "Cursor inválido"},
         422: {"model": ErrorResponse, "description": "Erro de validação"},
     },
 )
-def report_by_person(
+async def report_by_person(
     person_id: int = Query(..., description="ID da pessoa"),
     date_from: Optional[str] = Query(None, description="YYYY-MM-DD"),
     date_to: Optional[str] = Query(None, description="YYYY-MM-DD"),
     platform: Optional[schemas.Platform] = Query(None, description="vimeo ou youtube"),
     line_id: Optional[int] = Query(None),
     system_id: Optional[int] = Query(None),
-    csv_export: bool = Query(False, description="Se true, retorna CSV"),
+    fmt: Literal["json", "csv", "ndjson"] = Query("json", alias="format", description="json, csv ou ndjson"),
+    csv_export: bool = Query(False, description="Se true, retorna CSV (o mesmo que format=csv)"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Itens por página (só JSON)"),
+    cursor: Optional[str] = Query(None, description="next_cursor da página anterior (só JSON)"),
 ):
-    db = get_db()
-    items = media_model.list_all(
-        db,
+    filters = dict(
         platform=platform,
         person_id=person_id,
         line_id=line_id,
@@ -36,14 +115,96 @@ def report_by_person(
         date_from=date_from,
         date_to=date_to,
     )
-    if not csv_export:
-        return items
-
-    buf = io.StringIO()
-    w = csv.writer(buf)
-    w.writerow(["media_id", "title", "platform", "url", "published_at", "line_id", "system_id"])
-    for it in items:
-        w.writerow([it["id"], it["title"], it["platform"], it["url"], it["published_at"], it["line_id"], it["system_id"]])
-    buf.seek(0)
-    headers = {"Content-Disposition": "attachment; filename=relatorio_por_pessoa.csv"}
-    return StreamingResponse(iter([buf.getvalue()]), media_type="text/csv", headers=headers)
+    if csv_export:
+        fmt = "csv"
+    if fmt == "json":
+        # JSON paginado por cursor; CSV/NDJSON trazem tudo, em streaming.
+        # Passa por MediaPage: as linhas cruas têm colunas internas (video_key, created_at...)
+        return await adb.read_json(schemas.MediaPage, media_model.list_page, snapshot=True, limit=limit,
+                                   cursor=cursor, platform=platform, person_id=person_id, line_id=line_id,
+                                   system_id=system_id, date_from=date_from, date_to=date_to)
+
+    media_type, ext = EXPORT_FORMATS[fmt]
+    headers = {"Content-Disposition": f"attachment; filename=relatorio_por_pessoa.{ext}"}
+    # exportações longas (anos de dados) estouram o timeout do proxy: use POST /reports/jobs
+    headers.update(adb.data_as_of_headers(snapshot_as_of()) or {})
+    return StreamingResponse(_stream_report(fmt, filters), media_type=media_type, headers=headers)
+
+@router.get(
+    "/summary",
+    summary="Contagem de mídias por plataforma, linha, sistema, pessoa e mês",
+    responses={200: {"description": "Totais pré-calculados (tabela media_summary)"}},
+)
+async def report_summary(request: Request):
+    return await conditional_json(request, SUMMARY_TABLES, schemas.MediaSummary, lambda: adb.read(summary_model.get),
+                                  exclude_none=False)   # line_id/system_id nulos = "sem linha/sistema"
+
+@router.post(
+    "/jobs",
+    status_code=202,
+    response_model=schemas.ReportJobOut,
+    response_model_exclude_none=True,
+    summary="Exportar relatório por pessoa em segundo plano (CSV ou NDJSON)",
+    responses={
+        401: {"model": ErrorResponse, "description": "Unauthorized"},
+        422: {"model": ErrorResponse, "description": "Erro de validação"},
+    },
+)
+async def create_report_job(body: schemas.ReportJobIn, user=Depends(require_auth)):
+    """
+    Enfileira a exportação e responde na hora (202). Acompanhe em
+    GET /reports/jobs/{id}; com status `done`, baixe em `download_url`.
+    """
+    filters = body.model_dump(mode="json", exclude={"format"}, exclude_none=True)
+    job = await adb.write(jobs_model.create, "report", {"format": body.format, "filters": filters}, user["id"])
+    runner = jobs.get_runner()
+    if runner is not None:
+        runner.wake()
+    return _job_out(job)
+
+@router.get(
+    "/jobs/{jid}",
+    response_model=schemas.ReportJobOut,
+    response_model_exclude_none=True,
+    summary="Andamento de uma exportação",
+    responses={404: {"model": ErrorResponse, "description": "Job não encontrado"}},
+)
+async def get_report_job(jid: int):
+    return _job_out(await adb.read(_get_job, jid))
+
+@router.get(
+    "/jobs/{jid}/download",
+    summary="Baixar o arquivo de uma exportação (aceita Range)",
+    responses={
+        200: {"description": "CSV ou NDJSON"},
+        206: {"description": "Parte do arquivo (Range)"},
+        404: {"model": ErrorResponse, "description": "Job não encontrado"},
+        409: {"model": ErrorResponse, "description": "Exportação ainda não terminou"},
+        410: {"model": ErrorResponse, "description": "Arquivo removido"},
+    },
+)
+async def download_report_job(jid: int):
+    job = await adb.read(_get_job, jid)
+    if job["status"] != "done":
+        raise HTTPException(409, f"Exportação ainda não terminou (status {job['status']})")
+    if not job["file_path"] or not os.path.exists(job["file_path"]):
+        raise HTTPException(410, "Arquivo da exportação não existe mais")
+    media_type, ext = EXPORT_FORMATS[job["params"]["format"]]
+    # FileResponse: Range/206, ETag e Last-Modified do próprio arquivo
+    return FileResponse(job["file_path"], media_type=media_type, filename=f"relatorio_por_pessoa_{jid}.{ext}")
+
+@router.delete(
+    "/jobs/{jid}",
+    dependencies=[Depends(require_auth)],
+    summary="Excluir uma exportação (e o arquivo)",
+    responses={
+        200: {"description": "OK"},
+        401: {"model": ErrorResponse, "description": "Unauthorized"},
+        404: {"model": ErrorResponse, "description": "Job não encontrado"},
+    },
+)
+async def delete_report_job(jid: int):
+    await adb.read(_get_job, jid)
+    job = await adb.write(jobs_model.delete, jid)
+    jobs.remove_file(job["file_path"])
+    return {"ok": True}
@@ -1,8 +1,9 @@
 from typing import List
-from fastapi import APIRouter, Depends
-from ..core.db import get_db
+from fastapi import APIRouter, Depends, Request
+from ..core import adb
 from ..core.deps import require_auth
 from ..core.errors import ErrorResponse
+from ..core.httpcache import conditional_json
 from .. import schemas
 from ..models import systems as systems_model
 
@@ -25,9 +26,8 @@ router = APIRouter(prefix="/systems", tags=["systems"])
         }
     },
 )
-def create_system(s: schemas.SystemIn):
-    db = get_db()
-    return systems_model.create(db, s.name)
+async def create_system(s: schemas.SystemIn):
+    return await adb.write(systems_model.create, s.name)
 
 @router.get(
     "",
@@ -35,9 +35,8 @@ def create_system(s: schemas.SystemIn):
     response_model_exclude_none=True,
     summary="Listar sistemas",
 )
-def list_systems():
-    db = get_db()
-    return systems_model.list_all(db)
+async def list_systems(request: Request):
+    return await conditional_json(request, ("system",), List[schemas.SystemOut], lambda: adb.read(systems_model.list_all))
 
 @router.put(
     "/{sid}",
@@ -51,9 +50,8 @@ def list_systems():
         409: {"model": ErrorResponse, "description": "Sistema já existe"},
     },
 )
-def update_system(sid: int, s: schemas.SystemIn):
-    db = get_db()
-    return systems_model.update(db, sid, s.name)
+async def update_system(sid: int, s: schemas.SystemIn):
+    return await adb.write(systems_model.update, sid, s.name)
 
 @router.delete(
     "/{sid}",
@@ -65,6 +63,5 @@ def update_system(sid: int, s: schemas.SystemIn):
         404: {"model": ErrorResponse, "description": "Sistema não encontrado"},
     },
 )
-def delete_system(sid: int):
-    db = get_db()
-    return systems_model.delete(db, sid)
+async def delete_system(sid: int):
+    return await adb.write(systems_model.delete, sid)
@@ -3,8 +3,10 @@ from typing import Optional, List
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
 
+from ..core import adb
 from ..core.db import get_db
 from ..core.deps import require_auth          # vamos derivar o require_admin a partir dele
+from ..core.security import hash_password, hash_executor
 from ..models import users as users_model
 
 router = APIRouter(prefix="/users", tags=["users"])
@@ -21,11 +23,13 @@ class UserCreate(BaseModel):
     person_id: Optional[int] = None
 
 @router.post("", dependencies=[Depends(require_admin)])
-def create_user(payload: UserCreate, db=Depends(get_db)):
-    return users_model.create(
-        db,
+async def create_user(payload: UserCreate):
+    # bcrypt no executor dedicado, como no login; o INSERT vai para a fila de escrita
+    password_hash = await hash_executor.run(hash_password, payload.token)
+    return await adb.write(
+        users_model.create,
         username=payload.username.strip().lower(),
-        token=payload.token,
+        password_hash=password_hash,
         role=payload.role,
         person_id=payload.person_id,
     )
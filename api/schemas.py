@@ -1,5 +1,5 @@
-from pydantic import BaseModel, HttpUrl, Field
-from typing import Optional, List, Literal
+from pydantic import BaseModel, HttpUrl, Field, model_validator
+from typing import Any, Optional, List, Literal
 from datetime import date
 
 # --- Pessoas ---
@@ -32,6 +32,10 @@ class MediaPersonLink(BaseModel):
     person_id: int
     role: Role
 
+class MediaPersonOut(MediaPersonLink):
+    # só com expand=people
+    name: Optional[str] = None
+
 class MediaIn(BaseModel):
     title: str
     description: Optional[str] = None
@@ -42,6 +46,24 @@ class MediaIn(BaseModel):
     system_id: Optional[int] = None
     people: List[MediaPersonLink] = Field(default_factory=list)
 
+class MediaPatch(BaseModel):
+    """Só os campos enviados mudam; `people`, se enviado, é a lista completa."""
+    title: Optional[str] = None
+    description: Optional[str] = None
+    platform: Optional[Platform] = None
+    url: Optional[HttpUrl] = None
+    published_at: Optional[date] = None
+    line_id: Optional[int] = None
+    system_id: Optional[int] = None
+    people: Optional[List[MediaPersonLink]] = None
+
+    @model_validator(mode="after")
+    def _required_not_null(self):
+        for name in ("title", "platform", "url", "published_at", "people"):
+            if name in self.model_fields_set and getattr(self, name) is None:
+                raise ValueError(f"'{name}' não pode ser null")
+        return self
+
 class MediaOut(BaseModel):
     id: int
     title: str
@@ -51,4 +73,136 @@ class MediaOut(BaseModel):
     published_at: str
     line_id: Optional[int]
     system_id: Optional[int]
-    people: List[MediaPersonLink] = []
+    people: List[MediaPersonOut] = []
+    # só com expand=line / expand=system
+    line: Optional[LineOut] = None
+    system: Optional[SystemOut] = None
+    # só na busca (q): trechos com os termos marcados em <mark>
+    title_highlight: Optional[str] = None
+    description_snippet: Optional[str] = None
+
+class MediaPage(BaseModel):
+    items: List[MediaOut]
+    next_cursor: Optional[str] = None
+
+class MediaPeopleDiff(BaseModel):
+    added: List[MediaPersonLink] = []
+    updated: List[MediaPersonLink] = []
+    removed: List[int] = []
+
+class MediaPatchResult(BaseModel):
+    media: MediaOut
+    # campos alterados ("people" se algum vínculo mudou); vazio = nada foi gravado
+    changed: List[str]
+    people: MediaPeopleDiff
+
+class MediaLookup(BaseModel):
+    platform: Platform
+    video_key: str
+    # mídia já cadastrada com o mesmo vídeo (ausente se não houver)
+    media: Optional[MediaOut] = None
+
+# --- Feed de alterações ---
+ChangeOp = Literal["upsert", "delete"]
+ChangeEntity = Literal["media", "person", "line", "system"]
+
+class MediaChange(BaseModel):
+    seq: int
+    op: ChangeOp
+    id: int
+    changed_at: str
+    # estado atual (só em upsert)
+    media: Optional[MediaOut] = None
+
+class MediaChanges(BaseModel):
+    changes: List[MediaChange]
+    next_since: int
+    has_more: bool
+
+class Change(BaseModel):
+    seq: int
+    entity: ChangeEntity
+    op: ChangeOp
+    id: int
+    changed_at: str
+
+class Changes(BaseModel):
+    changes: List[Change]
+    next_since: int
+    has_more: bool
+
+class MediaBulkError(BaseModel):
+    row: int
+    message: str
+    details: Optional[Any] = None
+
+class MediaBulkResult(BaseModel):
+    created: int
+    ids: List[int]
+    errors: List[MediaBulkError] = []
+
+# --- Relatórios ---
+class PlatformCount(BaseModel):
+    platform: Platform
+    count: int
+
+class LineCount(BaseModel):
+    line_id: Optional[int]
+    name: Optional[str] = None
+    count: int
+
+class SystemCount(BaseModel):
+    system_id: Optional[int]
+    name: Optional[str] = None
+    count: int
+
+class PersonCount(BaseModel):
+    person_id: Optional[int]
+    name: Optional[str] = None
+    count: int
+
+class MonthCount(BaseModel):
+    month: str
+    count: int
+
+class MediaSummary(BaseModel):
+    total: int
+    by_platform: List[PlatformCount] = []
+    by_line: List[LineCount] = []
+    by_system: List[SystemCount] = []
+    by_person: List[PersonCount] = []
+    by_month: List[MonthCount] = []
+
+# --- Exportações em segundo plano ---
+JobStatus = Literal["queued", "running", "done", "failed"]
+ExportFormat = Literal["csv", "ndjson"]
+
+class ReportJobIn(BaseModel):
+    """Mesmos filtros de GET /reports/by-person."""
+    person_id: int
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    platform: Optional[Platform] = None
+    line_id: Optional[int] = None
+    system_id: Optional[int] = None
+    format: ExportFormat = "csv"
+
+class ReportJobOut(BaseModel):
+    id: int
+    status: JobStatus
+    format: ExportFormat
+    filters: dict
+    attempts: int
+    # linhas já escritas / total (total aparece quando a contagem termina)
+    progress: int
+    total: Optional[int] = None
+    percent: Optional[float] = None
+    file_size: Optional[int] = None
+    error: Optional[str] = None
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    # depois disso o job e o arquivo são removidos
+    expires_at: Optional[str] = None
+    # só com status done
+    download_url: Optional[str] = None
@@ -0,0 +1,122 @@
+# bench/coherence.py
+"""
+Coerência dos caches em memória com vários workers do uvicorn no mesmo
+banco (api/core/versions.py). Sobe `uvicorn --workers N`, aquece os caches
+de todos os workers (uma conexão nova por request, para o kernel espalhar
+entre eles) e, depois de cada escrita, conta quantas respostas ainda vêm
+velhas:
+
+  patch     – PATCH /media/1 por um worker; GET /media/1 (cache HTTP/ETag);
+  externo   – UPDATE em line direto no arquivo (outro processo, fora da API);
+              GET /media/1?expand=line;
+  usuário   – role admin -> user direto no banco; GET /users com a sessão
+              dele (cache de usuários de deps.require_auth) deve dar 403.
+
+Roda com CACHE_COHERENCE=1 (o padrão) e =0 (só o contador local, como
+antes) para comparar; sai com 1 se houver resposta velha no modo coerente.
+Uso: python -m bench.coherence [--workers 4] [--requests 60]
+"""
+from __future__ import annotations
+import argparse
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _seed(path: str) -> None:
+    from api.core.db import connect
+    from api.core.init_db import init_db
+    from api.core.security import hash_password
+    init_db(path, verbose=False)
+    db = connect(path)
+    for name in ("bench", "alvo"):
+        db.execute("INSERT INTO user(username, password_hash, role) VALUES(?, ?, 'admin')", (name, hash_password(name)))
+    db.execute("INSERT INTO line(name) VALUES('Linha A')")
+    db.execute("INSERT INTO media(title, platform, url, published_at, line_id) "
+               "VALUES('Original', 'youtube', 'https://youtu.be/abc', '2025-01-01', 1)")
+    db.commit()
+    db.close()
+
+def _login(base: str, username: str) -> dict:
+    r = httpx.post(f"{base}/auth/login", json={"username": username, "token": username})
+    r.raise_for_status()
+    return {"session": r.cookies["session"]}
+
+def _burst(url: str, n: int, cookies: dict | None = None):
+    # sem keep-alive: cada request numa conexão nova, em qualquer worker
+    return [httpx.get(url, cookies=cookies) for _ in range(n)]
+
+def _start(db_path: str, workers: int, coherent: bool):
+    port = _free_port()
+    env = dict(os.environ, DB_PATH=db_path, CACHE_COHERENCE="1" if coherent else "0", JOB_WORKERS="0")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.main:app", "--port", str(port), "--workers", str(workers),
+         "--log-level", "warning"],
+        env=env, cwd=str(ROOT),
+    )
+    base = f"http://127.0.0.1:{port}"
+    for _ in range(200):
+        try:
+            if httpx.get(f"{base}/health", timeout=1).status_code == 200:
+                return proc, base
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError("uvicorn não respondeu em /health")
+
+def run(workers: int, n: int, coherent: bool) -> dict:
+    with tempfile.TemporaryDirectory() as d:
+        path = str(Path(d) / "coherence.db")
+        _seed(path)
+        proc, base = _start(path, workers, coherent)
+        try:
+            admin, alvo = _login(base, "bench"), _login(base, "alvo")
+            stale = {}
+
+            _burst(f"{base}/media/1", n)
+            httpx.patch(f"{base}/media/1", json={"title": "Alterado"}, cookies=admin).raise_for_status()
+            stale["patch"] = sum(r.json()["title"] != "Alterado" for r in _burst(f"{base}/media/1", n))
+
+            _burst(f"{base}/media/1?expand=line", n)
+            with sqlite3.connect(path) as ext:
+                ext.execute("UPDATE line SET name = 'Linha B' WHERE id = 1")
+            stale["externo"] = sum(r.json()["line"]["name"] != "Linha B"
+                                   for r in _burst(f"{base}/media/1?expand=line", n))
+
+            _burst(f"{base}/users", n, alvo)
+            with sqlite3.connect(path) as ext:
+                ext.execute("UPDATE user SET role = 'user' WHERE username = 'alvo'")
+            stale["usuário"] = sum(r.status_code != 403 for r in _burst(f"{base}/users", n, alvo))
+            return stale
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m bench.coherence")
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--requests", type=int, default=60, help="requests por rajada (aquecimento e conferência)")
+    args = ap.parse_args(argv)
+    results = {mode: run(args.workers, args.requests, mode) for mode in (True, False)}
+    print(f"{args.workers} workers, {args.requests} requests por rajada: respostas velhas após a escrita")
+    print(f"{'cenário':<9} {'coerente':>9} {'só local':>9}")
+    for scenario in results[True]:
+        print(f"{scenario:<9} {results[True][scenario]:>9} {results[False][scenario]:>9}")
+    return 1 if any(results[True].values()) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
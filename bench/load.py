@@ -0,0 +1,328 @@
+# bench/load.py
+"""
+Teste de carga da API sobre um banco gerado por bench.seed.
+
+Cenários (SCENARIOS): listagens de /media com filtros, busca, item,
+relatório por pessoa em JSON e CSV, resumo, login e um ciclo CRUD
+(POST + PUT + DELETE). Cada cenário roda com `concurrency` clientes até
+somar `requests` operações; mede vazão, p50/p95/p99, erros e (em
+processo) quantos comandos SQL cada operação executou.
+
+Modos:
+  em processo (padrão) – httpx + ASGITransport, sem rede;
+  --uvicorn            – sobe `uvicorn api.main:app` num subprocesso e
+                         usa HTTP de verdade (sem contagem de SQL).
+
+Os resultados vão para bench/results/load-<data>.json; --compare com um
+arquivo anterior mostra a variação e sai com código 1 se algum p95
+piorou mais que --tolerance (padrão 20%).
+
+Uso: python -m bench.load [--media 10000] [--db caminho.db] [--uvicorn]
+                          [--concurrency 8] [--requests 200] [--only a,b]
+                          [--out arquivo.json] [--compare anterior.json]
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+@dataclass
+class Context:
+    media: int
+    people: int
+    lines: int
+    systems: int
+    words: List[str]
+    created: List[int] = field(default_factory=list)
+
+def _check(r) -> None:
+    if r.status_code >= 400:
+        raise RuntimeError(f"{r.request.method} {r.request.url.path} -> {r.status_code}")
+
+def _media_body(rnd: random.Random, ctx: Context) -> dict:
+    return {
+        "title": f"Carga {rnd.choice(ctx.words)} {rnd.randrange(10**9)}",
+        "platform": "youtube",
+        "url": f"https://www.youtube.com/watch?v=carga{rnd.randrange(10**9)}",
+        "published_at": f"2024-{rnd.randrange(12) + 1:02d}-01",
+        "line_id": rnd.randrange(ctx.lines) + 1,
+        "people": [{"person_id": rnd.randrange(ctx.people) + 1, "role": "responsavel"}],
+    }
+
+async def media_page(c, ctx, rnd):
+    _check(await c.get("/media", params={"limit": 100}))
+
+async def media_filters(c, ctx, rnd):
+    params: Dict[str, object] = {"limit": 100}
+    if rnd.random() < 0.5:
+        params["platform"] = rnd.choice(("vimeo", "youtube"))
+    if rnd.random() < 0.5:
+        params["line_id"] = rnd.randrange(ctx.lines) + 1
+    if rnd.random() < 0.5:
+        params["system_id"] = rnd.randrange(ctx.systems) + 1
+    if rnd.random() < 0.5:
+        year = 2015 + rnd.randrange(10)
+        params.update(date_from=f"{year}-01-01", date_to=f"{year}-06-30")
+    _check(await c.get("/media", params=params))
+
+async def media_person(c, ctx, rnd):
+    _check(await c.get("/media", params={"person_id": rnd.randrange(ctx.people) + 1, "limit": 100}))
+
+async def media_search(c, ctx, rnd):
+    _check(await c.get("/media", params={"q": rnd.choice(ctx.words), "limit": 20}))
+
+async def media_item(c, ctx, rnd):
+    _check(await c.get(f"/media/{rnd.randrange(ctx.media) + 1}"))
+
+async def report_json(c, ctx, rnd):
+    _check(await c.get("/reports/by-person", params={"person_id": rnd.randrange(ctx.people) + 1, "limit": 1000}))
+
+async def report_csv(c, ctx, rnd):
+    # metade das vezes a pessoa "pesada" (bench.seed: ~2% das mídias)
+    pid = 1 if rnd.random() < 0.5 else rnd.randrange(ctx.people) + 1
+    async with c.stream("GET", "/reports/by-person", params={"person_id": pid, "format": "csv"}) as r:
+        _check(r)
+        async for _ in r.aiter_bytes():
+            pass
+
+async def summary(c, ctx, rnd):
+    _check(await c.get("/reports/summary"))
+
+async def login(c, ctx, rnd):
+    from bench.seed import BENCH_PASSWORD, BENCH_USER
+    _check(await c.post("/auth/login", json={"username": BENCH_USER, "token": BENCH_PASSWORD}))
+
+async def crud(c, ctx, rnd):
+    r = await c.post("/media", json=_media_body(rnd, ctx))
+    _check(r)
+    mid = r.json()["id"]
+    _check(await c.put(f"/media/{mid}", json=_media_body(rnd, ctx)))
+    _check(await c.delete(f"/media/{mid}"))
+
+SCENARIOS: Dict[str, Callable[..., Awaitable[None]]] = {
+    "media_page": media_page,
+    "media_filters": media_filters,
+    "media_person": media_person,
+    "media_search": media_search,
+    "media_item": media_item,
+    "report_json": report_json,
+    "report_csv": report_csv,
+    "summary": summary,
+    "login": login,
+    "crud": crud,
+}
+
+class QueryCounter:
+    """Conta comandos SQL em todas as conexões abertas por api.core.db.connect (modo em processo)."""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def _hit(self, _stmt) -> None:
+        with self._lock:
+            self.count += 1
+
+    def install(self) -> None:
+        from api.core import db
+        counter = self
+
+        class CountedConnection(db.Connection):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.set_trace_callback(counter._hit)
+
+        db.Connection = CountedConnection
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    xs = sorted(samples)
+    pick = lambda p: xs[min(len(xs) - 1, int(p / 100 * len(xs)))]
+    return {"p50": pick(50), "p95": pick(95), "p99": pick(99), "mean": statistics.fmean(xs)}
+
+async def _run_scenario(client, name: str, ctx: Context, concurrency: int, total: int,
+                        counter: Optional[QueryCounter]) -> dict:
+    op = SCENARIOS[name]
+    lat: List[float] = []
+    errors: Dict[str, int] = {}
+    remaining = total
+    before = counter.count if counter else 0
+
+    async def worker(wid: int):
+        nonlocal remaining
+        rnd = random.Random(f"{name}-{wid}")
+        while remaining > 0:
+            remaining -= 1
+            s = time.perf_counter()
+            try:
+                await op(client, ctx, rnd)
+            except Exception as exc:
+                key = str(exc)[:80]
+                errors[key] = errors.get(key, 0) + 1
+            lat.append((time.perf_counter() - s) * 1000)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+    out = {"ops": len(lat), "errors": errors, "ops_per_s": round(len(lat) / elapsed, 1)}
+    out.update({k: round(v, 3) for k, v in _percentiles(lat).items()})
+    out["queries_per_op"] = round((counter.count - before) / len(lat), 1) if counter else None
+    return out
+
+def _context(db_path: str) -> Context:
+    from bench.seed import VOCABULARIO
+    con = sqlite3.connect(db_path)
+    try:
+        count = lambda t: con.execute(f"SELECT COALESCE(MAX(id), 0) FROM {t}").fetchone()[0]
+        return Context(count("media"), count("person"), count("line"), count("system"), list(VOCABULARIO))
+    finally:
+        con.close()
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+async def _drive(base_url: str, transport, names, ctx, concurrency, total, counter) -> Dict[str, dict]:
+    import httpx
+    from bench.seed import BENCH_PASSWORD, BENCH_USER
+    limits = httpx.Limits(max_connections=concurrency * 2)
+    async with httpx.AsyncClient(base_url=base_url, transport=transport, limits=limits, timeout=120) as client:
+        _check(await client.post("/auth/login", json={"username": BENCH_USER, "token": BENCH_PASSWORD}))
+        results = {}
+        for name in names:
+            results[name] = await _run_scenario(client, name, ctx, concurrency, total, counter)
+            r = results[name]
+            q = f"{r['queries_per_op']:>6.1f}" if r["queries_per_op"] is not None else f"{'-':>6}"
+            errs = sum(r["errors"].values())
+            print(f"{name:<14} {r['ops_per_s']:>8.1f} {r['p50']:>8.1f} {r['p95']:>8.1f} {r['p99']:>8.1f} {q} {errs:>6}")
+        return results
+
+def _run_in_process(db_path: str, names, ctx, concurrency, total) -> Dict[str, dict]:
+    import httpx
+    counter = QueryCounter()
+    counter.install()
+    from api import app
+    transport = httpx.ASGITransport(app=app)
+    return asyncio.run(_drive("http://bench", transport, names, ctx, concurrency, total, counter))
+
+def _run_uvicorn(db_path: str, names, ctx, concurrency, total) -> Dict[str, dict]:
+    import httpx
+    port = _free_port()
+    env = dict(os.environ, DB_PATH=db_path)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, cwd=str(Path(__file__).resolve().parent.parent),
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(100):
+            try:
+                if httpx.get(f"{base}/health", timeout=1).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.1)
+        else:
+            raise RuntimeError("uvicorn não respondeu em /health")
+        return asyncio.run(_drive(base, None, names, ctx, concurrency, total, None))
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=Path(__file__).parent).stdout.strip() or None
+    except OSError:
+        return None
+
+def compare(old: dict, new: dict, tolerance: float) -> bool:
+    """Imprime a variação por cenário; True se algum p95 piorou além da tolerância."""
+    for key in ("mode", "media", "concurrency"):
+        if old["meta"].get(key) != new["meta"].get(key):
+            print(f"atenção: {key} diferente ({old['meta'].get(key)} -> {new['meta'].get(key)}); comparação aproximada")
+    print(f"\n{'cenário':<14} {'ops/s antes':>11} {'depois':>8} {'p95 antes':>10} {'depois':>8} {'Δp95':>7}")
+    regressed = False
+    for name, r in new["scenarios"].items():
+        o = old["scenarios"].get(name)
+        if not o:
+            continue
+        delta = (r["p95"] - o["p95"]) / o["p95"] if o["p95"] else 0.0
+        mark = " <-- piorou" if delta > tolerance else ""
+        regressed |= delta > tolerance
+        print(f"{name:<14} {o['ops_per_s']:>11.1f} {r['ops_per_s']:>8.1f} {o['p95']:>10.1f} {r['p95']:>8.1f} "
+              f"{delta:>+7.0%}{mark}")
+    return regressed
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m bench.load")
+    ap.add_argument("--media", type=int, default=10_000, help="mídias a gerar (banco novo)")
+    ap.add_argument("--db", help="banco já gerado por bench.seed (ou onde gerar)")
+    ap.add_argument("--uvicorn", action="store_true", help="via HTTP num uvicorn em subprocesso")
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--requests", type=int, default=200, help="operações por cenário")
+    ap.add_argument("--only", help="cenários separados por vírgula")
+    ap.add_argument("--out", help="arquivo de resultado (padrão: bench/results/load-<data>.json)")
+    ap.add_argument("--compare", help="resultado anterior para comparar")
+    ap.add_argument("--tolerance", type=float, default=0.2)
+    args = ap.parse_args(argv)
+
+    names = args.only.split(",") if args.only else list(SCENARIOS)
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        ap.error(f"cenários desconhecidos: {', '.join(unknown)} (há: {', '.join(SCENARIOS)})")
+
+    db_path = args.db or str(Path(tempfile.mkdtemp()) / "load.db")
+    # antes de importar api.*: DB_PATH é lido na importação
+    os.environ["DB_PATH"] = db_path
+    from bench.seed import generate
+    if not Path(db_path).exists():
+        info = generate(db_path, args.media)
+        print(f"banco gerado: {info.media} mídias, {info.people} pessoas, {info.links} vínculos em {info.seconds}s")
+    ctx = _context(db_path)
+    mode = "uvicorn" if args.uvicorn else "in-process"
+    print(f"{ctx.media} mídias, modo {mode}, {args.concurrency} clientes, {args.requests} operações por cenário\n")
+    print(f"{'cenário':<14} {'ops/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'sql/op':>6} {'erros':>6}")
+    run = _run_uvicorn if args.uvicorn else _run_in_process
+    scenarios = run(db_path, names, ctx, args.concurrency, args.requests)
+
+    result = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _git_commit(),
+            "mode": mode,
+            "media": ctx.media,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+        },
+        "scenarios": scenarios,
+    }
+    out = Path(args.out) if args.out else RESULTS_DIR / f"load-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"\nresultado em {out}")
+    if args.compare:
+        old = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        return 1 if compare(old, result, args.tolerance) else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
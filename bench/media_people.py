@@ -0,0 +1,63 @@
+# bench/media_people.py
+"""
+Compara o carregamento de pessoas por mídia: uma query por linha (N+1)
+contra o carregador em lote de api.models.media.
+
+Uso: python -m bench.media_people [5000 10000 ...]
+"""
+from __future__ import annotations
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from api.core.db import connect, query_all
+from api.core.init_db import init_db
+from api.models import media as media_model
+
+def _seed(db, n_media: int, people_per_media: int = 3) -> None:
+    db.executemany("INSERT INTO person(name) VALUES(?)", [(f"Pessoa {i}",) for i in range(50)])
+    db.executemany(
+        "INSERT INTO media(title, platform, url, published_at) VALUES(?,?,?,?)",
+        [(f"Mídia {i}", "youtube", f"https://youtube.com/watch?v={i}", f"2024-01-{i % 28 + 1:02d}")
+         for i in range(n_media)],
+    )
+    db.executemany(
+        "INSERT INTO media_person(media_id, person_id, role) VALUES(?,?,?)",
+        [(m, (m + k) % 50 + 1, "participante") for m in range(1, n_media + 1) for k in range(people_per_media)],
+    )
+    db.commit()
+
+def _n_plus_one(db):
+    rows = query_all(db, "SELECT m.* FROM media m ORDER BY m.published_at DESC")
+    for r in rows:
+        r["people"] = query_all(db, "SELECT person_id, role FROM media_person WHERE media_id=?", (r["id"],))
+    return rows
+
+def _measure(db, fn):
+    count = 0
+    def trace(_stmt):
+        nonlocal count
+        count += 1
+    db.set_trace_callback(trace)
+    t0 = time.perf_counter()
+    fn(db)
+    elapsed = time.perf_counter() - t0
+    db.set_trace_callback(None)
+    return count, elapsed
+
+def run(sizes):
+    print(f"{'media':>8} | {'N+1 queries':>11} {'N+1 ms':>9} | {'lote queries':>12} {'lote ms':>9}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as d:
+            path = str(Path(d) / "bench.db")
+            init_db(path)
+            db = connect(path)
+            _seed(db, n)
+            q1, t1 = _measure(db, _n_plus_one)
+            q2, t2 = _measure(db, lambda c: media_model.list_all(c))
+            db.close()
+        print(f"{n:>8} | {q1:>11} {t1 * 1000:>9.1f} | {q2:>12} {t2 * 1000:>9.1f}")
+
+if __name__ == "__main__":
+    run([int(a) for a in sys.argv[1:]] or [100, 1000, 5000, 20000])
@@ -0,0 +1,119 @@
+# bench/mixed_load.py
+"""
+Latência de uma rota barata (ping) enquanto relatórios pesados rodam em
+paralelo, comparando:
+
+  sync  – rotas `def` com Depends(get_db): cada consulta ocupa uma thread
+          do threadpool do Starlette (40 por padrão), como era antes;
+  async – as rotas atuais, que aguardam api.core.adb (executores próprios).
+
+Tudo em processo (httpx + ASGITransport), no mesmo banco populado.
+Uso: python -m bench.mixed_load [n_media] [pesados_concorrentes] [pings]
+"""
+from __future__ import annotations
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+def _percentiles(samples):
+    xs = sorted(samples)
+    pick = lambda p: xs[min(len(xs) - 1, int(p / 100 * len(xs)))]
+    return {"p50": pick(50), "p95": pick(95), "p99": pick(99), "max": xs[-1], "mean": statistics.fmean(xs)}
+
+def _seed(path: str, n_media: int) -> None:
+    from api.core.db import connect
+    from api.core.init_db import init_db
+    from api.core.security import hash_password
+    init_db(path)
+    db = connect(path)
+    db.execute("INSERT INTO person(name) VALUES('Pessoa')")
+    db.execute("INSERT INTO user(username, password_hash, role) VALUES('bench', ?, 'admin')", (hash_password("bench"),))
+    db.executemany(
+        "INSERT INTO media(id, title, platform, url, published_at) VALUES(?,?,?,?,?)",
+        [(i, f"Mídia {i}", "youtube", f"https://youtube.com/watch?v={i}", f"20{i % 25:02d}-01-01")
+         for i in range(1, n_media + 1)],
+    )
+    db.executemany("INSERT INTO media_person(media_id, person_id, role) VALUES(?,1,'participante')",
+                   [(i,) for i in range(1, n_media + 1)])
+    db.commit()
+    db.close()
+
+def _legacy_app():
+    from fastapi import Depends, FastAPI
+    from api.core.db import get_db
+    from api.models import media as media_model
+
+    legacy = FastAPI()
+
+    @legacy.get("/ping")
+    def ping():
+        return {"ok": True}
+
+    @legacy.get("/report")
+    def report(db=Depends(get_db)):
+        return media_model.list_page(db, limit=1000, person_id=1, date_from="2000-01-01")
+
+    return legacy
+
+async def _drive(app, ping_path: str, heavy_path: str, heavy: int, pings: int, cookies=None):
+    import httpx
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", cookies=cookies) as client:
+        stop = asyncio.Event()
+        heavy_done = 0
+
+        async def heavy_loop():
+            nonlocal heavy_done
+            while not stop.is_set():
+                r = await client.get(heavy_path)
+                r.raise_for_status()
+                heavy_done += 1
+
+        workers = [asyncio.create_task(heavy_loop()) for _ in range(heavy)]
+        await asyncio.sleep(0.5)   # deixa a carga pesada encher as filas
+        lat = []
+        t0 = time.perf_counter()
+        for _ in range(pings):
+            s = time.perf_counter()
+            (await client.get(ping_path)).raise_for_status()
+            lat.append((time.perf_counter() - s) * 1000)
+            await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - t0
+        stop.set()
+        await asyncio.gather(*workers)
+    return _percentiles(lat), heavy_done / elapsed
+
+async def _login(app) -> dict:
+    import httpx
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        r = await client.post("/auth/login", json={"username": "bench", "token": "bench"})
+        r.raise_for_status()
+        return dict(r.cookies)
+
+def run(n_media: int, heavy: int, pings: int) -> None:
+    d = tempfile.mkdtemp()
+    path = str(Path(d) / "bench.db")
+    os.environ["DB_PATH"] = path
+    # pool grande o bastante para o modo sync não esbarrar no 503 do pool
+    os.environ.setdefault("DB_POOL_SIZE", str(heavy + 8))
+    _seed(path, n_media)
+
+    from api import app   # importa depois do DB_PATH apontar para o banco do bench
+    cookies = asyncio.run(_login(app))
+    print(f"{n_media} mídias, {heavy} relatórios concorrentes, {pings} pings\n")
+    print(f"{'modo':>6} | {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} | relatórios/s")
+    modes = [
+        ("sync", _legacy_app(), "/ping", "/report", None),
+        ("async", app, "/auth/ping", "/reports/by-person?person_id=1&limit=1000&date_from=2000-01-01", cookies),
+    ]
+    for name, target, ping_path, heavy_path, jar in modes:
+        stats, rps = asyncio.run(_drive(target, ping_path, heavy_path, heavy, pings, jar))
+        print(f"{name:>6} | {stats['p50']:>8.1f} {stats['p95']:>8.1f} {stats['p99']:>8.1f} {stats['max']:>8.1f} | {rps:>8.1f}")
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    run(*(args + [20_000, 60, 200][len(args):]))
@@ -0,0 +1,127 @@
+# bench/query_plan.py
+"""
+Auditoria de planos das listagens de mídia (api.models.media._list_query).
+
+Para cada combinação de filtros (plataforma, linha, sistema, pessoa,
+intervalo de datas) roda EXPLAIN QUERY PLAN da primeira página e marca
+  SCAN      – varredura da tabela inteira (sem índice);
+  TEMP      – ordenação em B-tree temporária (USE TEMP B-TREE).
+Depois cronometra a página com os índices de antes (só colunas simples)
+e com os índices atuais (db/migrations), no mesmo banco populado.
+
+Uso: python -m bench.query_plan [n_media]      (padrão: 1.000.000)
+     python -m bench.query_plan --db app.db    (só a auditoria, no banco dado)
+"""
+from __future__ import annotations
+import itertools
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from api.core.db import connect
+from api.core.migrate import analyze
+from api.models import media as media_model
+from bench.seed import generate
+
+PAGE = 100
+TYPICAL_PERSON = 2   # ~500 mídias; a pessoa 1 (as combinações) tem ~2% de tudo
+
+# índices de media/media_person antes da auditoria (schema original)
+BASELINE_INDEXES = [
+    "CREATE INDEX idx_media_platform ON media(platform)",
+    "CREATE INDEX idx_media_published_at ON media(published_at)",
+    "CREATE INDEX idx_media_line ON media(line_id)",
+    "CREATE INDEX idx_media_system ON media(system_id)",
+    "CREATE INDEX idx_mediaperson_role ON media_person(role)",
+]
+
+def combos(person_id: int = 1):
+    dims = {
+        "platform": {"platform": "vimeo"},
+        "line": {"line_id": 3},
+        "system": {"system_id": 7},
+        "person": {"person_id": person_id},
+        "datas": {"date_from": "2019-01-01", "date_to": "2019-06-30"},
+    }
+    for n in range(len(dims) + 1):
+        for names in itertools.combinations(dims, n):
+            filters = {}
+            for name in names:
+                filters.update(dims[name])
+            yield "+".join(names) or "(nenhum)", filters
+
+def plan(db, filters: dict):
+    sql, args = media_model._list_query(limit=PAGE + 1, **filters)
+    rows = db.execute("EXPLAIN QUERY PLAN " + sql, args).fetchall()
+    details = [r["detail"] for r in rows]
+    flags = []
+    if any(d.startswith("SCAN") and "USING" not in d for d in details):
+        flags.append("SCAN")
+    if any("TEMP B-TREE" in d for d in details):
+        flags.append("TEMP")
+    return details, flags
+
+def audit(db, person_id: int = 1, verbose: bool = True) -> int:
+    """Imprime o plano de cada combinação; devolve quantas tiveram SCAN/TEMP."""
+    flagged = 0
+    for name, filters in combos(person_id):
+        details, flags = plan(db, filters)
+        flagged += bool(flags)
+        print(f"{name:<36} {' '.join(flags) or 'ok'}")
+        if verbose:
+            for d in details:
+                print(f"    {d}")
+    return flagged
+
+def _time_page(db, filters: dict, repeat: int = 5) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        media_model.list_page(db, limit=PAGE, with_people=False, **filters)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+def _indexes(db):
+    return [(name, sql) for name, sql in db.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type='index' AND sql IS NOT NULL "
+        "AND tbl_name IN ('media', 'media_person')"
+    ).fetchall()]
+
+def _swap_indexes(db, create) -> None:
+    for name, _ in _indexes(db):
+        db.execute(f"DROP INDEX {name}")
+    for sql in create:
+        db.execute(sql)
+    analyze(db)   # as mesmas estatísticas amostradas do startup
+    db.commit()
+
+def run(n_media: int) -> None:
+    with tempfile.TemporaryDirectory() as d:
+        path = str(Path(d) / "bench.db")
+        t0 = time.perf_counter()
+        generate(path, n_media)
+        print(f"{n_media} mídias populadas em {time.perf_counter() - t0:.1f}s\n")
+        db = connect(path)
+        current = [sql for _, sql in _indexes(db)]
+        results = {}
+        for label, create in (("antes", BASELINE_INDEXES), ("depois", current)):
+            _swap_indexes(db, create)
+            print(f"== planos ({label})")
+            flagged = audit(db, verbose=False)
+            print(f"   {flagged} combinações com SCAN/TEMP\n")
+            results[label] = {name: _time_page(db, f) for name, f in combos()}
+            results[label]["person (típica)"] = _time_page(db, {"person_id": TYPICAL_PERSON})
+        db.close()
+    print(f"{'filtros':<36} {'antes ms':>9} {'depois ms':>10}")
+    for name in results["antes"]:
+        print(f"{name:<36} {results['antes'][name]:>9.2f} {results['depois'][name]:>10.2f}")
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--db"]:
+        conn = connect(sys.argv[2], readonly=True)
+        audit(conn)
+        conn.close()
+    else:
+        run(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,79 @@
+# bench/report_stream.py
+"""
+Pico de memória (RSS) do relatório por pessoa: exportação em streaming
+(api.core.export) contra o CSV montado inteiro em memória (versão antiga).
+
+Uso: python -m bench.report_stream [n_media]   (padrão: 1.000.000)
+Cada modo roda num subprocesso para o ru_maxrss não se misturar.
+"""
+from __future__ import annotations
+import csv
+import io
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from api.core.db import connect
+from api.core.export import REPORT_SELECT, iter_csv, iter_ndjson
+from api.core.init_db import init_db
+from api.models import media as media_model
+
+def _seed(path: str, n_media: int) -> None:
+    init_db(path)
+    db = connect(path)
+    db.execute("INSERT INTO person(name) VALUES('Pessoa')")
+    step = 50_000
+    for start in range(0, n_media, step):
+        ids = range(start + 1, min(start + step, n_media) + 1)
+        db.executemany(
+            "INSERT INTO media(id, title, description, platform, url, published_at) VALUES(?,?,?,?,?,?)",
+            [(i, f"Mídia {i}", "descrição " * 5, "youtube", f"https://youtube.com/watch?v={i}",
+              f"{2000 + i % 25}-{i % 12 + 1:02d}-{i % 28 + 1:02d}") for i in ids],
+        )
+        db.executemany("INSERT INTO media_person(media_id, person_id, role) VALUES(?,1,'participante')",
+                       [(i,) for i in ids])
+        db.commit()
+    db.close()
+
+def _buffered(db) -> int:
+    items = media_model.list_all(db, person_id=1, with_people=False)
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    w.writerow(["media_id", "title", "platform", "url", "published_at", "line_id", "system_id"])
+    for it in items:
+        w.writerow([it["id"], it["title"], it["platform"], it["url"], it["published_at"], it["line_id"], it["system_id"]])
+    return len(buf.getvalue().encode())
+
+def _streamed(db, encode) -> int:
+    batches = media_model.iter_all(db, person_id=1, columns=REPORT_SELECT)
+    return sum(len(chunk) for chunk in encode(batches))
+
+def _child(path: str, mode: str) -> None:
+    db = connect(path)
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t0 = time.perf_counter()
+    if mode == "buffered":
+        size = _buffered(db)
+    else:
+        size = _streamed(db, iter_csv if mode == "csv" else iter_ndjson)
+    elapsed = time.perf_counter() - t0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{mode:>9} | {size / 2**20:>8.1f} MB gerados | pico RSS {peak / 1024:>7.1f} MB "
+          f"(+{(peak - before) / 1024:.1f}) | {elapsed:.2f}s")
+
+def run(n_media: int) -> None:
+    with tempfile.TemporaryDirectory() as d:
+        path = str(Path(d) / "bench.db")
+        print(f"populando {n_media} mídias...")
+        _seed(path, n_media)
+        for mode in ("buffered", "csv", "ndjson"):
+            subprocess.run([sys.executable, "-m", "bench.report_stream", "--child", path, mode], check=True)
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        _child(sys.argv[2], sys.argv[3])
+    else:
+        run(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,136 @@
+# bench/seed.py
+"""
+Gerador de dados sintéticos: pessoas, linhas, sistemas, mídias e vínculos
+media_person, reprodutível (mesma semente = mesmo banco), de 10 mil a
+10 milhões de mídias.
+
+Distribuição:
+  - ~30% vimeo; 90% com linha, 80% com sistema; datas em 10 anos;
+  - 1 a 3 pessoas por mídia; a pessoa 1 ("pesada") aparece em ~2% delas,
+    como quem concentra os relatórios;
+  - títulos/descrições com palavras de VOCABULARIO (para a busca).
+
+Os triggers (FTS, resumo, change_log) ficam desligados durante a carga e
+as tabelas derivadas são reconstruídas no fim (bem mais rápido que linha
+a linha). Cria também o usuário admin BENCH_USER / BENCH_PASSWORD.
+
+Uso: python -m bench.seed caminho.db [n_media] [--seed 42]
+"""
+from __future__ import annotations
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass
+
+VOCABULARIO = (
+    "educação saúde live entrevista podcast tutorial aula debate seminário oficina palestra "
+    "pesquisa extensão cultura esporte ciência tecnologia inovação meio ambiente política "
+    "história música arte cinema literatura economia inclusão acessibilidade sustentabilidade"
+).split()
+
+BENCH_USER = "bench"
+BENCH_PASSWORD = "bench"
+CHUNK = 50_000
+
+@dataclass
+class SeedInfo:
+    media: int
+    people: int
+    lines: int
+    systems: int
+    links: int
+    heavy_person: int
+    seconds: float
+
+def scale(n_media: int) -> dict:
+    """Quantidades padrão para `n_media` mídias (~500 mídias por pessoa)."""
+    return {"people": max(50, n_media // 200), "lines": 20, "systems": 30}
+
+def _text(rnd: random.Random, lo: int, hi: int) -> str:
+    return " ".join(rnd.choice(VOCABULARIO) for _ in range(rnd.randint(lo, hi)))
+
+def generate(path: str, n_media: int, *, seed: int = 42, people: int | None = None,
+             lines: int | None = None, systems: int | None = None, heavy_share: float = 0.02,
+             verbose: bool = False) -> SeedInfo:
+    from api.core.db import connect, transaction
+    from api.core.init_db import init_db
+    from api.core.migrate import analyze
+    from api.core.security import hash_password
+    from api.models import changes
+    from api.models.summary import rebuild
+
+    sizes = scale(n_media)
+    n_people = people or sizes["people"]
+    n_lines = lines or sizes["lines"]
+    n_systems = systems or sizes["systems"]
+    t0 = time.perf_counter()
+    init_db(path)
+    db = connect(path)
+    try:
+        if db.execute("SELECT EXISTS(SELECT 1 FROM media)").fetchone()[0]:
+            raise RuntimeError(f"{path} já tem mídias; o gerador precisa de um banco vazio")
+        triggers = db.execute("SELECT name, sql FROM sqlite_master WHERE type='trigger'").fetchall()
+        rnd = random.Random(seed)
+        links = 0
+        with transaction(db):
+            for name, _ in triggers:
+                db.execute(f"DROP TRIGGER {name}")
+            db.executemany("INSERT INTO person(id, name, email) VALUES(?,?,?)",
+                           [(i, f"Pessoa {i}", f"pessoa{i}@exemplo.org" if i % 3 else None)
+                            for i in range(1, n_people + 1)])
+            db.executemany("INSERT INTO line(id, name) VALUES(?,?)", [(i, f"Linha {i}") for i in range(1, n_lines + 1)])
+            db.executemany("INSERT INTO system(id, name) VALUES(?,?)", [(i, f"Sistema {i}") for i in range(1, n_systems + 1)])
+            db.execute("INSERT INTO user(username, password_hash, role) VALUES(?,?, 'admin')",
+                       (BENCH_USER, hash_password(BENCH_PASSWORD)))
+        for start in range(0, n_media, CHUNK):
+            ids = range(start + 1, min(start + CHUNK, n_media) + 1)
+            media, people_rows = [], []
+            for i in ids:
+                vimeo = rnd.random() < 0.3
+                media.append((
+                    i, _text(rnd, 2, 6).capitalize(), _text(rnd, 8, 20) if rnd.random() < 0.5 else None,
+                    "vimeo" if vimeo else "youtube",
+                    f"https://vimeo.com/{i}" if vimeo else f"https://www.youtube.com/watch?v=v{i:010d}",
+                    str(i) if vimeo else f"v{i:010d}",   # = video_keys.video_key(...) dessas URLs
+                    f"{2015 + rnd.randrange(10)}-{rnd.randrange(12) + 1:02d}-{rnd.randrange(28) + 1:02d}",
+                    rnd.randrange(n_lines) + 1 if rnd.random() < 0.9 else None,
+                    rnd.randrange(n_systems) + 1 if rnd.random() < 0.8 else None,
+                ))
+                chosen = {rnd.randrange(n_people) + 1 for _ in range(rnd.randrange(3) + 1)}
+                if rnd.random() < heavy_share:
+                    chosen.add(1)
+                for k, p in enumerate(sorted(chosen)):
+                    people_rows.append((i, p, "responsavel" if k == 0 else "participante"))
+            with transaction(db):
+                db.executemany(
+                    "INSERT INTO media(id, title, description, platform, url, video_key, published_at, line_id, system_id) "
+                    "VALUES(?,?,?,?,?,?,?,?,?)", media)
+                db.executemany("INSERT INTO media_person(media_id, person_id, role) VALUES(?,?,?)", people_rows)
+            links += len(people_rows)
+            if verbose:
+                print(f"[seed] {ids[-1]}/{n_media} mídias ({time.perf_counter() - t0:.0f}s)")
+        with transaction(db):
+            db.execute("INSERT INTO media_fts(media_fts) VALUES('rebuild')")
+            rebuild(db)
+            changes.rebuild(db)
+            for _, sql in triggers:
+                db.execute(sql)
+            analyze(db)
+    finally:
+        db.close()
+    info = SeedInfo(n_media, n_people, n_lines, n_systems, links, 1, round(time.perf_counter() - t0, 1))
+    if verbose:
+        print(f"[seed] pronto: {asdict(info)}")
+    return info
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    seed = 42
+    if "--seed" in args:
+        i = args.index("--seed")
+        seed = int(args[i + 1])
+        del args[i:i + 2]
+    if not args:
+        print("uso: python -m bench.seed caminho.db [n_media] [--seed 42]")
+        sys.exit(2)
+    generate(args[0], int(args[1]) if len(args) > 1 else 10_000, seed=seed, verbose=True)
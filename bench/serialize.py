@@ -0,0 +1,71 @@
+# bench/serialize.py
+"""
+Compara os dois caminhos de GET /media para uma página de mídias:
+  pydantic – list_page (dicts + pessoas) validado e serializado por
+             TypeAdapter(MediaPage), como adb.read_json;
+  sqlite   – list_page_json: o JSON de cada item sai do próprio SQLite.
+Confere também que os dois corpos são iguais (byte a byte).
+
+Uso: python -m bench.serialize [--media 50000] [--db caminho.db] [limit ...]
+"""
+from __future__ import annotations
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from api import schemas
+from api.core.adb import type_adapter
+from api.core.db import connect
+from api.models import media as media_model
+from bench.seed import generate
+
+FILTERS = {
+    "sem filtro": {},
+    "plataforma": {"platform": "vimeo"},
+    "busca": {"q": "educação"},
+}
+
+def _pydantic(db, **kw) -> bytes:
+    adapter = type_adapter(schemas.MediaPage)
+    return adapter.dump_json(adapter.validate_python(media_model.list_page(db, **kw)), exclude_none=True)
+
+def _sqlite(db, **kw) -> bytes:
+    return media_model.list_page_json(db, **kw)
+
+def _time(fn, db, repeat: int, **kw) -> float:
+    fn(db, **kw)   # aquece cache de páginas e statements
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(db, **kw)
+        runs.append(time.perf_counter() - t0)
+    return statistics.median(runs) * 1000
+
+def run(path: str, limits, repeat: int = 7) -> None:
+    db = connect(path, readonly=True)
+    try:
+        print(f"{'filtro':<11} {'limit':>6} | {'pydantic ms':>11} {'sqlite ms':>10} {'ganho':>6} | iguais")
+        for name, filters in FILTERS.items():
+            for limit in limits:
+                same = _pydantic(db, limit=limit, **filters) == _sqlite(db, limit=limit, **filters)
+                t1 = _time(_pydantic, db, repeat, limit=limit, **filters)
+                t2 = _time(_sqlite, db, repeat, limit=limit, **filters)
+                print(f"{name:<11} {limit:>6} | {t1:>11.2f} {t2:>10.2f} {t1 / t2:>5.1f}x | {'sim' if same else 'NÃO'}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--media", type=int, default=50_000, help="mídias a gerar (banco novo)")
+    ap.add_argument("--db", help="banco já gerado por bench.seed")
+    ap.add_argument("limits", nargs="*", type=int, default=[20, 100, 1000])
+    args = ap.parse_args()
+    if args.db:
+        run(args.db, args.limits)
+    else:
+        with tempfile.TemporaryDirectory() as d:
+            path = str(Path(d) / "bench.db")
+            generate(path, args.media)
+            run(path, args.limits)
@@ -0,0 +1,110 @@
+# bench/write_load.py
+"""
+Vazão de escrita com 1, 10 e 100 escritores concorrentes (POST de mídia),
+comparando:
+
+  direto – cada escritor pega uma conexão do pool e faz o próprio commit,
+           como as rotas faziam antes da fila única;
+  fila   – db.WriteCoordinator: uma conexão, commits agrupados em lote.
+
+Conta também os erros "database is locked" do modo direto.
+Uso: python -m bench.write_load [escritas_total] [escritores ...]
+     (DB_BUSY_TIMEOUT_MS / DB_SYNCHRONOUS valem como no servidor)
+"""
+from __future__ import annotations
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import date
+from pathlib import Path
+
+def _percentiles(samples):
+    xs = sorted(samples)
+    pick = lambda p: xs[min(len(xs) - 1, int(p / 100 * len(xs)))]
+    return {"p50": pick(50), "p99": pick(99), "mean": statistics.fmean(xs)}
+
+def _item(i: int):
+    from api.schemas import MediaIn, MediaPersonLink
+    # model_validate: a URL chega como str, igual a um POST
+    return MediaIn.model_validate(dict(
+        title=f"Mídia {i}", platform="youtube", url=f"https://youtube.com/watch?v={i}",
+        published_at=date(2024, 1, i % 28 + 1), people=[MediaPersonLink(person_id=1, role="participante")],
+    ))
+
+def _error_name(exc: BaseException) -> str:
+    if isinstance(exc, sqlite3.OperationalError):
+        return str(exc)
+    return type(exc).__name__
+
+def _run_direct(path: str, writers: int, total: int):
+    from api.core.db import ConnectionPool
+    from api.models import media as media_model
+    pool = ConnectionPool(path, size=writers, timeout=60)
+    lat, errors = [], Counter()
+
+    def one(i):
+        s = time.perf_counter()
+        try:
+            with pool.connection() as db:
+                media_model.create(db, _item(i))
+        except Exception as exc:
+            errors[_error_name(exc)] += 1
+        lat.append((time.perf_counter() - s) * 1000)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=writers) as ex:
+        wait([ex.submit(one, i) for i in range(total)])
+    elapsed = time.perf_counter() - t0
+    pool.close_all()
+    return elapsed, lat, errors, None
+
+def _run_queue(path: str, writers: int, total: int):
+    from api.core.db import WriteCoordinator
+    from api.models import media as media_model
+    writer = WriteCoordinator(path)
+    lat, errors = [], Counter()
+
+    def one(i):
+        s = time.perf_counter()
+        try:
+            writer.submit(media_model.create, _item(i)).result()
+        except Exception as exc:
+            errors[_error_name(exc)] += 1
+        lat.append((time.perf_counter() - s) * 1000)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=writers) as ex:
+        wait([ex.submit(one, i) for i in range(total)])
+    elapsed = time.perf_counter() - t0
+    stats = writer.stats()
+    writer.close()
+    return elapsed, lat, errors, stats
+
+def run(total: int, writer_counts) -> None:
+    from api.core.init_db import init_db
+    print(f"{total} escritas por rodada, synchronous={os.getenv('DB_SYNCHRONOUS', 'NORMAL')}\n")
+    print(f"{'escritores':>10} {'modo':>6} | {'escritas/s':>10} {'p50 ms':>8} {'p99 ms':>8} | {'lote médio':>10} | erros")
+    for writers in writer_counts:
+        for name, fn in (("direto", _run_direct), ("fila", _run_queue)):
+            with tempfile.TemporaryDirectory() as d:
+                path = str(Path(d) / "bench.db")
+                init_db(path)
+                con = sqlite3.connect(path)
+                con.execute("INSERT INTO person(name) VALUES('Pessoa')")
+                con.commit()
+                con.close()
+                elapsed, lat, errors, stats = fn(path, writers, total)
+            pct = _percentiles(lat)
+            ok = total - sum(errors.values())
+            batch = f"{stats['batch_avg']:>10.1f}" if stats else f"{'-':>10}"
+            errs = ", ".join(f"{k}: {v}" for k, v in errors.items()) or "-"
+            print(f"{writers:>10} {name:>6} | {ok / elapsed:>10.0f} {pct['p50']:>8.1f} {pct['p99']:>8.1f} | {batch} | {errs}")
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    run(args[0] if args else 3000, args[1:] or [1, 10, 100])
@@ -0,0 +1,140 @@
+-- Schema base (o antigo db/schema.sql). IF NOT EXISTS em tudo: bancos
+-- criados antes das migrações adotam esta versão sem perder nada.
+
+CREATE TABLE IF NOT EXISTS "user" (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  username TEXT NOT NULL UNIQUE,
+  password_hash TEXT NOT NULL,
+  role TEXT NOT NULL CHECK (role IN ('admin','user')) DEFAULT 'user',
+  person_id INTEGER,
+  created_at TEXT DEFAULT (datetime('now')),
+  FOREIGN KEY (person_id) REFERENCES person(id) ON DELETE SET NULL
+);
+CREATE INDEX IF NOT EXISTS idx_user_username ON "user"(username);
+
+
+CREATE TABLE IF NOT EXISTS person (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  name TEXT NOT NULL,
+  email TEXT UNIQUE,
+  created_at TEXT DEFAULT (datetime('now'))
+);
+
+CREATE TABLE IF NOT EXISTS line (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  name TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS system (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  name TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS media (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  title TEXT NOT NULL,
+  description TEXT,
+  platform TEXT NOT NULL CHECK (platform IN ('vimeo','youtube')),
+  url TEXT NOT NULL,
+  published_at TEXT NOT NULL,
+  line_id INTEGER,
+  system_id INTEGER,
+  created_at TEXT DEFAULT (datetime('now')),
+  updated_at TEXT,
+  FOREIGN KEY (line_id) REFERENCES line(id) ON DELETE SET NULL,
+  FOREIGN KEY (system_id) REFERENCES system(id) ON DELETE SET NULL
+);
+
+CREATE TABLE IF NOT EXISTS media_person (
+  media_id INTEGER NOT NULL,
+  person_id INTEGER NOT NULL,
+  role TEXT NOT NULL CHECK (role IN ('responsavel','participante')),
+  PRIMARY KEY (media_id, person_id),
+  FOREIGN KEY (media_id) REFERENCES media(id) ON DELETE CASCADE,
+  FOREIGN KEY (person_id) REFERENCES person(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_media_platform ON media(platform);
+CREATE INDEX IF NOT EXISTS idx_media_published_at ON media(published_at);
+CREATE INDEX IF NOT EXISTS idx_media_line ON media(line_id);
+CREATE INDEX IF NOT EXISTS idx_media_system ON media(system_id);
+CREATE INDEX IF NOT EXISTS idx_mediaperson_role ON media_person(role);
+-- paginação por (published_at, id): idx_media_published_at já carrega o rowid (= id),
+-- então a página é um range scan nesse índice. Para o filtro por pessoa:
+CREATE INDEX IF NOT EXISTS idx_mediaperson_person ON media_person(person_id, media_id);
+
+-- Busca textual em título/descrição (FTS5, conteúdo externo = media).
+-- remove_diacritics 2: "Educação" e "educacao" viram o mesmo token.
+CREATE VIRTUAL TABLE IF NOT EXISTS media_fts USING fts5(
+  title, description,
+  content='media', content_rowid='id',
+  tokenize="unicode61 remove_diacritics 2"
+);
+
+CREATE TRIGGER IF NOT EXISTS media_fts_ai AFTER INSERT ON media BEGIN
+  INSERT INTO media_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS media_fts_ad AFTER DELETE ON media BEGIN
+  INSERT INTO media_fts(media_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS media_fts_au AFTER UPDATE OF title, description ON media BEGIN
+  INSERT INTO media_fts(media_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+  INSERT INTO media_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+END;
+
+-- Contagens agregadas para /reports/summary, mantidas pelos triggers abaixo.
+-- dim: 'platform' | 'line' | 'system' | 'month' | 'person'; key '' = sem linha/sistema.
+CREATE TABLE IF NOT EXISTS media_summary (
+  dim TEXT NOT NULL,
+  key TEXT NOT NULL,
+  count INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (dim, key)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS media_summary_ai AFTER INSERT ON media BEGIN
+  INSERT INTO media_summary(dim, key, count) VALUES
+    ('platform', new.platform, 1),
+    ('line', COALESCE(new.line_id, ''), 1),
+    ('system', COALESCE(new.system_id, ''), 1),
+    ('month', substr(new.published_at, 1, 7), 1)
+  ON CONFLICT(dim, key) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS media_summary_ad AFTER DELETE ON media BEGIN
+  UPDATE media_summary SET count = count - 1
+  WHERE (dim = 'platform' AND key = old.platform)
+     OR (dim = 'line' AND key = COALESCE(old.line_id, ''))
+     OR (dim = 'system' AND key = COALESCE(old.system_id, ''))
+     OR (dim = 'month' AND key = substr(old.published_at, 1, 7));
+END;
+
+CREATE TRIGGER IF NOT EXISTS media_summary_au AFTER UPDATE OF platform, line_id, system_id, published_at ON media BEGIN
+  UPDATE media_summary SET count = count - 1
+  WHERE (dim = 'platform' AND key = old.platform)
+     OR (dim = 'line' AND key = COALESCE(old.line_id, ''))
+     OR (dim = 'system' AND key = COALESCE(old.system_id, ''))
+     OR (dim = 'month' AND key = substr(old.published_at, 1, 7));
+  INSERT INTO media_summary(dim, key, count) VALUES
+    ('platform', new.platform, 1),
+    ('line', COALESCE(new.line_id, ''), 1),
+    ('system', COALESCE(new.system_id, ''), 1),
+    ('month', substr(new.published_at, 1, 7), 1)
+  ON CONFLICT(dim, key) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS media_summary_person_ai AFTER INSERT ON media_person BEGIN
+  INSERT INTO media_summary(dim, key, count) VALUES ('person', new.person_id, 1)
+  ON CONFLICT(dim, key) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS media_summary_person_ad AFTER DELETE ON media_person BEGIN
+  UPDATE media_summary SET count = count - 1 WHERE dim = 'person' AND key = CAST(old.person_id AS TEXT);
+END;
+
+CREATE TRIGGER IF NOT EXISTS media_summary_person_au AFTER UPDATE OF person_id ON media_person BEGIN
+  UPDATE media_summary SET count = count - 1 WHERE dim = 'person' AND key = CAST(old.person_id AS TEXT);
+  INSERT INTO media_summary(dim, key, count) VALUES ('person', new.person_id, 1)
+  ON CONFLICT(dim, key) DO UPDATE SET count = count + 1;
+END;
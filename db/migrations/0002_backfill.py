@@ -0,0 +1,32 @@
+# db/migrations/0002_backfill.py
+"""
+Bancos criados antes do media_fts / media_summary: a 0001 cria as tabelas
+vazias; aqui elas são preenchidas com as mídias que já existiam.
+Em banco novo não faz nada.
+
+O SQL fica copiado aqui, sem importar api.models: a migração roda contra o
+schema da versão 0001, e o código atual pode depender de tabelas de
+migrações posteriores (ex.: summary.rebuild lê archive_year, da 0008).
+"""
+
+# contagens de media_summary como na 0001 (ver api/models/summary.py)
+_SUMMARY_SQL = """
+SELECT 'platform' AS dim, platform AS key, count(*) AS count FROM media GROUP BY platform
+UNION ALL SELECT 'line', COALESCE(line_id, ''), count(*) FROM media GROUP BY line_id
+UNION ALL SELECT 'system', COALESCE(system_id, ''), count(*) FROM media GROUP BY system_id
+UNION ALL SELECT 'month', substr(published_at, 1, 7), count(*) FROM media GROUP BY substr(published_at, 1, 7)
+UNION ALL SELECT 'person', person_id, count(*) FROM media_person GROUP BY person_id
+"""
+
+def migrate(db) -> None:
+    fts_pending = db.execute(
+        "SELECT EXISTS(SELECT 1 FROM media) AND NOT EXISTS(SELECT 1 FROM media_fts_docsize)"
+    ).fetchone()[0]
+    if fts_pending:
+        db.execute("INSERT INTO media_fts(media_fts) VALUES('rebuild')")
+
+    summary_pending = db.execute(
+        "SELECT EXISTS(SELECT 1 FROM media) AND NOT EXISTS(SELECT 1 FROM media_summary)"
+    ).fetchone()[0]
+    if summary_pending:
+        db.execute(f"INSERT INTO media_summary(dim, key, count) SELECT dim, key, count FROM ({_SUMMARY_SQL})")
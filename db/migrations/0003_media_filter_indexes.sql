@@ -0,0 +1,12 @@
+-- migrate: online
+-- Índices compostos das listagens de mídia (planos auditados com python -m bench.query_plan).
+-- Paginação por (published_at, id): todo índice carrega o rowid (= id) no fim,
+-- então (filtro, published_at) entrega a página já na ordem, sem B-tree temporária.
+CREATE INDEX IF NOT EXISTS idx_media_platform_published ON media(platform, published_at);
+CREATE INDEX IF NOT EXISTS idx_media_line_published ON media(line_id, published_at);
+CREATE INDEX IF NOT EXISTS idx_media_system_published ON media(system_id, published_at);
+-- substituídos pelos compostos acima (mesmo prefixo); role nunca é filtro
+DROP INDEX IF EXISTS idx_media_platform;
+DROP INDEX IF EXISTS idx_media_line;
+DROP INDEX IF EXISTS idx_media_system;
+DROP INDEX IF EXISTS idx_mediaperson_role;
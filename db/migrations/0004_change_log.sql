@@ -0,0 +1,108 @@
+-- Feed de alterações (GET /media/changes?since=): uma linha por entidade
+-- alterada, com seq crescente (AUTOINCREMENT nunca reusa). Como as escritas
+-- são serializadas (BEGIN IMMEDIATE / escritor único), a ordem de commit é
+-- a ordem de seq: quem leu até N nunca perde uma alteração com seq <= N.
+--
+-- Mantido por triggers, como media_fts e media_summary: pegam também o que
+-- chega por cascata (pessoa excluída muda as pessoas da mídia; linha
+-- excluída zera media.line_id). Cada alteração apaga a linha anterior da
+-- mesma entidade, então o log tem no máximo uma linha por entidade (mais as
+-- exclusões): sincronizar custa O(alterações desde o cursor), e since=0 é
+-- a carga completa.
+
+CREATE TABLE IF NOT EXISTS change_log (
+  seq INTEGER PRIMARY KEY AUTOINCREMENT,
+  entity TEXT NOT NULL CHECK (entity IN ('media','person','line','system')),
+  entity_id INTEGER NOT NULL,
+  op TEXT NOT NULL CHECK (op IN ('upsert','delete')),
+  changed_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_change_log_entity_id ON change_log(entity, entity_id);
+CREATE INDEX IF NOT EXISTS idx_change_log_entity_seq ON change_log(entity, seq);
+
+-- media
+CREATE TRIGGER IF NOT EXISTS media_changes_ai AFTER INSERT ON media BEGIN
+  DELETE FROM change_log WHERE entity = 'media' AND entity_id = new.id;
+  INSERT INTO change_log(entity, entity_id, op) VALUES ('media', new.id, 'upsert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS media_changes_au AFTER UPDATE ON media BEGIN
+  DELETE FROM change_log WHERE entity = 'media' AND entity_id = new.id;
+  INSERT INTO change_log(entity, entity_id, op) VALUES ('media', new.id, 'upsert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS media_changes_ad AFTER DELETE ON media BEGIN
+  DELETE FROM change_log WHERE entity = 'media' AND entity_id = old.id;
+  INSERT INTO change_log(entity, entity_id, op) VALUES ('media', old.id, 'delete');
+END;
+
+-- person
+CREATE TRIGGER IF NOT EXISTS person_changes_ai AFTER INSERT ON person BEGIN
+  DELETE FROM change_log WHERE entity = 'person' AND entity_id = new.id;
+  INSERT INTO change_log(entity, entity_id, op) VALUES ('person', new.id, 'upsert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS person_changes_au AFTER UPDATE ON person BEGIN
+  DELETE FROM change_log WHERE entity = 'person' AND entity_id = new.id;
+  INSERT INTO change_log(entity, entity_id, op) VALUES ('person', new.id, 'upsert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS person_changes_ad AFTER DELETE ON person BEGIN
+  DELETE FROM change_log WHERE entity = 'person' AND entity_id = old.id;
+  INSERT INTO change_log(entity, entity_id, op) VALUES ('person', old.id, 'delete');
+END;
+
+-- line
+CREATE TRIGGER IF NOT EXISTS line_changes_ai AFTER INSERT ON line BEGIN
+  DELETE FROM change_log WHERE entity = 'line' AND entity_id = new.id;
+  INSERT INTO change_log(entity, entity_id, op) VALUES ('line', new.id, 'upsert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS line_changes_au AFTER UPDATE ON line BEGIN
+  DELETE FROM change_log WHERE entity = 'line' AND entity_id = new.id;
+  INSERT INTO change_log(entity, entity_id, op) VALUES ('line', new.id, 'upsert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS line_changes_ad AFTER DELETE ON line BEGIN
+  DELETE FROM change_log WHERE entity = 'line' AND entity_id = old.id;
+  INSERT INTO change_log(entity, entity_id, op) VALUES ('line', old.id, 'delete');
+END;
+
+-- system
+CREATE TRIGGER IF NOT EXISTS system_changes_ai AFTER INSERT ON system BEGIN
+  DELETE FROM change_log WHERE entity = 'system' AND entity_id = new.id;
+  INSERT INTO change_log(entity, entity_id, op) VALUES ('system', new.id, 'upsert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS system_changes_au AFTER UPDATE ON system BEGIN
+  DELETE FROM change_log WHERE entity = 'system' AND entity_id = new.id;
+  INSERT INTO change_log(entity, entity_id, op) VALUES ('system', new.id, 'upsert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS system_changes_ad AFTER DELETE ON system BEGIN
+  DELETE FROM change_log WHERE entity = 'system' AND entity_id = old.id;
+  INSERT INTO change_log(entity, entity_id, op) VALUES ('system', old.id, 'delete');
+END;
+
+-- pessoas da mídia: a mídia muda (a não ser que ela mesma esteja sendo excluída)
+CREATE TRIGGER IF NOT EXISTS media_person_changes_ai AFTER INSERT ON media_person BEGIN
+  DELETE FROM change_log WHERE entity = 'media' AND entity_id = new.media_id;
+  INSERT INTO change_log(entity, entity_id, op) VALUES ('media', new.media_id, 'upsert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS media_person_changes_au AFTER UPDATE ON media_person BEGIN
+  DELETE FROM change_log WHERE entity = 'media' AND entity_id = new.media_id;
+  INSERT INTO change_log(entity, entity_id, op) VALUES ('media', new.media_id, 'upsert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS media_person_changes_ad AFTER DELETE ON media_person
+WHEN EXISTS (SELECT 1 FROM media WHERE id = old.media_id) BEGIN
+  DELETE FROM change_log WHERE entity = 'media' AND entity_id = old.media_id;
+  INSERT INTO change_log(entity, entity_id, op) VALUES ('media', old.media_id, 'upsert');
+END;
+
+-- o que já existe entra como carga inicial
+INSERT INTO change_log(entity, entity_id, op) SELECT 'line', id, 'upsert' FROM line ORDER BY id;
+INSERT INTO change_log(entity, entity_id, op) SELECT 'system', id, 'upsert' FROM system ORDER BY id;
+INSERT INTO change_log(entity, entity_id, op) SELECT 'person', id, 'upsert' FROM person ORDER BY id;
+INSERT INTO change_log(entity, entity_id, op) SELECT 'media', id, 'upsert' FROM media ORDER BY id;
@@ -0,0 +1,16 @@
+-- Chave canônica do vídeo (ver api/models/video_keys.py): o mesmo vídeo
+-- não entra duas vezes com URLs diferentes. Índice parcial: mídia sem
+-- chave (URL não reconhecida, ou repetida antiga) fica fora da checagem.
+-- ADD COLUMN não reescreve a tabela; o índice nasce vazio. As mídias que
+-- já existiam ganham a chave com `python -m api.models.video_keys backfill`.
+ALTER TABLE media ADD COLUMN video_key TEXT;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_media_video_key ON media(platform, video_key) WHERE video_key IS NOT NULL;
+
+-- o feed de alterações só olha as colunas que a API devolve (o backfill
+-- da chave não faz os clientes baixarem tudo de novo)
+DROP TRIGGER IF EXISTS media_changes_au;
+CREATE TRIGGER media_changes_au
+AFTER UPDATE OF title, description, platform, url, published_at, line_id, system_id ON media BEGIN
+  DELETE FROM change_log WHERE entity = 'media' AND entity_id = new.id;
+  INSERT INTO change_log(entity, entity_id, op) VALUES ('media', new.id, 'upsert');
+END;
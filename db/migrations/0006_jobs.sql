@@ -0,0 +1,24 @@
+-- Fila de jobs em segundo plano (api/core/jobs.py), hoje só exportações de relatório.
+-- status: queued -> running -> done | failed; um running sem heartbeat recente
+-- (processo que caiu) volta a ser pego por outro worker, até max_attempts.
+CREATE TABLE IF NOT EXISTS job (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  kind TEXT NOT NULL,
+  params TEXT NOT NULL DEFAULT '{}',
+  status TEXT NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'running', 'done', 'failed')),
+  attempts INTEGER NOT NULL DEFAULT 0,
+  progress INTEGER NOT NULL DEFAULT 0,
+  total INTEGER,
+  file_path TEXT,
+  file_size INTEGER,
+  error TEXT,
+  created_by INTEGER REFERENCES "user"(id) ON DELETE SET NULL,
+  created_at TEXT NOT NULL DEFAULT (datetime('now')),
+  started_at TEXT,
+  heartbeat_at TEXT,
+  finished_at TEXT
+);
+-- próximo da fila / running abandonado
+CREATE INDEX IF NOT EXISTS idx_job_status ON job(status, id);
+-- limpeza dos vencidos
+CREATE INDEX IF NOT EXISTS idx_job_finished ON job(finished_at) WHERE finished_at IS NOT NULL;
@@ -0,0 +1,23 @@
+-- Versão por tabela visível a todos os processos (api/core/versions.py), para
+-- os caches em memória de cada worker do uvicorn saberem que ficaram velhos.
+-- media/person/line/system já têm uma: o maior seq da entidade no change_log
+-- (0004). Aqui ficam as demais tabelas com cache: user (cache de sessão).
+-- Por trigger, como o change_log: pega também o ON DELETE SET NULL de person.
+
+CREATE TABLE IF NOT EXISTS table_version (
+  name TEXT PRIMARY KEY,
+  version INTEGER NOT NULL DEFAULT 0,
+  changed_at TEXT NOT NULL DEFAULT (datetime('now'))
+) WITHOUT ROWID;
+
+INSERT OR IGNORE INTO table_version(name) VALUES ('user');
+
+CREATE TRIGGER IF NOT EXISTS user_version_ai AFTER INSERT ON "user" BEGIN
+  UPDATE table_version SET version = version + 1, changed_at = datetime('now') WHERE name = 'user';
+END;
+CREATE TRIGGER IF NOT EXISTS user_version_au AFTER UPDATE ON "user" BEGIN
+  UPDATE table_version SET version = version + 1, changed_at = datetime('now') WHERE name = 'user';
+END;
+CREATE TRIGGER IF NOT EXISTS user_version_ad AFTER DELETE ON "user" BEGIN
+  UPDATE table_version SET version = version + 1, changed_at = datetime('now') WHERE name = 'user';
+END;
@@ -0,0 +1,42 @@
+-- Arquivo frio (api/models/archive.py): mídias publicadas antes de um corte
+-- saem de media/media_person e vão para um banco por ano
+-- (ARCHIVE_DIR/media_AAAA.db), anexado com ATTACH só pelas listagens cujo
+-- período alcança aquele ano.
+--
+-- media_archive: uma linha por mídia arquivada (onde está; is_archived,
+-- multi-get por ids). Guarda (platform, video_key) para o mesmo vídeo não
+-- ser cadastrado de novo enquanto o original está no arquivo. Os ids não
+-- se repetem: media é AUTOINCREMENT.
+CREATE TABLE IF NOT EXISTS media_archive (
+  id INTEGER PRIMARY KEY,
+  year INTEGER NOT NULL,
+  platform TEXT NOT NULL,
+  video_key TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_media_archive_video_key ON media_archive(platform, video_key)
+  WHERE video_key IS NOT NULL;
+
+-- anos com arquivo (lida a cada listagem: poucas linhas). Cada lote movido
+-- ganha um número (media.batch no arquivo); só valem as linhas do arquivo
+-- com restored < batch <= batches. A faixa muda na mesma transação que
+-- remove do quente (ou devolve a ele), então a cópia de um lote ainda não
+-- confirmado, ou já restaurado, nunca aparece duas vezes nem some.
+CREATE TABLE IF NOT EXISTS archive_year (
+  year INTEGER PRIMARY KEY,
+  media INTEGER NOT NULL DEFAULT 0,
+  batches INTEGER NOT NULL DEFAULT 0,
+  restored INTEGER NOT NULL DEFAULT 0
+);
+
+-- mesma mensagem do índice único, para integrity_message tratar igual
+CREATE TRIGGER IF NOT EXISTS media_archive_key_bi BEFORE INSERT ON media
+WHEN new.video_key IS NOT NULL
+ AND EXISTS (SELECT 1 FROM media_archive WHERE platform = new.platform AND video_key = new.video_key) BEGIN
+  SELECT RAISE(ABORT, 'UNIQUE constraint failed: media.platform, media.video_key');
+END;
+
+CREATE TRIGGER IF NOT EXISTS media_archive_key_bu BEFORE UPDATE OF platform, video_key ON media
+WHEN new.video_key IS NOT NULL
+ AND EXISTS (SELECT 1 FROM media_archive WHERE platform = new.platform AND video_key = new.video_key) BEGIN
+  SELECT RAISE(ABORT, 'UNIQUE constraint failed: media.platform, media.video_key');
+END;
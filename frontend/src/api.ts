@@ -34,4 +34,19 @@ export class ApiClient {
   ping() { return this.request<{ ok: boolean }>("/auth/ping"); }
 
   listPeople() { return this.request<Array<{ id: number; name: string; email?: string | null }>>("/people"); }
+
+  // várias mídias numa chamada, já com nomes de pessoas/linha/sistema
+  mediaByIds(ids: number[], expand = "people,line,system") {
+    return this.request<{ items: Array<Record<string, unknown>>; next_cursor?: string }>(
+      `/media?ids=${ids.join(",")}&expand=${expand}`);
+  }
+
+  // sincronização incremental: guarde next_since e repita enquanto has_more
+  mediaChanges(since = 0, limit = 1000) {
+    return this.request<{
+      changes: Array<{ seq: number; op: "upsert" | "delete"; id: number; changed_at: string; media?: Record<string, unknown> }>;
+      next_since: number;
+      has_more: boolean;
+    }>(`/media/changes?since=${since}&limit=${limit}`);
+  }
 }
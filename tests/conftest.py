@@ -0,0 +1,40 @@
+# tests/conftest.py
+"""
+Configuração comum: banco e pastas num diretório temporário (antes de
+importar api.*, que lê o ambiente no import) e um cliente da API já logado.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)   # db/migrations é relativo
+
+_TMP = tempfile.mkdtemp(prefix="midia-tests-")
+os.environ.setdefault("DB_PATH", os.path.join(_TMP, "app.db"))
+os.environ.setdefault("JOB_DIR", os.path.join(_TMP, "exports"))
+os.environ.setdefault("ARCHIVE_DIR", os.path.join(_TMP, "archive"))
+os.environ.setdefault("JOB_WORKERS", "0")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+ADMIN = "admin"
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+    from api.core.db import connect
+    from api.core.security import hash_password
+    from api.main import app
+
+    with TestClient(app) as c:
+        db = connect()
+        db.execute("INSERT OR IGNORE INTO user(username, password_hash, role) VALUES(?, ?, 'admin')",
+                   (ADMIN, hash_password(ADMIN)))
+        db.commit()
+        db.close()
+        c.post("/auth/login", json={"username": ADMIN, "token": ADMIN}).raise_for_status()
+        yield c
@@ -0,0 +1,80 @@
+# tests/test_coherence.py
+"""
+Coerência dos caches entre processos (api/core/versions.py): escritas
+feitas por outro processo, inclusive outro worker do uvicorn, precisam
+mudar as versões que cada worker vê antes de servir algo do cache.
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+from api.core.init_db import init_db
+from api.core.versions import TableVersions
+
+MIGRATIONS = str(ROOT / "db" / "migrations")
+
+def _write_from_other_process(db_path: str, sql: str) -> None:
+    code = "import sqlite3, sys\nwith sqlite3.connect(sys.argv[1]) as db:\n    db.execute(sys.argv[2])\n"
+    subprocess.run([sys.executable, "-c", code, db_path, sql], check=True)
+
+def test_versions_follow_commits_from_other_process(tmp_path):
+    path = str(tmp_path / "app.db")
+    init_db(path, MIGRATIONS)
+    versions = TableVersions(shared=True, db_path=path)
+    try:
+        before = versions.current(("line", "user"))
+        _write_from_other_process(path, "INSERT INTO line(name) VALUES('Linha A')")
+        after_line = versions.current(("line", "user"))
+        assert after_line[0] != before[0]
+        assert after_line[1] == before[1]
+
+        _write_from_other_process(path, "INSERT INTO user(username, password_hash) VALUES('x', 'x')")
+        after_user = versions.current(("line", "user"))
+        assert after_user[0] == after_line[0]
+        assert after_user[1] != after_line[1]
+    finally:
+        versions.close()
+
+def test_local_counter_only_misses_other_process(tmp_path):
+    path = str(tmp_path / "app.db")
+    init_db(path, MIGRATIONS)
+    versions = TableVersions(shared=False, db_path=path)
+    before = versions.current(("line",))
+    _write_from_other_process(path, "INSERT INTO line(name) VALUES('Linha A')")
+    assert versions.current(("line",)) == before
+
+def test_uvicorn_workers_serve_no_stale_reads(monkeypatch):
+    pytest.importorskip("httpx")
+    pytest.importorskip("uvicorn")
+    monkeypatch.chdir(ROOT)   # o seed usa db/migrations relativo
+    from bench.coherence import run
+
+    stale = run(workers=3, n=30, coherent=True)
+    assert stale == {"patch": 0, "externo": 0, "usuário": 0}
+
+def test_acurrent_checks_the_database_off_the_event_loop(tmp_path):
+    import asyncio
+    import threading
+
+    path = str(tmp_path / "app.db")
+    init_db(path, MIGRATIONS)
+    versions = TableVersions(shared=True, db_path=path)
+    seen = []
+    refresh = versions.refresh
+    versions.refresh = lambda: (seen.append(threading.current_thread()), refresh())[1]
+
+    async def check():
+        before = await versions.acurrent(("line",))
+        _write_from_other_process(path, "INSERT INTO line(name) VALUES('Linha A')")
+        return before, await versions.acurrent(("line",)), threading.current_thread()
+
+    try:
+        before, after, loop_thread = asyncio.run(check())
+        assert after != before
+        assert seen and all(t is not loop_thread for t in seen)
+    finally:
+        versions.close()
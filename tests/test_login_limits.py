@@ -0,0 +1,52 @@
+# tests/test_login_limits.py
+import asyncio
+
+import httpx
+
+from api.core.ratelimit import LoginRateLimiter, SlidingWindowLimiter, login_limiter
+from api.core.security import hash_executor
+
+def test_concurrent_bad_logins_stop_at_the_limit(client):
+    from api.core.db import connect
+    from api.core.security import hash_password
+    from api.main import app
+
+    db = connect()
+    db.execute("INSERT OR IGNORE INTO user(username, password_hash) VALUES('alvo', ?)", (hash_password("certo"),))
+    db.commit()
+    db.close()
+
+    async def burst(n: int):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+            return await asyncio.gather(*(c.post("/auth/login", json={"username": "alvo", "token": "errado"})
+                                          for _ in range(n)))
+
+    hashed_before = hash_executor.stats()["completed"]
+    statuses = [r.status_code for r in asyncio.run(burst(100))]
+    limit = login_limiter.by_user.limit
+    assert statuses.count(401) == limit
+    assert statuses.count(429) == 100 - limit
+    assert hash_executor.stats()["completed"] - hashed_before <= limit
+
+def test_success_and_release_give_the_attempt_back():
+    limiter = LoginRateLimiter(per_user=1, per_ip=1, window=60)
+    limiter.success("ana", "1.1.1.1", limiter.check("ana", "1.1.1.1"))
+    limiter.release("ana", "1.1.1.1", limiter.check("ana", "1.1.1.1"))
+    limiter.check("ana", "1.1.1.1")   # ainda cabe: nada ficou contado
+
+def test_keys_that_never_come_back_are_swept():
+    now = [0.0]
+    limiter = SlidingWindowLimiter(limit=5, window=10, clock=lambda: now[0], max_keys=1000)
+    for i in range(500):
+        limiter.hit(f"inventado-{i}")
+    now[0] = 11.0
+    limiter.hit("novo")
+    assert len(limiter) == 1
+
+def test_key_count_is_bounded():
+    limiter = SlidingWindowLimiter(limit=5, window=3600, max_keys=100)
+    for i in range(1000):
+        limiter.hit(f"inventado-{i}")
+    assert len(limiter) <= 100
+    assert limiter.evicted > 0
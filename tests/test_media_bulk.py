@@ -0,0 +1,29 @@
+# tests/test_media_bulk.py
+from api.core import db as core_db
+from api.models import media as media_model
+
+def _item(i: int) -> dict:
+    return {"title": f"Importada {i}", "platform": "youtube", "url": f"https://youtube.com/watch?v=bulk{i:07d}",
+            "published_at": "2024-03-01", "people": []}
+
+def test_bulk_import_commits_each_batch(client, monkeypatch):
+    statements = []
+    connect = core_db.connect
+
+    def traced(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr(core_db, "connect", traced)
+    core_db.close_writer()   # o próximo escritor abre a conexão já com o trace
+    n = 2 * media_model.BULK_BATCH_SIZE + 200
+
+    r = client.post("/media/bulk", json=[_item(i) for i in range(n)] + [_item(0)])
+    r.raise_for_status()
+    body = r.json()
+
+    assert body["created"] == n
+    assert [e["row"] for e in body["errors"]] == [n + 1]   # mesma chave de vídeo da linha 1
+    commits = [s for s in statements if s.strip().upper() == "COMMIT"]
+    assert len(commits) >= 3   # um por lote, não um para a importação toda
@@ -0,0 +1,19 @@
+# tests/test_reports.py
+from api.core import db as core_db
+
+def test_json_report_reuses_the_read_pool_connection(client, monkeypatch):
+    client.get("/reports/by-person", params={"person_id": 1}).raise_for_status()   # aquece o pool de leitura
+    opened = []
+    connect = core_db.connect
+
+    def counted(*args, **kwargs):
+        opened.append(args)
+        return connect(*args, **kwargs)
+
+    monkeypatch.setattr(core_db, "connect", counted)
+    for _ in range(5):
+        r = client.get("/reports/by-person", params={"person_id": 1})
+        r.raise_for_status()
+        assert "X-Data-As-Of" not in r.headers   # sem snapshot: dados ao vivo
+
+    assert opened == []   # sem snapshot, cada relatório JSON usa a conexão da thread de leitura
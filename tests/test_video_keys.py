@@ -0,0 +1,25 @@
+# tests/test_video_keys.py
+import pytest
+
+from api.models.video_keys import detect, video_key
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://youtu.be/abc123", ("youtube", "abc123")),
+    ("https://www.youtube.com/watch?v=abc123&t=10", ("youtube", "abc123")),
+    ("youtube.com/shorts/abc123", ("youtube", "abc123")),
+    ("https://vimeo.com/76979871", ("vimeo", "76979871")),
+    ("https://player.vimeo.com/video/76979871", ("vimeo", "76979871")),
+    ("https://example.com/abc123", None),
+    ("http://[abc", None),   # urlsplit: ValueError('Invalid IPv6 URL')
+])
+def test_detect(url, expected):
+    assert detect(url) == expected
+
+def test_video_key_of_malformed_url_is_none():
+    assert video_key("youtube", "http://[abc") is None
+
+@pytest.mark.parametrize("url", ["http://[abc", "https://example.com/x"])
+def test_lookup_rejects_unrecognized_url(client, url):
+    r = client.get("/media/lookup", params={"url": url})
+    assert r.status_code == 400
+    assert r.json()["code"] == "bad_request"